@@ -15,9 +15,11 @@ Features:
 - Cross-repository data reusability
 
 Usage:
-    /engineering-data-context generate --folder PATH [--deep-research] [--modules]
+    /engineering-data-context generate --folder PATH [--deep-research] [--modules] [--incremental]
+                                       [--workers N] [--max-pending N]
     /engineering-data-context enhance --folder PATH [--research-topics TOPICS]
-    /engineering-data-context query --context QUERY
+    /engineering-data-context query --context QUERY [--type TYPE] [--module NAME] [--tags TAG ...]
+                                    [--limit N] [--offset N]
     /engineering-data-context export --format [json|yaml|markdown]
 """
 
@@ -28,18 +30,33 @@ import yaml
 import argparse
 import hashlib
 import sqlite3
+import csv
+import io
+import math
+import random
 from pathlib import Path
-from typing import Dict, List, Optional, Any, Tuple
+from typing import Dict, List, Optional, Any, Tuple, Set, Callable, Iterable, Iterator
 from datetime import datetime
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, field
 import re
 import ast
 import subprocess
 import shutil
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import (
+    ProcessPoolExecutor, Future, FIRST_COMPLETED, wait
+)
+from functools import partial
+import zlib
 import requests
 from urllib.parse import quote
 import time
+import asyncio
+from urllib.parse import urlparse
+
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
 
 @dataclass
 class DataContext:
@@ -68,15 +85,935 @@ class ResearchResult:
     best_practices: List[str]
     timestamp: str
 
+@dataclass
+class ResearchConfig:
+    """Settings for the research stage and its persistent cache."""
+    endpoint: Optional[str] = None  # e.g. 'http://search.local/api?q={query}'
+    per_host_limit: int = 2
+    rate_per_host: float = 5.0  # requests per second
+    timeout: float = 30.0
+    ttl_seconds: int = 7 * 24 * 3600
+    cache_size: int = 10000
+    
+    def __post_init__(self):
+        if self.per_host_limit < 1:
+            raise ValueError(f"per_host_limit must be at least 1, got {self.per_host_limit}")
+        if self.rate_per_host <= 0:
+            raise ValueError(f"rate_per_host must be positive, got {self.rate_per_host}")
+
+@dataclass
+class FolderAggregate:
+    """Statistics rolled up from a folder's children during the tree walk."""
+    entry_count: int = 0
+    total_size_bytes: int = 0
+    data_types: Set[str] = field(default_factory=set)
+    subtree_data_types: Set[str] = field(default_factory=set)
+    subdirectories: List[str] = field(default_factory=list)
+    content_hash: str = ''
+    dirty: bool = False
+
+@dataclass
+class ContextWalk:
+    """Mutable state shared across a single generate_context tree walk."""
+    contexts: List[Optional[DataContext]] = field(default_factory=list)
+    previous: Optional[Dict[str, DataContext]] = None
+    updated: List[DataContext] = field(default_factory=list)
+    pool: Optional['FileContextPool'] = None
+    on_file_context: Optional[Callable[[DataContext], None]] = None
+
+# Content fingerprint strategies: name -> fn(file_path, size_bytes) -> hex digest.
+# The strategy name is stored with each file context so incremental runs only
+# compare hashes produced the same way.
+FINGERPRINT_STRATEGIES: Dict[str, Callable[[Path, int], str]] = {}
+
+FINGERPRINT_READ_SIZE = 1024 * 1024
+SAMPLED_BLOCK_COUNT = 16
+SAMPLED_BLOCK_SIZE = 64 * 1024
+
+def register_fingerprint(name: str):
+    """Register a content fingerprint strategy under ``name``."""
+    def decorator(func: Callable[[Path, int], str]) -> Callable[[Path, int], str]:
+        FINGERPRINT_STRATEGIES[name] = func
+        return func
+    return decorator
+
+def _hash_whole_file(hasher, file_path: Path):
+    with open(file_path, 'rb') as f:
+        for block in iter(partial(f.read, FINGERPRINT_READ_SIZE), b''):
+            hasher.update(block)
+    return hasher
+
+@register_fingerprint('sha256')
+def _sha256_fingerprint(file_path: Path, size_bytes: int) -> str:
+    """Full cryptographic hash of the whole file."""
+    return _hash_whole_file(hashlib.sha256(), file_path).hexdigest()
+
+@register_fingerprint('crc32')
+def _crc32_fingerprint(file_path: Path, size_bytes: int) -> str:
+    """Fast non-cryptographic checksum of the whole file."""
+    crc = 0
+    with open(file_path, 'rb') as f:
+        for block in iter(partial(f.read, FINGERPRINT_READ_SIZE), b''):
+            crc = zlib.crc32(block, crc)
+    return f"{crc:08x}{size_bytes:x}"
+
+if xxhash is not None:
+    @register_fingerprint('xxh3')
+    def _xxh3_fingerprint(file_path: Path, size_bytes: int) -> str:
+        """Fast non-cryptographic 128-bit hash of the whole file."""
+        return _hash_whole_file(xxhash.xxh3_128(), file_path).hexdigest()
+
+# 'fast' resolves to the best available non-cryptographic full-file hash
+FAST_FINGERPRINT = 'xxh3' if xxhash is not None else 'crc32'
+
+@register_fingerprint('sampled')
+def _sampled_fingerprint(file_path: Path, size_bytes: int) -> str:
+    """Hash the size plus evenly strided blocks that include the first and last.
+    
+    Reads at most SAMPLED_BLOCK_COUNT x SAMPLED_BLOCK_SIZE bytes, and because
+    the tail block and size are always hashed, appends are always detected.
+    """
+    hasher = hashlib.blake2b(str(size_bytes).encode(), digest_size=20)
+    if size_bytes <= SAMPLED_BLOCK_COUNT * SAMPLED_BLOCK_SIZE:
+        return _hash_whole_file(hasher, file_path).hexdigest()
+    
+    stride = (size_bytes - SAMPLED_BLOCK_SIZE) / (SAMPLED_BLOCK_COUNT - 1)
+    with open(file_path, 'rb') as f:
+        for index in range(SAMPLED_BLOCK_COUNT):
+            f.seek(int(index * stride))
+            hasher.update(f.read(SAMPLED_BLOCK_SIZE))
+    return hasher.hexdigest()
+
+@register_fingerprint('md5-headtail')
+def _md5_headtail_fingerprint(file_path: Path, size_bytes: int) -> str:
+    """Legacy MD5 of the whole file, or of the first and last 1MB above 10MB."""
+    hasher = hashlib.md5()
+    
+    # For large files, hash only first and last chunks
+    if size_bytes > 10 * 1024 * 1024:  # 10MB
+        with open(file_path, 'rb') as f:
+            hasher.update(f.read(1024 * 1024))  # First 1MB
+            f.seek(-1024 * 1024, 2)  # Last 1MB
+            hasher.update(f.read())
+    else:
+        with open(file_path, 'rb') as f:
+            hasher.update(f.read())
+    
+    return hasher.hexdigest()
+
+# Generator instance used by FileContextPool worker processes
+_worker_generator = None
+
+def _init_context_worker(generator: 'EngineeringDataContextGenerator'):
+    """Install the generator once per worker so tasks only carry a path."""
+    global _worker_generator
+    _worker_generator = generator
+
+def _build_file_context(file_path: Path, stat_result: os.stat_result) -> Optional[DataContext]:
+    """Worker entry point: hash a file and extract its schema."""
+    return _worker_generator._create_file_context(file_path, stat_result)
+
+class FileContextPool:
+    """Bounded process pool for the parse/hash stage of a context walk.
+    
+    The tree walk stays the single discovery producer. ``submit`` blocks
+    once ``max_pending`` files are in flight, draining finished results
+    through their callbacks, so memory stays bounded on very large trees.
+    """
+    
+    def __init__(self, generator: 'EngineeringDataContextGenerator', workers: int,
+                 max_pending: Optional[int] = None):
+        self.workers = workers
+        self.max_pending = max_pending or workers * 4
+        self._executor = ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_context_worker,
+            initargs=(generator,)
+        )
+        self._pending: Dict[Future, Callable[[DataContext], None]] = {}
+    
+    def submit(self, file_path: Path, stat_result: os.stat_result,
+               callback: Callable[[DataContext], None]):
+        """Queue a file, waiting for a free slot when the pool is saturated."""
+        while len(self._pending) >= self.max_pending:
+            self._drain()
+        future = self._executor.submit(_build_file_context, file_path, stat_result)
+        self._pending[future] = callback
+    
+    def join(self):
+        """Wait for every queued file and deliver the remaining results."""
+        while self._pending:
+            self._drain()
+    
+    def _drain(self):
+        done, _ = wait(self._pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            callback = self._pending.pop(future)
+            callback(future.result())
+    
+    def __enter__(self) -> 'FileContextPool':
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        for future in self._pending:
+            future.cancel()
+        self._pending.clear()
+        self._executor.shutdown(wait=True)
+
+# Tokens of a JSON document; strings are matched whole, numbers loosely
+_JSON_TOKEN = re.compile(
+    r'\s*(?:([{}\[\],:])|"((?:[^"\\]|\\.)*)"|(-?[0-9][0-9.eE+-]*)|(true|false|null))'
+)
+
+def iter_json_events(stream, chunk_size: int = 64 * 1024) -> Iterator[Tuple[str, Any]]:
+    """Yield parse events from a JSON text stream without materialising it.
+    
+    Events are ``('start_map' | 'end_map' | 'start_array' | 'end_array', None)``,
+    ``('key', name)`` and ``('scalar', type_name)``. Only the current token is
+    buffered; the read size doubles while a single token (e.g. a very long
+    string) spans several reads so rescanning stays linear.
+    """
+    buffer = ''
+    pos = 0
+    eof = False
+    read_size = chunk_size
+    stack: List[str] = []
+    expect_key = False
+    
+    while True:
+        match = _JSON_TOKEN.match(buffer, pos)
+        if match is None and not eof:
+            rest = buffer[pos:].lstrip()
+            if rest and rest[0] not in '"-0123456789tfn':
+                raise ValueError(f"Invalid JSON near: {rest[:40]!r}")
+        if match is None or (match.end() == len(buffer) and not eof):
+            if eof:
+                if buffer[pos:].strip():
+                    raise ValueError(f"Invalid JSON near: {buffer[pos:pos + 40]!r}")
+                return
+            chunk = stream.read(read_size)
+            if not chunk:
+                eof = True
+            elif pos == 0 and buffer:
+                read_size *= 2
+            buffer = buffer[pos:] + chunk
+            pos = 0
+            continue
+        
+        pos = match.end()
+        read_size = chunk_size
+        punct, string, number, literal = match.groups()
+        
+        if punct == '{':
+            stack.append('map')
+            expect_key = True
+            yield 'start_map', None
+        elif punct == '[':
+            stack.append('array')
+            yield 'start_array', None
+        elif punct in ('}', ']'):
+            if not stack:
+                raise ValueError(f"Unbalanced {punct!r} in JSON")
+            stack.pop()
+            expect_key = False
+            yield ('end_map' if punct == '}' else 'end_array'), None
+        elif punct == ',':
+            expect_key = bool(stack) and stack[-1] == 'map'
+        elif string is not None:
+            if expect_key:
+                expect_key = False
+                yield 'key', json.loads(f'"{string}"') if '\\' in string else string
+            else:
+                yield 'scalar', 'string'
+        elif number is not None:
+            yield 'scalar', 'number'
+        elif literal is not None:
+            yield 'scalar', 'null' if literal == 'null' else 'boolean'
+
+# Resolved YAML tags mapped onto the JSON-style type names used in schemas
+_YAML_SCALAR_TYPES = {
+    'tag:yaml.org,2002:int': 'number',
+    'tag:yaml.org,2002:float': 'number',
+    'tag:yaml.org,2002:bool': 'boolean',
+    'tag:yaml.org,2002:null': 'null',
+}
+
+def iter_yaml_events(stream) -> Iterator[Tuple[str, Any]]:
+    """Yield the same parse events as ``iter_json_events`` for a YAML stream.
+    
+    Only the first document is read. Scalar types follow the implicit
+    resolution ``yaml.safe_load`` would apply.
+    """
+    resolver = yaml.resolver.Resolver()
+    # One entry per open container: [kind, expecting_key]
+    stack: List[List[Any]] = []
+    skip_depth = 0  # nesting inside a non-scalar mapping key
+    
+    for event in yaml.parse(stream, Loader=yaml.SafeLoader):
+        if isinstance(event, yaml.DocumentEndEvent):
+            return
+        
+        is_start = isinstance(event, (yaml.MappingStartEvent, yaml.SequenceStartEvent))
+        is_end = isinstance(event, (yaml.MappingEndEvent, yaml.SequenceEndEvent))
+        if skip_depth:
+            skip_depth += 1 if is_start else -1 if is_end else 0
+            continue
+        if not (is_start or is_end or isinstance(event, (yaml.ScalarEvent, yaml.AliasEvent))):
+            continue
+        
+        in_key = bool(stack) and stack[-1][0] == 'map' and stack[-1][1]
+        if in_key and not is_end:
+            stack[-1][1] = False
+            if isinstance(event, yaml.ScalarEvent):
+                yield 'key', event.value
+            else:
+                yield 'key', '<complex key>'
+                skip_depth = 1 if is_start else 0
+            continue
+        if stack and stack[-1][0] == 'map' and not is_start:
+            stack[-1][1] = True
+        
+        if isinstance(event, yaml.MappingStartEvent):
+            stack.append(['map', True])
+            yield 'start_map', None
+        elif isinstance(event, yaml.SequenceStartEvent):
+            stack.append(['array', False])
+            yield 'start_array', None
+        elif is_end:
+            kind = stack.pop()[0]
+            if stack and stack[-1][0] == 'map':
+                stack[-1][1] = True
+            yield ('end_map' if kind == 'map' else 'end_array'), None
+        elif isinstance(event, yaml.AliasEvent):
+            yield 'scalar', 'unknown'
+        else:
+            tag = event.tag or resolver.resolve(yaml.ScalarNode, event.value, event.implicit)
+            yield 'scalar', _YAML_SCALAR_TYPES.get(tag, 'string')
+
+class StreamingSchemaInferer:
+    """Infer a JSON-style schema from parse events in bounded memory.
+    
+    Only the first ``max_keys`` keys of each object and the first
+    ``max_items`` items of each array are inspected; sampled array items are
+    merged so heterogeneous records produce a union schema. Values deeper
+    than ``max_depth`` are reported as ``unknown``. Inference stops after
+    ``max_events`` events and marks the root schema as ``truncated``.
+    """
+    
+    def __init__(self, max_events: int = 10000, max_keys: int = 10,
+                 max_items: int = 20, max_depth: int = 3):
+        self.max_events = max_events
+        self.max_keys = max_keys
+        self.max_items = max_items
+        self.max_depth = max_depth
+    
+    def infer(self, events: Iterable[Tuple[str, Any]]) -> Dict:
+        """Consume events and return the inferred schema."""
+        # Open containers: [schema, key_or_None, children_seen]
+        stack: List[List[Any]] = []
+        result: Optional[Dict] = None
+        skip_depth = 0
+        truncated = False
+        
+        def attach(schema: Dict):
+            nonlocal result
+            if not stack:
+                result = schema
+                return
+            parent, key, _ = stack[-1]
+            if parent['type'] == 'object':
+                parent['properties'][key] = merge_schemas(parent['properties'].get(key), schema)
+            else:
+                parent['items'] = merge_schemas(parent.get('items'), schema)
+        
+        def sampled() -> bool:
+            if not stack:
+                return True
+            parent, key, seen = stack[-1]
+            if parent['type'] == 'object':
+                return key in parent['properties'] or seen <= self.max_keys
+            return seen <= self.max_items
+        
+        for count, (kind, value) in enumerate(events):
+            if count >= self.max_events:
+                truncated = True
+                break
+            
+            if skip_depth:
+                if kind in ('start_map', 'start_array'):
+                    skip_depth += 1
+                elif kind in ('end_map', 'end_array'):
+                    skip_depth -= 1
+                continue
+            
+            if kind == 'key':
+                stack[-1][1] = value
+                stack[-1][2] += 1
+                continue
+            
+            if kind in ('end_map', 'end_array'):
+                schema = stack.pop()[0]
+                attach(schema)
+                continue
+            
+            if stack and stack[-1][0]['type'] == 'array':
+                stack[-1][2] += 1
+            
+            if not sampled():
+                skip_depth = 1 if kind != 'scalar' else 0
+            elif len(stack) > self.max_depth:
+                attach({'type': 'unknown'})
+                skip_depth = 1 if kind != 'scalar' else 0
+            elif kind == 'start_map':
+                stack.append([{'type': 'object', 'properties': {}}, None, 0])
+            elif kind == 'start_array':
+                stack.append([{'type': 'array'}, None, 0])
+            else:
+                attach({'type': value})
+        
+        # Close containers left open by the event budget
+        while stack:
+            attach(stack.pop()[0])
+        
+        result = result or {'type': 'null'}
+        if truncated:
+            result['truncated'] = True
+        return result
+
+def merge_schemas(left: Optional[Dict], right: Dict) -> Dict:
+    """Merge two inferred schemas, unioning types, properties and item schemas."""
+    if left is None:
+        return right
+    
+    types = set(left['type'] if isinstance(left['type'], list) else [left['type']])
+    types.update(right['type'] if isinstance(right['type'], list) else [right['type']])
+    merged: Dict[str, Any] = {'type': types.pop() if len(types) == 1 else sorted(types)}
+    
+    if 'properties' in left or 'properties' in right:
+        properties = dict(left.get('properties', {}))
+        for key, schema in right.get('properties', {}).items():
+            properties[key] = merge_schemas(properties.get(key), schema)
+        merged['properties'] = properties
+    
+    if 'items' in left or 'items' in right:
+        merged['items'] = (merge_schemas(left['items'], right['items'])
+                           if 'items' in left and 'items' in right
+                           else left.get('items', right.get('items')))
+    
+    return merged
+
+class TokenBucket:
+    """Asyncio token bucket allowing ``rate`` acquisitions per second.
+    
+    Up to ``capacity`` tokens accumulate while idle, so short bursts are
+    served immediately and sustained load is smoothed to ``rate``.
+    """
+    
+    def __init__(self, rate: float, capacity: float):
+        if rate <= 0:
+            raise ValueError(f"Token bucket rate must be positive, got {rate}")
+        if capacity < 1:
+            raise ValueError(f"Token bucket capacity must be at least 1, got {capacity}")
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+    
+    async def acquire(self):
+        """Wait until a token is available and take it."""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity,
+                                   self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+class ResearchFetcher:
+    """Run blocking research lookups concurrently under per-host limits.
+    
+    Each host gets its own semaphore (``per_host_limit`` requests in flight)
+    and token bucket (``rate_per_host`` requests per second). The blocking
+    ``fetch`` callable runs in the event loop's default thread pool.
+    """
+    
+    def __init__(self, fetch: Callable[[str], Optional[ResearchResult]],
+                 host_for: Callable[[str], str], config: ResearchConfig):
+        self.fetch = fetch
+        self.host_for = host_for
+        self.config = config
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._buckets: Dict[str, TokenBucket] = {}
+    
+    async def research(self, query: str) -> Optional[ResearchResult]:
+        """Fetch one query, respecting the host's concurrency and rate limits."""
+        host = self.host_for(query)
+        if host not in self._semaphores:
+            self._semaphores[host] = asyncio.Semaphore(self.config.per_host_limit)
+            self._buckets[host] = TokenBucket(self.config.rate_per_host,
+                                              self.config.per_host_limit)
+        
+        async with self._semaphores[host]:
+            await self._buckets[host].acquire()
+            loop = asyncio.get_running_loop()
+            return await asyncio.wait_for(loop.run_in_executor(None, self.fetch, query),
+                                          timeout=self.config.timeout)
+
+class ModuleIndex:
+    """Precomputed lookups for assigning contexts to modules.
+    
+    Built once per run from the discovered module directories:
+    
+    - a trie over module directory path components, so a context inside a
+      module's folder resolves to the deepest enclosing module;
+    - a map from module name to module, so any folder on the context's path
+      that is named after a module resolves to it;
+    - module names bucketed by length, so "module name occurs in the context
+      name" is answered with a sliding window instead of a scan of all modules;
+    - an n-gram index over lowercased module names (every substring of up to
+      ``_GRAM`` characters), so "tag occurs in module name" is a lookup for
+      short tags and an intersection of trigram postings, verified against
+      the few surviving candidates, for longer ones.
+    """
+    
+    _MODULE_KEY = '\0module'
+    _GRAM = 3
+    
+    def __init__(self, module_dirs: Dict[str, List[Path]]):
+        self.modules = sorted(module_dirs)
+        self._trie: Dict[str, Any] = {}
+        for module, dirs in module_dirs.items():
+            for directory in dirs:
+                node = self._trie
+                for part in directory.resolve().parts:
+                    node = node.setdefault(part, {})
+                node[self._MODULE_KEY] = module
+        
+        self._by_name = {module: module for module in self.modules}
+        self._by_lower_name: Dict[int, Dict[str, List[str]]] = {}
+        for module in self.modules:
+            lowered = module.lower()
+            self._by_lower_name.setdefault(len(lowered), {}).setdefault(lowered, []).append(module)
+        
+        self._grams: Dict[str, Set[int]] = {}
+        for position, module in enumerate(self.modules):
+            lowered = module.lower()
+            for size in range(1, self._GRAM + 1):
+                for start in range(len(lowered) - size + 1):
+                    self._grams.setdefault(lowered[start:start + size], set()).add(position)
+    
+    def __len__(self) -> int:
+        return len(self.modules)
+    
+    def module_for_path(self, path: Path) -> Optional[str]:
+        """Module that contains ``path``, by directory or by folder name."""
+        parts = path.resolve().parts
+        node = self._trie
+        deepest = None
+        for part in parts:
+            node = node.get(part)
+            if node is None:
+                break
+            deepest = node.get(self._MODULE_KEY, deepest)
+        if deepest:
+            return deepest
+        
+        # Closest folder named after a module
+        for part in reversed(parts):
+            if part in self._by_name:
+                return part
+        return None
+    
+    def modules_in_name(self, name: str) -> List[str]:
+        """Modules whose lowercased name occurs in ``name`` (case-insensitive)."""
+        lowered = name.lower()
+        found = []
+        for length, names in self._by_lower_name.items():
+            for start in range(len(lowered) - length + 1):
+                found.extend(names.get(lowered[start:start + length], ()))
+        return found
+    
+    def modules_for_tag(self, tag: str) -> List[str]:
+        """Modules whose name contains ``tag`` (case-insensitive)."""
+        lowered = tag.lower()
+        if not lowered:
+            return list(self.modules)
+        if len(lowered) <= self._GRAM:
+            positions = self._grams.get(lowered, ())
+        else:
+            postings = sorted(
+                (self._grams.get(lowered[start:start + self._GRAM], set())
+                 for start in range(len(lowered) - self._GRAM + 1)),
+                key=len,
+            )
+            positions = set.intersection(*postings)
+            positions = [p for p in positions if lowered in self.modules[p].lower()]
+        return [self.modules[p] for p in sorted(positions)]
+
+class ContextStore:
+    """Persistent SQLite store for data contexts and the research cache.
+    
+    Holds a single WAL-mode connection for the generator's lifetime. Context
+    rows are buffered and written with ``executemany`` every ``batch_size``
+    rows, and the open transaction is committed every ``commit_interval``
+    rows rather than once per call, so large ingests are not dominated by
+    connection setup and fsyncs.
+    
+    When SQLite has FTS5, ``data_context_fts`` indexes name, description and
+    tags and is kept in sync with ``data_context`` by triggers.
+    """
+    
+    CONTEXT_COLUMNS = ('path', 'type', 'name', 'description', 'metadata', 'content_hash',
+                       'data_schema', 'related_docs', 'web_research', 'last_updated',
+                       'tags', 'module_assignment')
+    
+    # bm25 weights for the indexed name, description and tags columns
+    FTS_WEIGHTS = (10.0, 1.0, 5.0)
+    
+    def __init__(self, db_path: Path, batch_size: int = 500, commit_interval: int = 5000):
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.commit_interval = commit_interval
+        self._pending_rows: List[Tuple] = []
+        self._uncommitted = 0
+        
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        # INSERT OR REPLACE only fires delete triggers with recursive triggers on
+        self.conn.execute('PRAGMA recursive_triggers=ON')
+        self._create_tables()
+        self.fts_enabled = self._create_fts_index()
+    
+    def _create_tables(self):
+        """Create the context and research tables if they do not exist."""
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS data_context (
+                path TEXT PRIMARY KEY,
+                type TEXT,
+                name TEXT,
+                description TEXT,
+                metadata TEXT,
+                content_hash TEXT,
+                data_schema TEXT,
+                related_docs TEXT,
+                web_research TEXT,
+                last_updated TEXT,
+                tags TEXT,
+                module_assignment TEXT
+            )
+        ''')
+        
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS research_cache (
+                query_hash TEXT PRIMARY KEY,
+                query TEXT,
+                results TEXT,
+                timestamp TEXT,
+                last_accessed TEXT
+            )
+        ''')
+        
+        # Databases created before LRU eviction lack the access column
+        columns = [row[1] for row in self.conn.execute("PRAGMA table_info(research_cache)")]
+        if 'last_accessed' not in columns:
+            self.conn.execute("ALTER TABLE research_cache ADD COLUMN last_accessed TEXT")
+        self.conn.execute('''
+            CREATE INDEX IF NOT EXISTS research_cache_last_accessed
+            ON research_cache (last_accessed)
+        ''')
+        
+        self.conn.commit()
+    
+    def _create_fts_index(self) -> bool:
+        """Create the FTS5 index and its sync triggers; False if FTS5 is missing."""
+        exists = self.conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'data_context_fts'"
+        ).fetchone()
+        
+        try:
+            self.conn.execute('''
+                CREATE VIRTUAL TABLE IF NOT EXISTS data_context_fts USING fts5(
+                    name, description, tags,
+                    content='data_context', content_rowid='rowid'
+                )
+            ''')
+        except sqlite3.OperationalError:
+            return False
+        
+        self.conn.executescript('''
+            CREATE TRIGGER IF NOT EXISTS data_context_fts_insert
+            AFTER INSERT ON data_context BEGIN
+                INSERT INTO data_context_fts (rowid, name, description, tags)
+                VALUES (new.rowid, new.name, new.description, new.tags);
+            END;
+            
+            CREATE TRIGGER IF NOT EXISTS data_context_fts_delete
+            AFTER DELETE ON data_context BEGIN
+                INSERT INTO data_context_fts (data_context_fts, rowid, name, description, tags)
+                VALUES ('delete', old.rowid, old.name, old.description, old.tags);
+            END;
+            
+            CREATE TRIGGER IF NOT EXISTS data_context_fts_update
+            AFTER UPDATE ON data_context BEGIN
+                INSERT INTO data_context_fts (data_context_fts, rowid, name, description, tags)
+                VALUES ('delete', old.rowid, old.name, old.description, old.tags);
+                INSERT INTO data_context_fts (rowid, name, description, tags)
+                VALUES (new.rowid, new.name, new.description, new.tags);
+            END;
+        ''')
+        
+        # Index rows written before the FTS table existed
+        if not exists:
+            self.conn.execute("INSERT INTO data_context_fts (data_context_fts) VALUES ('rebuild')")
+        self.conn.commit()
+        return True
+    
+    @staticmethod
+    def _to_row(context: DataContext) -> Tuple:
+        return (
+            context.path,
+            context.type,
+            context.name,
+            context.description,
+            json.dumps(context.metadata),
+            context.content_hash,
+            json.dumps(context.data_schema) if context.data_schema else None,
+            json.dumps(context.related_docs),
+            json.dumps(context.web_research) if context.web_research else None,
+            context.last_updated,
+            json.dumps(context.tags),
+            context.module_assignment
+        )
+    
+    @staticmethod
+    def _from_row(row: Tuple) -> DataContext:
+        return DataContext(
+            path=row[0],
+            type=row[1],
+            name=row[2],
+            description=row[3],
+            metadata=json.loads(row[4]) if row[4] else {},
+            content_hash=row[5],
+            data_schema=json.loads(row[6]) if row[6] else None,
+            related_docs=json.loads(row[7]) if row[7] else [],
+            web_research=json.loads(row[8]) if row[8] else None,
+            last_updated=row[9],
+            tags=json.loads(row[10]) if row[10] else [],
+            module_assignment=row[11]
+        )
+    
+    def put(self, context: DataContext):
+        """Buffer a context for writing."""
+        self._pending_rows.append(self._to_row(context))
+        if len(self._pending_rows) >= self.batch_size:
+            self.flush()
+    
+    def put_many(self, contexts: List[DataContext]):
+        """Buffer several contexts for writing."""
+        for context in contexts:
+            self.put(context)
+    
+    def _write_pending(self):
+        if not self._pending_rows:
+            return
+        placeholders = ', '.join('?' * len(self.CONTEXT_COLUMNS))
+        self.conn.executemany(
+            f"INSERT OR REPLACE INTO data_context ({', '.join(self.CONTEXT_COLUMNS)}) "
+            f"VALUES ({placeholders})",
+            self._pending_rows
+        )
+        self._uncommitted += len(self._pending_rows)
+        self._pending_rows = []
+    
+    def flush(self):
+        """Write buffered rows, committing once the commit interval is reached."""
+        self._write_pending()
+        if self._uncommitted >= self.commit_interval:
+            self.commit()
+    
+    def commit(self):
+        """Write any buffered rows and commit the open transaction."""
+        self._write_pending()
+        self.conn.commit()
+        self._uncommitted = 0
+    
+    def delete(self, paths: List[str]):
+        """Delete contexts by path."""
+        self.flush()
+        self.conn.executemany('DELETE FROM data_context WHERE path = ?',
+                              [(path,) for path in paths])
+        self._uncommitted += len(paths)
+    
+    def load(self, path_prefix: str) -> List[DataContext]:
+        """Load all contexts whose path starts with ``path_prefix``."""
+        self.flush()
+        cursor = self.conn.execute(
+            f"SELECT {', '.join(self.CONTEXT_COLUMNS)} FROM data_context "
+            "WHERE path LIKE ? ORDER BY path",
+            (f"{path_prefix}%",)
+        )
+        return [self._from_row(row) for row in cursor]
+    
+    def search(self, query: str, context_type: Optional[str] = None,
+               module: Optional[str] = None, tags: Optional[List[str]] = None,
+               limit: int = 20, offset: int = 0) -> List[Tuple]:
+        """Search contexts by name, description and tags.
+        
+        Every query word is matched as a prefix and results are ranked by BM25.
+        ``context_type`` and ``module`` filter on the stored columns, ``tags``
+        requires each tag to appear in the tags column. Without FTS5 this falls
+        back to an unranked substring scan.
+        """
+        self.flush()
+        
+        filters = []
+        params: List[Any] = []
+        if context_type:
+            filters.append('d.type = ?')
+            params.append(context_type)
+        if module:
+            filters.append('d.module_assignment = ?')
+            params.append(module)
+        
+        if not self.fts_enabled:
+            return self._search_like(query, filters, params, tags or [], limit, offset)
+        
+        match = self._fts_match(query, tags or [])
+        if not match:
+            where = f"WHERE {' AND '.join(filters)}" if filters else ''
+            cursor = self.conn.execute(f'''
+                SELECT d.path, d.name, d.description, d.tags, d.module_assignment, NULL
+                FROM data_context d
+                {where}
+                ORDER BY d.name
+                LIMIT ? OFFSET ?
+            ''', (*params, limit, offset))
+            return cursor.fetchall()
+        
+        weights = ', '.join(str(weight) for weight in self.FTS_WEIGHTS)
+        where = ' AND '.join(['data_context_fts MATCH ?'] + filters)
+        cursor = self.conn.execute(f'''
+            SELECT d.path, d.name, d.description, d.tags, d.module_assignment,
+                   bm25(data_context_fts, {weights}) AS score
+            FROM data_context_fts
+            JOIN data_context d ON d.rowid = data_context_fts.rowid
+            WHERE {where}
+            ORDER BY score
+            LIMIT ? OFFSET ?
+        ''', (match, *params, limit, offset))
+        return cursor.fetchall()
+    
+    @staticmethod
+    def _fts_match(query: str, tags: List[str]) -> str:
+        """Build an FTS5 match expression of prefix terms and tag filters."""
+        # Quote every token so user input can never be parsed as FTS syntax
+        terms = [f'"{word}"*' for word in re.findall(r'\w+', query)]
+        for tag in tags:
+            words = re.findall(r'\w+', tag)
+            if words:
+                terms.append(f'tags : "{" ".join(words)}"')
+        return ' AND '.join(terms)
+    
+    def _search_like(self, query: str, filters: List[str], params: List[Any],
+                     tags: List[str], limit: int, offset: int) -> List[Tuple]:
+        """Substring search used when SQLite was built without FTS5."""
+        filters = ['(d.name LIKE ? OR d.description LIKE ? OR d.tags LIKE ?)'] + filters
+        params = [f"%{query}%"] * 3 + params
+        for tag in tags:
+            filters.append('d.tags LIKE ?')
+            params.append(f'%"{tag}"%')
+        
+        cursor = self.conn.execute(f'''
+            SELECT d.path, d.name, d.description, d.tags, d.module_assignment, NULL
+            FROM data_context d
+            WHERE {' AND '.join(filters)}
+            ORDER BY d.name
+            LIMIT ? OFFSET ?
+        ''', (*params, limit, offset))
+        return cursor.fetchall()
+    
+    def get_research(self, query_hash: str, ttl_seconds: int) -> Optional[Dict]:
+        """Return a cached research result, or None if missing or expired.
+        
+        Expired entries are deleted; hits refresh the entry's LRU timestamp.
+        """
+        row = self.conn.execute(
+            "SELECT results, timestamp FROM research_cache WHERE query_hash = ?",
+            (query_hash,)
+        ).fetchone()
+        if row is None:
+            return None
+        
+        age = datetime.now() - datetime.fromisoformat(row[1])
+        if age.total_seconds() > ttl_seconds:
+            self.conn.execute("DELETE FROM research_cache WHERE query_hash = ?", (query_hash,))
+            self._uncommitted += 1
+            return None
+        
+        self.conn.execute("UPDATE research_cache SET last_accessed = ? WHERE query_hash = ?",
+                          (datetime.now().isoformat(), query_hash))
+        self._uncommitted += 1
+        return json.loads(row[0])
+    
+    def put_research(self, query_hash: str, query: str, result: Dict):
+        """Cache a research result."""
+        now = datetime.now().isoformat()
+        self.conn.execute('''
+            INSERT OR REPLACE INTO research_cache
+            (query_hash, query, results, timestamp, last_accessed)
+            VALUES (?, ?, ?, ?, ?)
+        ''', (query_hash, query, json.dumps(result), now, now))
+        self._uncommitted += 1
+    
+    def evict_research(self, max_entries: int):
+        """Drop the least recently used research results beyond ``max_entries``."""
+        self.conn.execute('''
+            DELETE FROM research_cache WHERE query_hash IN (
+                SELECT query_hash FROM research_cache
+                ORDER BY COALESCE(last_accessed, timestamp) DESC
+                LIMIT -1 OFFSET ?
+            )
+        ''', (max_entries,))
+        self._uncommitted += 1
+    
+    def close(self):
+        """Commit outstanding work and close the connection."""
+        self.commit()
+        self.conn.close()
+
 class EngineeringDataContextGenerator:
     """Main context generator for engineering data."""
     
-    def __init__(self, base_path: Path = None):
+    # Read size for binary CSV scans
+    CSV_BLOCK_SIZE = 4 * 1024 * 1024
+    
+    def __init__(self, base_path: Path = None, commit_interval: int = 5000,
+                 sample_rows: int = 1000, count_limit_bytes: Optional[int] = None,
+                 schema_max_events: int = 10000,
+                 fingerprint_strategies: Optional[Dict[str, str]] = None,
+                 default_fingerprint: str = 'sampled',
+                 research_config: Optional[ResearchConfig] = None):
         self.base_path = base_path or Path.cwd()
+        self.research_config = research_config or ResearchConfig()
+        self.sample_rows = sample_rows
+        self.count_limit_bytes = count_limit_bytes
+        self.schema_inferer = StreamingSchemaInferer(max_events=schema_max_events)
+        
+        # Fingerprint strategy per data type, falling back to the default
+        self.fingerprint_strategies = {
+            data_type: self._resolve_fingerprint(strategy)
+            for data_type, strategy in (fingerprint_strategies or {}).items()
+        }
+        self.default_fingerprint = self._resolve_fingerprint(default_fingerprint)
         self.context_dir = self.base_path / '.agent-os' / 'data-context'
         self.context_dir.mkdir(parents=True, exist_ok=True)
         self.db_path = self.context_dir / 'context.db'
-        self._init_database()
+        self.store = ContextStore(self.db_path, commit_interval=commit_interval)
         
         # File type mappings for engineering data
         self.engineering_extensions = {
@@ -110,83 +1047,85 @@ class EngineeringDataContextGenerator:
             '.dwg': 'cad_drawing',
             '.dxf': 'cad_exchange'
         }
+    
+    def __getstate__(self) -> Dict[str, Any]:
+        # Process pool workers get a copy of the generator without the connection
+        state = self.__dict__.copy()
+        state.pop('store', None)
+        return state
+    
+    def close(self):
+        """Commit pending writes and close the context store."""
+        self.store.close()
+    
+    def __enter__(self) -> 'EngineeringDataContextGenerator':
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
         
-    def _init_database(self):
-        """Initialize SQLite database for context storage."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS data_context (
-                path TEXT PRIMARY KEY,
-                type TEXT,
-                name TEXT,
-                description TEXT,
-                metadata TEXT,
-                content_hash TEXT,
-                data_schema TEXT,
-                related_docs TEXT,
-                web_research TEXT,
-                last_updated TEXT,
-                tags TEXT,
-                module_assignment TEXT
-            )
-        ''')
+    def generate_context(self, folder_path: Path, deep_research: bool = False,
+                        use_modules: bool = False,
+                        incremental: bool = False,
+                        workers: int = 1,
+                        max_pending: Optional[int] = None) -> Dict[str, Any]:
+        """Generate context for a folder and its subfolders.
         
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS research_cache (
-                query_hash TEXT PRIMARY KEY,
-                query TEXT,
-                results TEXT,
-                timestamp TEXT
-            )
-        ''')
+        With ``incremental`` set, files whose (size, mtime_ns, inode) match the
+        stored row are reused as-is, only folders on the path to a change are
+        rebuilt, and rows for vanished paths are deleted.
         
-        conn.commit()
-        conn.close()
-    
-    def generate_context(self, folder_path: Path, deep_research: bool = False,
-                        use_modules: bool = False) -> Dict[str, Any]:
-        """Generate context for a folder and its subfolders."""
+        With ``workers`` > 1, hashing and schema extraction run in a process
+        pool fed by the tree walk, with at most ``max_pending`` files in flight.
+        """
         
         print(f"🔍 Generating context for: {folder_path}")
         
         if not folder_path.exists():
             return {'error': f'Path does not exist: {folder_path}'}
         
-        contexts = []
+        walk = ContextWalk(
+            previous=self._load_previous_contexts(folder_path) if incremental else None
+        )
         
-        # Process folder recursively
-        for root, dirs, files in os.walk(folder_path):
-            root_path = Path(root)
-            
-            # Create folder context
-            folder_context = self._create_folder_context(root_path)
-            contexts.append(folder_context)
-            
-            # Process files in folder
-            for file_name in files:
-                file_path = root_path / file_name
-                file_context = self._create_file_context(file_path)
-                
-                if file_context:
-                    contexts.append(file_context)
-            
-            # Skip hidden directories
-            dirs[:] = [d for d in dirs if not d.startswith('.')]
+        # File contexts can go straight to the database as they complete unless
+        # research or module assignment still has to amend them
+        stream = not deep_research and not use_modules
+        if stream:
+            walk.on_file_context = self.store.put
+        
+        # Single post-order pass: every entry is stat'ed once and folder
+        # statistics are rolled up from their children
+        if workers > 1:
+            with FileContextPool(self, workers, max_pending) as pool:
+                walk.pool = pool
+                contexts = self._collect_contexts(folder_path, walk)
+        else:
+            contexts = self._collect_contexts(folder_path, walk)
+        changed = walk.updated
+        removed = list(walk.previous) if incremental else []
+        
+        if incremental:
+            print(f"   {len(changed)} changed, {len(removed)} removed, "
+                  f"{len(contexts) - len(changed)} unchanged")
         
         # Perform deep research if requested
         if deep_research:
             print("\n🌐 Performing deep web research...")
-            contexts = self._perform_deep_research(contexts)
+            changed = self._perform_deep_research(changed)
         
         # Assign to modules if requested
         if use_modules:
             print("\n📦 Assigning contexts to modules...")
-            contexts = self._assign_to_modules(contexts)
+            changed = self._assign_to_modules(changed)
         
         # Save contexts to database
-        self._save_contexts(contexts)
+        if stream:
+            self._save_contexts([c for c in changed if c.type == 'folder'])
+        else:
+            self._save_contexts(changed)
+        if removed:
+            self._delete_contexts(removed)
         
         # Generate summary report
         summary = self._generate_summary(contexts)
@@ -197,52 +1136,162 @@ class EngineeringDataContextGenerator:
         return {
             'status': 'success',
             'contexts_created': len(contexts),
+            'contexts_updated': len(changed),
+            'contexts_removed': len(removed),
             'summary': summary,
             'output_location': str(self.context_dir)
         }
     
-    def _create_folder_context(self, folder_path: Path) -> DataContext:
-        """Create context for a folder."""
+    def _collect_contexts(self, folder_path: Path,
+                          walk: Optional[ContextWalk] = None) -> List[DataContext]:
+        """Walk a folder tree once, building file and folder contexts bottom-up.
+        
+        When ``walk.previous`` is given, stored contexts are reused for unchanged
+        paths and popped as they are seen, leaving only vanished paths behind.
+        Newly built contexts are appended to ``walk.updated``.
+        """
+        walk = walk or ContextWalk()
+        self._aggregate_folder(folder_path, walk)
+        if walk.pool is not None:
+            walk.pool.join()
+        return walk.contexts
+    
+    def _aggregate_folder(self, folder_path: Path, walk: ContextWalk) -> FolderAggregate:
+        """Visit a folder in post-order and append its contexts.
+        
+        The folder context is created after its children so that sizes, data
+        types and the Merkle-style content hash are rolled up from child
+        aggregates instead of rescanning the subtree. Its slot is reserved
+        up front so output keeps the folder-then-contents ordering. A folder
+        is dirty when any child changed or its hash differs from the stored one.
+        """
+        contexts = walk.contexts
+        previous = walk.previous
+        slot = len(contexts)
+        contexts.append(None)
         
-        # Calculate folder statistics
-        file_count = len(list(folder_path.glob('*')))
-        total_size = sum(f.stat().st_size for f in folder_path.rglob('*') if f.is_file())
+        try:
+            with os.scandir(folder_path) as it:
+                entries = sorted(it, key=lambda e: e.name)
+        except OSError:
+            entries = []
         
-        # Identify data types in folder
-        data_types = set()
-        for file in folder_path.glob('*'):
-            if file.is_file():
-                ext = file.suffix.lower()
-                if ext in self.engineering_extensions:
-                    data_types.add(self.engineering_extensions[ext])
+        hasher = hashlib.md5()
+        aggregate = FolderAggregate(entry_count=len(entries), dirty=previous is None)
+        child_dirs = []
+        
+        for entry in entries:
+            try:
+                if entry.is_dir():
+                    aggregate.subdirectories.append(entry.name)
+                    # Skip hidden directories and never follow directory symlinks
+                    if not entry.name.startswith('.') and not entry.is_symlink():
+                        child_dirs.append(entry)
+                    continue
+                stat_result = entry.stat()
+            except OSError:
+                continue
+            
+            aggregate.total_size_bytes += stat_result.st_size
+            hasher.update(entry.name.encode())
+            hasher.update(str(stat_result.st_size).encode())
+            hasher.update(str(stat_result.st_mtime).encode())
+            
+            data_type = self.engineering_extensions.get(Path(entry.name).suffix.lower())
+            if data_type is None:
+                continue
+            aggregate.data_types.add(data_type)
+            
+            stored = previous.pop(entry.path, None) if previous is not None else None
+            if stored is not None and self._is_unchanged(stored, stat_result):
+                contexts.append(stored)
+                continue
+            
+            aggregate.dirty = True
+            contexts.append(None)
+            if walk.pool is not None:
+                walk.pool.submit(Path(entry.path), stat_result,
+                                 partial(self._file_context_ready, walk, len(contexts) - 1))
+            else:
+                self._file_context_ready(walk, len(contexts) - 1,
+                                         self._create_file_context(Path(entry.path), stat_result))
+        
+        aggregate.subtree_data_types.update(aggregate.data_types)
+        
+        for entry in child_dirs:
+            child = self._aggregate_folder(Path(entry.path), walk)
+            aggregate.dirty = aggregate.dirty or child.dirty
+            aggregate.total_size_bytes += child.total_size_bytes
+            aggregate.subtree_data_types.update(child.subtree_data_types)
+            hasher.update(entry.name.encode())
+            hasher.update(child.content_hash.encode())
+        
+        aggregate.content_hash = hasher.hexdigest()
+        
+        stored = previous.pop(str(folder_path), None) if previous is not None else None
+        if (stored is not None and not aggregate.dirty
+                and stored.content_hash == aggregate.content_hash
+                and stored.metadata.get('file_count') == aggregate.entry_count):
+            contexts[slot] = stored
+            return aggregate
+        
+        aggregate.dirty = True
+        contexts[slot] = self._create_folder_context(folder_path, aggregate)
+        walk.updated.append(contexts[slot])
+        return aggregate
+    
+    def _file_context_ready(self, walk: ContextWalk, slot: int, file_context: DataContext):
+        """Place a freshly built file context into its reserved slot."""
+        walk.contexts[slot] = file_context
+        walk.updated.append(file_context)
+        if walk.on_file_context is not None:
+            walk.on_file_context(file_context)
+    
+    def _is_unchanged(self, stored: DataContext, stat_result: os.stat_result) -> bool:
+        """Check whether a stored file context still matches the file on disk."""
+        metadata = stored.metadata
+        strategy = self._fingerprint_strategy(metadata.get('data_type'))
+        return (metadata.get('hash_strategy') == strategy
+                and metadata.get('size_bytes') == stat_result.st_size
+                and metadata.get('mtime_ns') == stat_result.st_mtime_ns
+                and metadata.get('inode') == stat_result.st_ino)
+    
+    def _create_folder_context(self, folder_path: Path,
+                               aggregate: FolderAggregate) -> DataContext:
+        """Create context for a folder from its rolled-up child statistics."""
+        
+        file_count = aggregate.entry_count
+        data_types = sorted(aggregate.data_types)
         
         metadata = {
             'file_count': file_count,
-            'total_size_bytes': total_size,
-            'data_types': list(data_types),
-            'subdirectories': [d.name for d in folder_path.iterdir() if d.is_dir()]
+            'total_size_bytes': aggregate.total_size_bytes,
+            'data_types': data_types,
+            'subtree_data_types': sorted(aggregate.subtree_data_types),
+            'subdirectories': aggregate.subdirectories
         }
         
-        # Generate content hash for folder
-        content_hash = self._generate_folder_hash(folder_path)
-        
         return DataContext(
             path=str(folder_path),
             type='folder',
             name=folder_path.name,
             description=f"Folder containing {file_count} items",
             metadata=metadata,
-            content_hash=content_hash,
+            content_hash=aggregate.content_hash,
             data_schema=None,
             related_docs=[],
             web_research=None,
             last_updated=datetime.now().isoformat(),
-            tags=list(data_types),
+            tags=data_types,
             module_assignment=None
         )
     
-    def _create_file_context(self, file_path: Path) -> Optional[DataContext]:
-        """Create context for a data file."""
+    def _create_file_context(self, file_path: Path,
+                             stat_result: Optional[os.stat_result] = None) -> Optional[DataContext]:
+        """Create context for a data file.
+        
+        ``stat_result`` may be passed in by the tree walk to avoid re-stat'ing.
+        """
         
         ext = file_path.suffix.lower()
         
@@ -251,23 +1300,30 @@ class EngineeringDataContextGenerator:
             return None
         
         data_type = self.engineering_extensions[ext]
+        if stat_result is None:
+            stat_result = file_path.stat()
+        hash_strategy = self._fingerprint_strategy(data_type)
         
         # Extract metadata
         metadata = {
-            'size_bytes': file_path.stat().st_size,
+            'size_bytes': stat_result.st_size,
             'extension': ext,
             'data_type': data_type,
-            'modified': datetime.fromtimestamp(file_path.stat().st_mtime).isoformat()
+            'modified': datetime.fromtimestamp(stat_result.st_mtime).isoformat(),
+            'mtime_ns': stat_result.st_mtime_ns,
+            'inode': stat_result.st_ino,
+            'hash_strategy': hash_strategy
         }
         
         # Generate content hash
-        content_hash = self._generate_file_hash(file_path)
+        content_hash = self._generate_file_hash(file_path, stat_result.st_size, hash_strategy)
         
         # Extract data schema if possible
         data_schema = self._extract_data_schema(file_path, data_type)
         
         # Auto-generate description
-        description = self._generate_description(file_path, data_type, data_schema)
+        description = self._generate_description(file_path, data_type, data_schema,
+                                                 stat_result.st_size)
         
         # Extract tags from filename and path
         tags = self._extract_tags(file_path)
@@ -288,33 +1344,26 @@ class EngineeringDataContextGenerator:
             module_assignment=None
         )
     
-    def _generate_folder_hash(self, folder_path: Path) -> str:
-        """Generate hash for folder contents."""
-        hasher = hashlib.md5()
-        
-        for file in sorted(folder_path.rglob('*')):
-            if file.is_file():
-                hasher.update(file.name.encode())
-                hasher.update(str(file.stat().st_size).encode())
-                hasher.update(str(file.stat().st_mtime).encode())
-        
-        return hasher.hexdigest()
+    @staticmethod
+    def _resolve_fingerprint(strategy: str) -> str:
+        """Validate a fingerprint strategy name, resolving the 'fast' alias."""
+        if strategy == 'fast':
+            return FAST_FINGERPRINT
+        if strategy not in FINGERPRINT_STRATEGIES:
+            raise ValueError(f"Unknown fingerprint strategy: {strategy}")
+        return strategy
     
-    def _generate_file_hash(self, file_path: Path) -> str:
-        """Generate hash for file contents."""
-        hasher = hashlib.md5()
-        
-        # For large files, hash only first and last chunks
-        if file_path.stat().st_size > 10 * 1024 * 1024:  # 10MB
-            with open(file_path, 'rb') as f:
-                hasher.update(f.read(1024 * 1024))  # First 1MB
-                f.seek(-1024 * 1024, 2)  # Last 1MB
-                hasher.update(f.read())
-        else:
-            with open(file_path, 'rb') as f:
-                hasher.update(f.read())
-        
-        return hasher.hexdigest()
+    def _fingerprint_strategy(self, data_type: Optional[str]) -> str:
+        """Name of the fingerprint strategy configured for a data type."""
+        return self.fingerprint_strategies.get(data_type, self.default_fingerprint)
+    
+    def _generate_file_hash(self, file_path: Path, size_bytes: Optional[int] = None,
+                            strategy: Optional[str] = None) -> str:
+        """Generate hash for file contents with the given fingerprint strategy."""
+        if size_bytes is None:
+            size_bytes = file_path.stat().st_size
+        strategy = strategy or self.default_fingerprint
+        return FINGERPRINT_STRATEGIES[strategy](file_path, size_bytes)
     
     def _extract_data_schema(self, file_path: Path, data_type: str) -> Optional[Dict]:
         """Extract schema information from data files."""
@@ -336,71 +1385,195 @@ class EngineeringDataContextGenerator:
         return schema
     
     def _extract_tabular_schema(self, file_path: Path) -> Dict:
-        """Extract schema from CSV/Excel files."""
+        """Extract schema from CSV/Excel files.
+        
+        CSV row counts come from a binary block scan that honours quoted
+        newlines, and dtypes are inferred from a reservoir sample of
+        ``sample_rows`` records drawn across the whole file.
+        """
         schema = {'columns': [], 'row_count': 0}
         
-        try:
-            import pandas as pd
-            
-            if file_path.suffix == '.csv':
-                df = pd.read_csv(file_path, nrows=5)
-            else:
-                df = pd.read_excel(file_path, nrows=5)
+        if file_path.suffix != '.csv':
+            try:
+                import pandas as pd
+            except ImportError:
+                return schema
             
+            df = pd.read_excel(file_path, nrows=5)
             schema['columns'] = list(df.columns)
             schema['dtypes'] = {col: str(dtype) for col, dtype in df.dtypes.items()}
-            
-            # Get full row count
-            if file_path.suffix == '.csv':
-                with open(file_path, 'r') as f:
-                    schema['row_count'] = sum(1 for _ in f) - 1
-            
+            return schema
+        
+        with open(file_path, 'r', newline='', errors='replace') as f:
+            schema['columns'] = next(csv.reader(f), [])
+        
+        scan = self._scan_csv(file_path)
+        schema['row_count'] = scan['row_count']
+        schema['row_count_exact'] = scan['exact']
+        schema['sampled_rows'] = len(scan['sample'])
+        
+        try:
+            import pandas as pd
         except ImportError:
-            # Fallback for CSV without pandas
-            if file_path.suffix == '.csv':
-                with open(file_path, 'r') as f:
-                    header = f.readline().strip()
-                    schema['columns'] = header.split(',')
-                    schema['row_count'] = sum(1 for _ in f)
+            # Without pandas only columns and row count are reported
+            return schema
+        
+        # pandas rejects duplicate names, so repeats are mangled as it does for headers
+        columns = self._unique_column_names(schema['columns'])
+        if scan['sample']:
+            df = pd.read_csv(io.BytesIO(b'\n'.join(scan['sample'])), header=None,
+                             names=columns, on_bad_lines='skip')
+        else:
+            df = pd.read_csv(file_path, nrows=0)
+        schema['dtypes'] = {col: str(dtype) for col, dtype in df.dtypes.items()}
         
         return schema
     
+    @staticmethod
+    def _unique_column_names(columns: List[str]) -> List[str]:
+        """Make header names unique, renaming repeats to 'name.1', 'name.2', ..."""
+        seen: Dict[str, int] = {}
+        unique = []
+        for column in columns:
+            name = column
+            while name in seen:
+                seen[column] += 1
+                name = f"{column}.{seen[column]}"
+            seen[name] = 0
+            unique.append(name)
+        return unique
+    
+    @staticmethod
+    def _split_records(data: bytes) -> Tuple[List[bytes], bytes]:
+        """Split bytes that start at a record boundary into whole CSV records.
+        
+        Only newlines outside quoted fields end a record. Returns the complete
+        records and the incomplete remainder.
+        """
+        records = []
+        start = position = 0
+        for index, segment in enumerate(data.split(b'"')):
+            if index % 2 == 0:
+                newline = segment.find(b'\n')
+                while newline != -1:
+                    records.append(data[start:position + newline])
+                    start = position + newline + 1
+                    newline = segment.find(b'\n', newline + 1)
+            position += len(segment) + 1
+        return records, data[start:]
+    
+    @staticmethod
+    def _last_record_break(segments: List[bytes], in_quotes: bool) -> int:
+        """Offset of the last newline outside quotes in a block split on quotes, or -1."""
+        position = sum(len(segment) for segment in segments) + len(segments) - 1
+        for index in range(len(segments) - 1, -1, -1):
+            segment = segments[index]
+            position -= len(segment)
+            if (index + in_quotes) % 2 == 0:
+                newline = segment.rfind(b'\n')
+                if newline != -1:
+                    return position + newline
+            position -= 1  # the quote before this segment
+        return -1
+    
+    def _scan_csv(self, file_path: Path) -> Dict[str, Any]:
+        """Count CSV records and reservoir-sample data records in one binary pass.
+        
+        Newlines inside quoted fields are not counted as record breaks, and
+        sampled records keep their quoted newlines. Records are sampled with
+        Algorithm L, so blocks holding no picked record are only counted,
+        never split. Once ``count_limit_bytes`` has been read the scan stops
+        and the row count is extrapolated from the bytes seen so far.
+        """
+        size = file_path.stat().st_size
+        k = self.sample_rows
+        rng = random.Random(size)  # deterministic per file size
+        
+        records = 0
+        in_quotes = False
+        bytes_read = 0
+        last_byte = b'\n'
+        exact = True
+        
+        # Record 0 is the header, so data record i is record i + 1. The carry
+        # always starts at a record boundary.
+        carry = b''
+        reservoir: List[bytes] = []
+        weight = math.exp(math.log(rng.random()) / k) if k else 0.0
+        # The first pick skips ahead from the initial weight like every later one
+        next_pick = k + int(math.log(rng.random()) / math.log(1 - weight)) if k else 0
+        
+        def offer(index: int, record: bytes):
+            nonlocal weight, next_pick
+            if index < k:
+                reservoir.append(record)
+            elif index == next_pick:
+                reservoir[rng.randrange(k)] = record
+                weight *= math.exp(math.log(rng.random()) / k)
+                next_pick += int(math.log(rng.random()) / math.log(1 - weight)) + 1
+        
+        with open(file_path, 'rb') as f:
+            while True:
+                block = f.read(self.CSV_BLOCK_SIZE)
+                if not block:
+                    break
+                bytes_read += len(block)
+                last_byte = block[-1:]
+                
+                # Record breaks: newlines outside quoted segments only
+                block_in_quotes = in_quotes
+                segments = None
+                if in_quotes or b'"' in block:
+                    segments = block.split(b'"')
+                    breaks = sum(s.count(b'\n') for s in segments[int(in_quotes)::2])
+                    if len(segments) % 2 == 0:
+                        in_quotes = not in_quotes
+                else:
+                    breaks = block.count(b'\n')
+                
+                # Data indices of the records completed by this block
+                first_data = records - 1
+                last_data = first_data + breaks - 1
+                records += breaks
+                if k and last_data >= 0 and (first_data < k or next_pick <= last_data):
+                    complete, carry = self._split_records(carry + block)
+                    for offset, record in enumerate(complete):
+                        if first_data + offset >= 0:
+                            offer(first_data + offset, record)
+                elif breaks:
+                    last_break = (block.rfind(b'\n') if segments is None
+                                  else self._last_record_break(segments, block_in_quotes))
+                    carry = block[last_break + 1:]
+                else:
+                    carry += block
+                
+                if self.count_limit_bytes and bytes_read >= self.count_limit_bytes:
+                    exact = bytes_read >= size
+                    break
+        
+        # A final record without a trailing newline still counts
+        if bytes_read and last_byte != b'\n':
+            records += 1
+            if exact and k and records >= 2:
+                offer(records - 2, carry)
+        if not exact:
+            records = int(records * size / bytes_read)
+        
+        return {
+            'row_count': max(records - 1, 0),
+            'exact': exact,
+            'sample': [record for record in reservoir if record.strip()]
+        }
+    
     def _extract_json_schema(self, file_path: Path) -> Dict:
-        """Extract schema from JSON files."""
+        """Extract schema from JSON files by streaming parse events."""
         with open(file_path, 'r') as f:
-            data = json.load(f)
-        
-        return self._infer_json_schema(data)
-    
-    def _infer_json_schema(self, data: Any, depth: int = 0) -> Dict:
-        """Recursively infer JSON schema."""
-        if depth > 3:  # Limit recursion depth
-            return {'type': 'unknown'}
-        
-        if isinstance(data, dict):
-            properties = {}
-            for key, value in list(data.items())[:10]:  # Sample first 10 keys
-                properties[key] = self._infer_json_schema(value, depth + 1)
-            return {'type': 'object', 'properties': properties}
-        elif isinstance(data, list):
-            if data:
-                return {'type': 'array', 'items': self._infer_json_schema(data[0], depth + 1)}
-            return {'type': 'array'}
-        elif isinstance(data, str):
-            return {'type': 'string'}
-        elif isinstance(data, (int, float)):
-            return {'type': 'number'}
-        elif isinstance(data, bool):
-            return {'type': 'boolean'}
-        else:
-            return {'type': 'null'}
+            return self.schema_inferer.infer(iter_json_events(f))
     
     def _extract_yaml_schema(self, file_path: Path) -> Dict:
-        """Extract schema from YAML files."""
+        """Extract schema from YAML files by streaming parse events."""
         with open(file_path, 'r') as f:
-            data = yaml.safe_load(f)
-        
-        return self._infer_json_schema(data)
+            return self.schema_inferer.infer(iter_yaml_events(f))
     
     def _extract_database_schema(self, file_path: Path) -> Dict:
         """Extract schema from database files."""
@@ -431,22 +1604,25 @@ class EngineeringDataContextGenerator:
         return schema
     
     def _generate_description(self, file_path: Path, data_type: str, 
-                            schema: Optional[Dict]) -> str:
+                            schema: Optional[Dict], size_bytes: Optional[int] = None) -> str:
         """Generate human-readable description of data file."""
         
-        size_mb = file_path.stat().st_size / (1024 * 1024)
+        if size_bytes is None:
+            size_bytes = file_path.stat().st_size
+        size_mb = size_bytes / (1024 * 1024)
         desc_parts = [f"{data_type.replace('_', ' ').title()} file"]
         
         if size_mb >= 1:
             desc_parts.append(f"({size_mb:.1f} MB)")
         else:
-            desc_parts.append(f"({file_path.stat().st_size} bytes)")
+            desc_parts.append(f"({size_bytes} bytes)")
         
         if schema:
             if 'columns' in schema:
                 desc_parts.append(f"with {len(schema['columns'])} columns")
                 if 'row_count' in schema:
-                    desc_parts.append(f"and {schema['row_count']} rows")
+                    approx = '' if schema.get('row_count_exact', True) else '~'
+                    desc_parts.append(f"and {approx}{schema['row_count']} rows")
             elif 'tables' in schema:
                 desc_parts.append(f"containing {len(schema['tables'])} tables")
         
@@ -481,39 +1657,80 @@ class EngineeringDataContextGenerator:
     def _perform_deep_research(self, contexts: List[DataContext]) -> List[DataContext]:
         """Perform deep web research for contexts."""
         
-        research_cache = self._load_research_cache()
-        
-        with ThreadPoolExecutor(max_workers=3) as executor:
-            futures = []
-            
-            for context in contexts:
-                # Generate research queries based on context
-                queries = self._generate_research_queries(context)
-                
-                for query in queries[:2]:  # Limit queries per context
-                    query_hash = hashlib.md5(query.encode()).hexdigest()
-                    
-                    if query_hash not in research_cache:
-                        future = executor.submit(self._web_research, query)
-                        futures.append((future, context, query, query_hash))
+        jobs = []
+        for context in contexts:
+            # Generate research queries based on context
+            queries = self._generate_research_queries(context)
             
-            # Collect research results
-            for future, context, query, query_hash in futures:
-                try:
-                    result = future.result(timeout=30)
-                    if result:
-                        if context.web_research is None:
-                            context.web_research = {}
-                        context.web_research[query] = asdict(result)
-                        
-                        # Cache the result
-                        self._cache_research(query_hash, query, result)
-                        
-                except Exception as e:
-                    print(f"   Research error for '{query}': {e}")
+            for query in queries[:2]:  # Limit queries per context
+                jobs.append((context, query))
         
+        self._run_research(jobs)
         return contexts
     
+    def _run_research(self, jobs: List[Tuple[DataContext, str]]):
+        """Attach research results for (context, query) jobs.
+        
+        Each query is looked up in the cache first; misses are fetched once per
+        distinct query by the async stage and handled in completion order.
+        """
+        pending: Dict[str, Tuple[str, List[DataContext]]] = {}
+        ttl = self.research_config.ttl_seconds
+        
+        for context, query in jobs:
+            query_hash = hashlib.md5(query.encode()).hexdigest()
+            if query_hash in pending:
+                pending[query_hash][1].append(context)
+                continue
+            
+            cached = self.store.get_research(query_hash, ttl)
+            if cached is not None:
+                self._attach_research(context, query, cached)
+            else:
+                pending[query_hash] = (query, [context])
+        
+        if pending:
+            print(f"   {len(jobs) - sum(len(c) for _, c in pending.values())} cached, "
+                  f"{len(pending)} queries to fetch")
+            asyncio.run(self._research_async(pending))
+        
+        self.store.evict_research(self.research_config.cache_size)
+        self.store.commit()
+    
+    async def _research_async(self, pending: Dict[str, Tuple[str, List[DataContext]]]):
+        """Fetch uncached queries concurrently and cache results as they arrive."""
+        fetcher = ResearchFetcher(self._web_research, self._research_host, self.research_config)
+        
+        async def run(query_hash: str, query: str):
+            try:
+                return query_hash, await fetcher.research(query), None
+            except Exception as e:
+                return query_hash, None, e
+        
+        tasks = [run(query_hash, query) for query_hash, (query, _) in pending.items()]
+        for next_done in asyncio.as_completed(tasks):
+            query_hash, result, error = await next_done
+            query, contexts = pending[query_hash]
+            
+            if error is not None:
+                print(f"   Research error for '{query}': {error!r}")
+            elif result:
+                for context in contexts:
+                    self._attach_research(context, query, asdict(result))
+                
+                # Cache the result
+                self._cache_research(query_hash, query, result)
+    
+    def _attach_research(self, context: DataContext, query: str, result: Dict):
+        if context.web_research is None:
+            context.web_research = {}
+        context.web_research[query] = result
+    
+    def _research_host(self, query: str) -> str:
+        """Host a research query is sent to, used for per-host limits."""
+        endpoint = self.research_config.endpoint
+        return urlparse(endpoint).netloc if endpoint else 'offline'
+    
     def _generate_research_queries(self, context: DataContext) -> List[str]:
         """Generate research queries for a context."""
         queries = []
@@ -539,10 +1756,28 @@ class EngineeringDataContextGenerator:
         return queries
     
     def _web_research(self, query: str) -> Optional[ResearchResult]:
-        """Perform web research for a query."""
-        
-        # This is a simplified implementation
-        # In production, you'd use proper search APIs
+        """Perform web research for a query.
+        
+        With ``research_config.endpoint`` set, the endpoint is queried and its
+        JSON response mapped onto a ResearchResult; otherwise offline
+        placeholder results are returned. Runs in a worker thread.
+        """
+        
+        endpoint = self.research_config.endpoint
+        if endpoint:
+            response = requests.get(endpoint.format(query=quote(query)),
+                                    timeout=self.research_config.timeout)
+            response.raise_for_status()
+            payload = response.json()
+            return ResearchResult(
+                query=query,
+                sources=payload.get('sources', []),
+                summary=payload.get('summary', ''),
+                technical_docs=payload.get('technical_docs', []),
+                code_examples=payload.get('code_examples', []),
+                best_practices=payload.get('best_practices', []),
+                timestamp=datetime.now().isoformat()
+            )
         
         try:
             # Use a documentation search API or web scraper
@@ -562,132 +1797,89 @@ class EngineeringDataContextGenerator:
         except Exception:
             return None
     
-    def _load_research_cache(self) -> Dict[str, ResearchResult]:
-        """Load research cache from database."""
-        cache = {}
-        
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute("SELECT query_hash, results FROM research_cache")
-        for row in cursor.fetchall():
-            cache[row[0]] = json.loads(row[1])
-        
-        conn.close()
-        return cache
-    
     def _cache_research(self, query_hash: str, query: str, result: ResearchResult):
         """Cache research results."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT OR REPLACE INTO research_cache (query_hash, query, results, timestamp)
-            VALUES (?, ?, ?, ?)
-        ''', (query_hash, query, json.dumps(asdict(result)), datetime.now().isoformat()))
-        
-        conn.commit()
-        conn.close()
+        self.store.put_research(query_hash, query, asdict(result))
     
     def _assign_to_modules(self, contexts: List[DataContext]) -> List[DataContext]:
         """Assign contexts to appropriate modules."""
         
-        # Find modules in the repository
-        modules = self._discover_modules()
+        # Find modules in the repository and index them once for this run
+        index = ModuleIndex(self._discover_modules())
+        if not len(index):
+            return contexts
         
+        assigned = {}
         for context in contexts:
             # Determine best module match based on path and tags
-            best_module = self._find_best_module(context, modules)
+            best_module = self._find_best_module(context, index)
             if best_module:
                 context.module_assignment = best_module
-                print(f"   Assigned {context.name} to module: {best_module}")
+                assigned[best_module] = assigned.get(best_module, 0) + 1
+        
+        for module, count in sorted(assigned.items()):
+            print(f"   Assigned {count} contexts to module: {module}")
         
         return contexts
     
-    def _discover_modules(self) -> List[str]:
-        """Discover modules in the repository."""
-        modules = []
+    def _discover_modules(self) -> Dict[str, List[Path]]:
+        """Discover modules in the repository, with their directories."""
+        modules: Dict[str, List[Path]] = {}
+        candidates = []
         
         # Check for specs/modules structure
         specs_modules = self.base_path / 'specs' / 'modules'
         if specs_modules.exists():
-            modules.extend([d.name for d in specs_modules.iterdir() if d.is_dir()])
+            candidates.extend(d for d in specs_modules.iterdir() if d.is_dir())
         
         # Check for src/modules structure
         src_modules = self.base_path / 'src' / 'modules'
         if src_modules.exists():
-            modules.extend([d.name for d in src_modules.iterdir() if d.is_dir()])
+            candidates.extend(d for d in src_modules.iterdir() if d.is_dir())
         
         # Check for top-level module indicators
         for item in self.base_path.iterdir():
             if item.is_dir() and (item / '__init__.py').exists():
-                modules.append(item.name)
+                candidates.append(item)
+        
+        for directory in candidates:
+            modules.setdefault(directory.name, []).append(directory)
         
-        return list(set(modules))
+        return modules
     
-    def _find_best_module(self, context: DataContext, modules: List[str]) -> Optional[str]:
+    def _find_best_module(self, context: DataContext, index: ModuleIndex) -> Optional[str]:
         """Find the best module match for a context."""
         
-        if not modules:
-            return None
-        
-        context_path = Path(context.path)
-        
         # Check if context is already in a module
-        for module in modules:
-            if module in str(context_path):
-                return module
+        module = index.module_for_path(Path(context.path))
+        if module:
+            return module
         
         # Match based on tags and name similarity
-        best_score = 0
-        best_module = None
+        scores: Dict[str, int] = {}
         
-        for module in modules:
-            score = 0
-            
-            # Check name similarity
-            if module.lower() in context.name.lower():
-                score += 3
-            
-            # Check tag matches
-            for tag in context.tags:
-                if tag.lower() in module.lower():
-                    score += 1
-            
-            if score > best_score:
-                best_score = score
-                best_module = module
+        # Check name similarity
+        for module in index.modules_in_name(context.name):
+            scores[module] = scores.get(module, 0) + 3
         
-        return best_module if best_score > 0 else None
+        # Check tag matches
+        for tag in context.tags:
+            for module in index.modules_for_tag(tag):
+                scores[module] = scores.get(module, 0) + 1
+        
+        if not scores:
+            return None
+        return min(scores, key=lambda m: (-scores[m], m))
     
     def _save_contexts(self, contexts: List[DataContext]):
         """Save contexts to database."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        for context in contexts:
-            cursor.execute('''
-                INSERT OR REPLACE INTO data_context 
-                (path, type, name, description, metadata, content_hash, 
-                 data_schema, related_docs, web_research, last_updated, tags, module_assignment)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                context.path,
-                context.type,
-                context.name,
-                context.description,
-                json.dumps(context.metadata),
-                context.content_hash,
-                json.dumps(context.data_schema) if context.data_schema else None,
-                json.dumps(context.related_docs),
-                json.dumps(context.web_research) if context.web_research else None,
-                context.last_updated,
-                json.dumps(context.tags),
-                context.module_assignment
-            ))
-        
-        conn.commit()
-        conn.close()
+        self.store.put_many(contexts)
+        self.store.commit()
+    
+    def _delete_contexts(self, paths: List[str]):
+        """Delete stored contexts for paths that no longer exist."""
+        self.store.delete(paths)
+        self.store.commit()
     
     def _save_agent_formats(self, contexts: List[DataContext], folder_path: Path):
         """Save contexts in agent-friendly formats."""
@@ -721,10 +1913,10 @@ class EngineeringDataContextGenerator:
             modules_dir = output_dir / 'modules'
             modules_dir.mkdir(exist_ok=True)
             
-            for module, contexts in module_contexts.items():
+            for module, module_data in module_contexts.items():
                 module_file = modules_dir / f'{module}_context.json'
                 with open(module_file, 'w') as f:
-                    json.dump(contexts, f, indent=2)
+                    json.dump(module_data, f, indent=2)
         
         # Generate markdown documentation
         self._generate_markdown_docs(contexts, output_dir)
@@ -892,87 +2084,54 @@ To add more research or update existing context:
     
     def _load_contexts(self, folder_path: Path) -> List[DataContext]:
         """Load existing contexts from database."""
-        contexts = []
-        
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
         # Get all contexts under this folder
-        cursor.execute('''
-            SELECT * FROM data_context 
-            WHERE path LIKE ? 
-            ORDER BY path
-        ''', (f"{folder_path}%",))
-        
-        for row in cursor.fetchall():
-            context = DataContext(
-                path=row[0],
-                type=row[1],
-                name=row[2],
-                description=row[3],
-                metadata=json.loads(row[4]) if row[4] else {},
-                content_hash=row[5],
-                data_schema=json.loads(row[6]) if row[6] else None,
-                related_docs=json.loads(row[7]) if row[7] else [],
-                web_research=json.loads(row[8]) if row[8] else None,
-                last_updated=row[9],
-                tags=json.loads(row[10]) if row[10] else [],
-                module_assignment=row[11]
-            )
-            contexts.append(context)
+        return self.store.load(str(folder_path))
+    
+    def _load_previous_contexts(self, folder_path: Path) -> Dict[str, DataContext]:
+        """Load stored contexts for a folder tree, keyed by path."""
+        root = str(folder_path)
+        prefix = os.path.join(root, '')
         
-        conn.close()
-        return contexts
+        # The LIKE prefix also matches sibling folders such as 'data2' for 'data'
+        return {
+            context.path: context
+            for context in self._load_contexts(folder_path)
+            if context.path == root or context.path.startswith(prefix)
+        }
     
     def _research_specific_topics(self, contexts: List[DataContext], 
                                  topics: List[str]) -> List[DataContext]:
         """Research specific topics for contexts."""
         
-        for context in contexts:
-            for topic in topics:
-                query = f"{context.name} {topic}"
-                result = self._web_research(query)
-                
-                if result:
-                    if context.web_research is None:
-                        context.web_research = {}
-                    context.web_research[query] = asdict(result)
-        
+        self._run_research([(context, f"{context.name} {topic}")
+                            for context in contexts for topic in topics])
         return contexts
     
-    def query_context(self, query: str) -> Dict:
-        """Query stored contexts."""
+    def query_context(self, query: str, context_type: Optional[str] = None,
+                      module: Optional[str] = None, tags: Optional[List[str]] = None,
+                      limit: int = 20, offset: int = 0) -> Dict:
+        """Query stored contexts, best BM25 matches first."""
         
         print(f"🔎 Searching for: {query}")
         
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
         # Search in multiple fields
-        cursor.execute('''
-            SELECT path, name, description, tags, module_assignment
-            FROM data_context
-            WHERE name LIKE ? OR description LIKE ? OR tags LIKE ?
-            ORDER BY name
-            LIMIT 20
-        ''', (f"%{query}%", f"%{query}%", f"%{query}%"))
-        
         results = []
-        for row in cursor.fetchall():
+        for row in self.store.search(query, context_type=context_type, module=module,
+                                     tags=tags, limit=limit, offset=offset):
             results.append({
                 'path': row[0],
                 'name': row[1],
                 'description': row[2],
                 'tags': json.loads(row[3]) if row[3] else [],
-                'module': row[4]
+                'module': row[4],
+                'score': row[5]
             })
         
-        conn.close()
-        
         return {
             'query': query,
             'results': results,
-            'count': len(results)
+            'count': len(results),
+            'offset': offset
         }
 
 def main():
@@ -989,16 +2148,77 @@ def main():
                        help='Perform deep web research')
     parser.add_argument('--modules', action='store_true',
                        help='Assign contexts to modules')
+    parser.add_argument('--incremental', action='store_true',
+                       help='Only reprocess files changed since the last run')
+    parser.add_argument('--workers', type=int, default=1,
+                       help='Processes for file hashing and schema extraction')
+    parser.add_argument('--max-pending', type=int,
+                       help='Files in flight before discovery waits (default: 4 x workers)')
+    parser.add_argument('--commit-interval', type=int, default=5000,
+                       help='Rows written per database transaction')
+    parser.add_argument('--fingerprint', choices=sorted([*FINGERPRINT_STRATEGIES, 'fast']),
+                       default='sampled', help='Default content fingerprint strategy')
+    parser.add_argument('--fingerprint-for', nargs='+', metavar='TYPE=STRATEGY',
+                       default=[], help='Fingerprint strategy per data type')
+    parser.add_argument('--sample-rows', type=int, default=1000,
+                       help='CSV rows sampled across the file for dtype inference')
+    parser.add_argument('--count-limit-mb', type=int,
+                       help='Estimate CSV row counts after scanning this many MB')
     parser.add_argument('--research-topics', nargs='+',
                        help='Specific topics to research')
+    parser.add_argument('--research-endpoint', type=str,
+                       help="Search API URL template containing '{query}'")
+    parser.add_argument('--research-concurrency', type=int, default=2,
+                       help='Concurrent research requests per host')
+    parser.add_argument('--research-rate', type=float, default=5.0,
+                       help='Research requests per second per host')
     parser.add_argument('--context', type=str, help='Context query string')
+    parser.add_argument('--type', choices=['file', 'folder'],
+                       help='Only return contexts of this type')
+    parser.add_argument('--module', type=str, help='Only return contexts in this module')
+    parser.add_argument('--tags', nargs='+', help='Only return contexts with these tags')
+    parser.add_argument('--limit', type=int, default=20, help='Maximum results to return')
+    parser.add_argument('--offset', type=int, default=0, help='Results to skip (pagination)')
     parser.add_argument('--format', choices=['json', 'yaml', 'markdown'],
                        default='json', help='Export format')
     
     args = parser.parse_args()
     
-    generator = EngineeringDataContextGenerator()
+    try:
+        research_config = ResearchConfig(
+            endpoint=args.research_endpoint,
+            per_host_limit=args.research_concurrency,
+            rate_per_host=args.research_rate
+        )
+    except ValueError as e:
+        parser.error(str(e))
+    
+    fingerprint_strategies = {}
+    strategy_names = sorted([*FINGERPRINT_STRATEGIES, 'fast'])
+    for item in args.fingerprint_for:
+        data_type, _, strategy = item.partition('=')
+        if not data_type or not strategy:
+            parser.error(f"--fingerprint-for expects TYPE=STRATEGY, got '{item}'")
+        if strategy not in strategy_names:
+            parser.error(f"unknown fingerprint strategy '{strategy}' for {data_type} "
+                         f"(choose from {', '.join(strategy_names)})")
+        fingerprint_strategies[data_type] = strategy
     
+    generator = EngineeringDataContextGenerator(
+        commit_interval=args.commit_interval,
+        sample_rows=args.sample_rows,
+        count_limit_bytes=args.count_limit_mb * 1024 * 1024 if args.count_limit_mb else None,
+        fingerprint_strategies=fingerprint_strategies,
+        default_fingerprint=args.fingerprint,
+        research_config=research_config
+    )
+    
+    # The store holds one connection for the whole command; always release it
+    with generator:
+        _run_command(generator, args)
+
+def _run_command(generator: EngineeringDataContextGenerator, args: argparse.Namespace):
+    """Run one CLI command against an open generator."""
     if args.command == 'generate':
         if not args.folder:
             print("❌ Error: --folder argument required")
@@ -1008,7 +2228,10 @@ def main():
         result = generator.generate_context(
             folder_path,
             deep_research=args.deep_research,
-            use_modules=args.modules
+            use_modules=args.modules,
+            incremental=args.incremental,
+            workers=args.workers,
+            max_pending=args.max_pending
         )
         
         if 'error' in result:
@@ -1016,6 +2239,9 @@ def main():
             sys.exit(1)
         
         print(f"\n✅ Successfully generated context for {result['contexts_created']} items")
+        if args.incremental:
+            print(f"   Updated: {result['contexts_updated']}, "
+                  f"removed: {result['contexts_removed']}")
         print(f"   Output location: {result['output_location']}")
         
         # Display summary
@@ -1043,7 +2269,14 @@ def main():
             print("❌ Error: --context argument required")
             sys.exit(1)
         
-        result = generator.query_context(args.context)
+        result = generator.query_context(
+            args.context,
+            context_type=args.type,
+            module=args.module,
+            tags=args.tags,
+            limit=args.limit,
+            offset=args.offset
+        )
         
         print(f"\n📋 Found {result['count']} matches:")
         for item in result['results']:
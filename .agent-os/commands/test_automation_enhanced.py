@@ -40,12 +40,19 @@ from pathlib import Path
 from typing import Dict, List, Optional, Any, Tuple
 from datetime import datetime
 from dataclasses import dataclass, asdict
+from collections import defaultdict
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import hashlib
 import sqlite3
 import re
 import ast
 import textwrap
+import queue
+import tempfile
+import threading
+import importlib
+import math
+import xml.etree.ElementTree as ET
 
 # Arrange-Act-Assert Pattern Enforcer
 class AAAPatternEnforcer:
@@ -485,6 +492,16 @@ class RepositoryAdapter:
         }
         return defaults.get(self.repo_type, defaults['generic'])
 
+@dataclass
+class TestCaseResult:
+    """Outcome of one test within a test file."""
+    nodeid: str
+    outcome: str  # 'passed', 'failed', 'skipped', 'error'
+    duration: float
+    phase: str = 'call'  # 'collect', 'setup', 'call' or 'teardown'
+    message: Optional[str] = None
+    attempts: int = 1  # more than one when failures were retried
+
 @dataclass
 class TestResult:
     """Represents a single test execution result."""
@@ -497,6 +514,7 @@ class TestResult:
     stdout: Optional[str] = None
     stderr: Optional[str] = None
     coverage_data: Optional[Dict] = None
+    test_cases: Optional[List[TestCaseResult]] = None  # when the runner reports them
 
 @dataclass
 class FailureAnalysis:
@@ -552,68 +570,951 @@ class EnhancedTestDiscovery:
         # Fall back to parent directory name
         return file_path.parent.name
 
+class ImportGraph:
+    """Static import graph of a repository's Python files, cached between runs.
+    
+    Files are parsed with ast and only re-parsed when their size or mtime
+    changes. Each file is known by every dotted suffix of its path
+    (pkg/mod.py is "pkg.mod" and "mod"), so src layouts, namespace packages
+    and test directories on sys.path all resolve; the over-approximation
+    only ever selects extra tests.
+    """
+    
+    SKIP_DIRS = {'__pycache__', 'node_modules', 'venv', 'env', 'site-packages',
+                 'build', 'dist'}
+    
+    def __init__(self, repo_root: Path, cache_path: Path):
+        self.repo_root = repo_root
+        self.cache_path = cache_path
+        self.files: Dict[str, Dict] = {}
+        self.importers: Dict[str, set] = {}
+    
+    def build(self) -> Dict[str, int]:
+        """Parse new and changed files and index who imports what."""
+        cached = {}
+        if self.cache_path.exists():
+            try:
+                with open(self.cache_path) as f:
+                    cached = json.load(f).get('files', {})
+            except (json.JSONDecodeError, OSError):
+                pass
+        
+        parsed = 0
+        self.files = {}
+        for dirpath, dirnames, filenames in os.walk(self.repo_root):
+            dirnames[:] = [d for d in dirnames
+                           if not d.startswith('.') and d not in self.SKIP_DIRS]
+            for filename in filenames:
+                if not filename.endswith('.py'):
+                    continue
+                path = Path(dirpath) / filename
+                rel_path = path.relative_to(self.repo_root).as_posix()
+                stat = path.stat()
+                entry = cached.get(rel_path)
+                if not entry or entry['mtime_ns'] != stat.st_mtime_ns or entry['size'] != stat.st_size:
+                    entry = {
+                        'mtime_ns': stat.st_mtime_ns,
+                        'size': stat.st_size,
+                        'imports': self._parse_imports(path, rel_path)
+                    }
+                    parsed += 1
+                self.files[rel_path] = entry
+        
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.cache_path, 'w') as f:
+            json.dump({'version': 1, 'files': self.files}, f)
+        
+        # Importing a.b.c also runs a and a.b, so every prefix is a dependency
+        self.importers = {}
+        for rel_path, entry in self.files.items():
+            for name in entry['imports']:
+                parts = name.split('.')
+                for i in range(1, len(parts) + 1):
+                    self.importers.setdefault('.'.join(parts[:i]), set()).add(rel_path)
+        
+        return {'files': len(self.files), 'parsed': parsed}
+    
+    @staticmethod
+    def module_names(rel_path: str) -> List[str]:
+        """Every dotted name a file may be imported as."""
+        parts = rel_path[:-3].split('/')
+        if parts[-1] == '__init__':
+            parts = parts[:-1]
+        return ['.'.join(parts[i:]) for i in range(len(parts))]
+    
+    def _parse_imports(self, path: Path, rel_path: str) -> List[str]:
+        """Absolute dotted names a file imports."""
+        try:
+            tree = ast.parse(path.read_bytes())
+        except (SyntaxError, ValueError):
+            return []
+        
+        package = rel_path[:-3].split('/')[:-1]
+        imports = set()
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                imports.update(alias.name for alias in node.names)
+            elif isinstance(node, ast.ImportFrom):
+                if node.level:
+                    base = package[:len(package) - (node.level - 1)] if node.level > 1 else package
+                    prefix = '.'.join(base + ([node.module] if node.module else []))
+                else:
+                    prefix = node.module or ''
+                # "from pkg import name" may import the submodule pkg.name
+                for alias in node.names:
+                    imports.add(f"{prefix}.{alias.name}" if prefix else alias.name)
+        return sorted(imports)
+    
+    def dependents(self, rel_paths: List[str]) -> set:
+        """Files that transitively import any of the given files, themselves included."""
+        impacted = set(rel_paths)
+        pending = list(rel_paths)
+        while pending:
+            rel_path = pending.pop()
+            if not rel_path.endswith('.py'):
+                continue
+            for name in self.module_names(rel_path):
+                for importer in self.importers.get(name, ()):
+                    if importer not in impacted:
+                        impacted.add(importer)
+                        pending.append(importer)
+        return impacted
+
+class TestImpactAnalyzer:
+    """Select the test files affected by changes since a git revision."""
+    
+    # Changes to these affect every test
+    GLOBAL_FILES = {'pyproject.toml', 'setup.py', 'setup.cfg', 'pytest.ini', 'tox.ini',
+                    'requirements.txt', 'conftest.py'}
+    
+    def __init__(self, adapter: RepositoryAdapter):
+        self.adapter = adapter
+        self.graph = ImportGraph(
+            adapter.repo_root,
+            adapter.repo_root / '.test_automation' / 'import_graph.json'
+        )
+    
+    def changed_files(self, since: str = 'HEAD') -> Optional[List[str]]:
+        """Files changed since a revision, uncommitted and untracked ones included.
+        
+        Branch revisions are compared from their merge base, so only this
+        branch's changes count. Returns None when git cannot tell.
+        """
+        def git(*args) -> Optional[str]:
+            process = subprocess.run(['git', *args], capture_output=True, text=True,
+                                     cwd=self.adapter.repo_root)
+            return process.stdout if process.returncode == 0 else None
+        
+        base = (git('merge-base', since, 'HEAD') or '').strip() or since
+        # Without rename detection a moved file is its old and new path, so
+        # tests importing the old name are still selected
+        diff = git('diff', '--name-only', '--no-renames', base)
+        untracked = git('ls-files', '--others', '--exclude-standard')
+        if diff is None or untracked is None:
+            return None
+        # This tool's own state is not a change under test
+        return sorted(path for path in set(diff.split('\n') + untracked.split('\n'))
+                      if path and not path.startswith('.test_automation/'))
+    
+    def select(self, tests: Dict[str, List[Path]], changed: List[str],
+               previously_failed: set) -> Tuple[Dict[str, List[Path]], Dict]:
+        """Test files importing a changed file, directly or not, plus previous failures."""
+        stats = {'changed_files': len(changed), 'full_run': False}
+        stats.update(self.graph.build())
+        
+        root = self.adapter.repo_root.resolve()
+        def rel(test_file: Path) -> str:
+            return test_file.resolve().relative_to(root).as_posix()
+        
+        conftest_dirs = []
+        if any(path in self.GLOBAL_FILES for path in changed):
+            stats['full_run'] = True
+            impacted = None
+        else:
+            impacted = self.graph.dependents(changed)
+            # A conftest applies to every test below its directory
+            conftest_dirs = [path[:-len('conftest.py')] for path in impacted
+                             if path.endswith('/conftest.py')]
+        
+        selected = {}
+        for module, test_files in tests.items():
+            for test_file in test_files:
+                path = rel(test_file)
+                if (impacted is None or path in impacted
+                        or path in previously_failed
+                        or any(path.startswith(d) for d in conftest_dirs)):
+                    selected.setdefault(module, []).append(test_file)
+        
+        stats['selected_tests'] = sum(len(v) for v in selected.values())
+        stats['total_tests'] = sum(len(v) for v in tests.values())
+        return selected, stats
+
+class PytestWorker:
+    """One long-lived pytest process fed test files over a pipe."""
+    
+    def __init__(self, cwd: Path, preload: List[str]):
+        self.cwd = cwd
+        self.preload = preload
+        self.process = None
+        self.responses = None
+        self.runs = 0
+        self.exited = False  # worker closed its output
+        self.preload_errors = {}  # preload module -> import error
+    
+    def alive(self) -> bool:
+        """Whether the worker process is running."""
+        return self.process is not None and self.process.poll() is None
+    
+    def start(self, timeout: float = 60) -> bool:
+        """Start the worker and wait until pytest and preloads are imported."""
+        self.process = subprocess.Popen(
+            [sys.executable, str(Path(__file__).resolve()), PytestWorkerPool.WORKER_FLAG,
+             *self.preload],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            cwd=self.cwd,
+            text=True,
+            bufsize=1
+        )
+        self.responses = queue.Queue()
+        self.runs = 0
+        self.exited = False
+        threading.Thread(target=self._read, args=(self.process, self.responses),
+                         daemon=True).start()
+        
+        ready = self._receive(timeout)
+        if ready is None or not ready.get('ready'):
+            self.stop()
+            return False
+        self.preload_errors = ready.get('preload_errors', {})
+        return True
+    
+    @staticmethod
+    def _read(process: subprocess.Popen, responses: queue.Queue):
+        """Forward response lines from the worker; None marks its exit."""
+        for line in process.stdout:
+            responses.put(line)
+        responses.put(None)
+    
+    def _receive(self, timeout: float) -> Optional[Dict]:
+        """Next response, or None if the worker exited or timed out."""
+        try:
+            line = self.responses.get(timeout=timeout)
+        except queue.Empty:
+            return None
+        if line is None:
+            self.exited = True
+            return None
+        return json.loads(line)
+    
+    def run(self, test_file: Path, args: List[str], timeout: float) -> Dict:
+        """Run one test file; crashed or hung workers are stopped."""
+        try:
+            self.process.stdin.write(json.dumps({'file': str(test_file), 'args': args}) + '\n')
+            self.process.stdin.flush()
+        except (BrokenPipeError, OSError):
+            pass  # already dead; reported below
+        
+        response = self._receive(timeout)
+        if response is not None:
+            self.runs += 1
+            return response
+        
+        # Output closes before the exit is reaped, so check it, not poll()
+        if not self.exited:
+            self.stop(kill=True)
+            return {'timed_out': True}
+        self.process.wait()
+        return {'crashed': True, 'returncode': self.process.returncode}
+    
+    def stop(self, kill: bool = False):
+        """Stop the worker process; hung workers are killed outright."""
+        if self.process is None:
+            return
+        if self.process.poll() is None and kill:
+            self.process.kill()
+            self.process.wait()
+        elif self.process.poll() is None:
+            try:
+                self.process.stdin.close()
+                self.process.wait(timeout=5)
+            except (OSError, subprocess.TimeoutExpired):
+                self.process.kill()
+                self.process.wait()
+
+
+class PytestWorkerPool:
+    """Warm pytest workers that skip interpreter, plugin and import startup per test file.
+    
+    Each worker imports pytest (and any preload modules) once, then runs
+    test files in-process with pytest.main and streams back structured
+    results. A worker that crashes or exceeds the timeout is killed and
+    restarted for the next file; workers are also recycled after
+    recycle_after files so state leaked by tests stays bounded.
+    """
+    
+    WORKER_FLAG = '--pytest-worker'
+    
+    def __init__(self, cwd: Path, size: int, preload: List[str] = None,
+                 timeout: float = 300, recycle_after: int = 200):
+        self.timeout = timeout
+        self.recycle_after = recycle_after
+        self.workers = [PytestWorker(cwd, list(preload or [])) for _ in range(size)]
+        self.preload_errors = {}
+        self.lock = threading.Lock()
+        self.idle = queue.Queue()
+        for worker in self.workers:
+            self.idle.put(worker)
+    
+    def run(self, test_file: Path, args: List[str]) -> Dict:
+        """Run a test file on the next idle worker."""
+        worker = self.idle.get()
+        try:
+            if not worker.alive():
+                if not worker.start():
+                    return {'crashed': True, 'returncode': worker.process.returncode}
+                self._report_preload_errors(worker.preload_errors)
+            response = worker.run(test_file, args, self.timeout)
+            if worker.runs >= self.recycle_after:
+                worker.stop()
+            return response
+        finally:
+            self.idle.put(worker)
+    
+    def _report_preload_errors(self, errors: Dict[str, str]):
+        """Warn once about each preload module the workers could not import."""
+        with self.lock:
+            for module_name, error in errors.items():
+                if module_name not in self.preload_errors:
+                    self.preload_errors[module_name] = error
+                    print(f"   ⚠️  Test workers could not preload {module_name}: {error}")
+    
+    def close(self):
+        """Stop every worker."""
+        for worker in self.workers:
+            worker.stop()
+
+
+class _PytestReportCollector:
+    """pytest plugin recording each test's outcome inside a worker."""
+    
+    def __init__(self):
+        self.tests = []
+    
+    def pytest_runtest_logreport(self, report):
+        # Setup and teardown only matter when they did not pass; failing
+        # there is an error, as in JUnit reports
+        if report.when == 'call' or not report.passed:
+            self.tests.append({
+                'nodeid': report.nodeid,
+                'outcome': 'error' if report.failed and report.when != 'call' else report.outcome,
+                'duration': report.duration,
+                'phase': report.when,
+                'message': self._message(report)
+            })
+    
+    @staticmethod
+    def _message(report) -> Optional[str]:
+        if report.failed:
+            return str(report.longrepr)
+        if report.skipped and isinstance(report.longrepr, tuple):
+            # (path, line, "Skipped: reason")
+            return report.longrepr[2].replace('Skipped: ', '', 1)
+        return None
+    
+    def pytest_collectreport(self, report):
+        # Module-level skips are recorded like JUnit reports record them
+        if report.failed or (report.skipped and report.nodeid.endswith('.py')):
+            self.tests.append({
+                'nodeid': report.nodeid,
+                'outcome': 'error' if report.failed else 'skipped',
+                'duration': 0.0,
+                'phase': 'collect',
+                'message': self._message(report)
+            })
+
+
+def _pytest_worker_main(preload: List[str]):
+    """Serve test file requests from the parent until stdin closes."""
+    # The protocol keeps copies of stdin/stdout; fds 0-2 are left to tests
+    requests = os.fdopen(os.dup(0), 'r')
+    responses = os.fdopen(os.dup(1), 'w', buffering=1)
+    devnull = os.open(os.devnull, os.O_RDWR)
+    os.dup2(devnull, 0)
+    
+    import pytest
+    preload_errors = {}
+    for module_name in preload:
+        try:
+            importlib.import_module(module_name)
+        except Exception as e:
+            # Tests still import the module themselves; the parent reports it
+            preload_errors[module_name] = f"{type(e).__name__}: {e}"
+    responses.write(json.dumps({'ready': True, 'pid': os.getpid(),
+                                'preload_errors': preload_errors}) + '\n')
+    
+    for line in requests:
+        request = json.loads(line)
+        loaded = set(sys.modules)
+        collector = _PytestReportCollector()
+        start_time = time.time()
+        
+        with tempfile.TemporaryFile() as out, tempfile.TemporaryFile() as err:
+            saved = os.dup(1), os.dup(2)
+            sys.stdout.flush()
+            sys.stderr.flush()
+            os.dup2(out.fileno(), 1)
+            os.dup2(err.fileno(), 2)
+            try:
+                exit_code = int(pytest.main([request['file'], *request['args']],
+                                            plugins=[collector]))
+            except Exception as e:
+                exit_code = -1
+                print(f"Worker error: {e}", file=sys.stderr)
+            finally:
+                sys.stdout.flush()
+                sys.stderr.flush()
+                os.dup2(saved[0], 1)
+                os.dup2(saved[1], 2)
+                os.close(saved[0])
+                os.close(saved[1])
+            out.seek(0)
+            err.seek(0)
+            stdout = out.read().decode('utf-8', 'replace')
+            stderr = err.read().decode('utf-8', 'replace')
+        
+        # Forget test modules and conftests so the next file imports them
+        # fresh; library modules they imported stay warm
+        for name in set(sys.modules) - loaded:
+            module_file = os.path.basename(getattr(sys.modules[name], '__file__', None) or '')
+            if module_file.startswith('test_') or module_file.endswith('_test.py') \
+                    or module_file == 'conftest.py':
+                del sys.modules[name]
+        
+        responses.write(json.dumps({
+            'exit_code': exit_code,
+            'duration': time.time() - start_time,
+            'tests': collector.tests,
+            'stdout': stdout,
+            'stderr': stderr
+        }) + '\n')
+
+class TestDurationStore:
+    """Per-file test durations and last outcomes carried across runs."""
+    
+    def __init__(self, path: Path, smoothing: float = 0.5):
+        self.path = path
+        self.smoothing = smoothing  # weight of the newest run in the moving average
+        self.durations = self._load()
+    
+    def _load(self) -> Dict[str, Dict]:
+        """Load stored durations."""
+        if self.path.exists():
+            try:
+                with open(self.path) as f:
+                    return json.load(f)
+            except (json.JSONDecodeError, OSError):
+                pass
+        return {}
+    
+    def estimate(self, key: str) -> Optional[float]:
+        """Expected duration of a test file, if it ran before."""
+        entry = self.durations.get(key)
+        return entry.get('duration') if entry else None
+    
+    def record(self, key: str, duration: float, status: str):
+        """Fold one run into the moving average and remember its outcome."""
+        entry = self.durations.setdefault(key, {'duration': None, 'runs': 0})
+        if duration > 0:  # crashed workers report no duration
+            if entry['duration'] is None:
+                entry['duration'] = duration
+            else:
+                entry['duration'] += self.smoothing * (duration - entry['duration'])
+        entry['runs'] += 1
+        entry['last_duration'] = duration
+        entry['last_status'] = status
+        entry['last_run'] = datetime.now().isoformat()
+    
+    def failing(self) -> set:
+        """Keys of test files whose last run failed or errored."""
+        return {key for key, entry in self.durations.items()
+                if entry.get('last_status') in ('failed', 'error')}
+    
+    def save(self):
+        """Persist durations."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, 'w') as f:
+            json.dump(self.durations, f, indent=2, sort_keys=True)
+
+class TestHistoryStore:
+    """Per-test outcomes across runs in SQLite, with flakiness scores and trends.
+    
+    Tests without per-test results (other runners, timed out or crashed
+    files) are recorded under their file's path.
+    """
+    
+    def __init__(self, db_path: Path, window: int = 20):
+        self.db_path = db_path
+        self.window = window  # recent runs considered per test
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript('''
+            CREATE TABLE IF NOT EXISTS runs (
+                id INTEGER PRIMARY KEY,
+                started_at TEXT NOT NULL,
+                revision TEXT,
+                duration REAL,
+                tests INTEGER,
+                passed INTEGER,
+                failed INTEGER,
+                skipped INTEGER
+            );
+            CREATE TABLE IF NOT EXISTS outcomes (
+                run_id INTEGER NOT NULL,
+                nodeid TEXT NOT NULL,
+                test_file TEXT NOT NULL,
+                outcome TEXT NOT NULL,
+                duration REAL,
+                attempts INTEGER NOT NULL DEFAULT 1,
+                PRIMARY KEY (run_id, nodeid)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS outcomes_by_test ON outcomes (nodeid, run_id);
+            CREATE TABLE IF NOT EXISTS quarantine (
+                nodeid TEXT PRIMARY KEY,
+                since_run INTEGER NOT NULL,
+                until_run INTEGER NOT NULL,
+                score REAL
+            );
+        ''')
+    
+    def start_run(self, revision: Optional[str] = None) -> int:
+        """Open a run and return its id."""
+        cursor = self.conn.execute(
+            'INSERT INTO runs (started_at, revision) VALUES (?, ?)',
+            (datetime.now().isoformat(), revision)
+        )
+        self.conn.commit()
+        return cursor.lastrowid
+    
+    def finish_run(self, run_id: int, results: List[Tuple[TestResult, str]], duration: float):
+        """Record each test's outcome; results pair a file result with its file path."""
+        rows = {}
+        for result, test_file in results:
+            if result.test_cases:
+                for case in result.test_cases:
+                    rows[case.nodeid] = (run_id, case.nodeid, test_file, case.outcome,
+                                         case.duration, case.attempts)
+            else:
+                rows[test_file] = (run_id, test_file, test_file, result.status,
+                                   result.duration, 1)
+        
+        outcomes = [row[3] for row in rows.values()]
+        with self.conn:
+            self.conn.executemany(
+                'INSERT OR REPLACE INTO outcomes VALUES (?, ?, ?, ?, ?, ?)', rows.values()
+            )
+            self.conn.execute(
+                'UPDATE runs SET duration = ?, tests = ?, passed = ?, failed = ?, skipped = ? '
+                'WHERE id = ?',
+                (duration, len(outcomes), outcomes.count('passed'),
+                 sum(1 for o in outcomes if o in ('failed', 'error')),
+                 outcomes.count('skipped'), run_id)
+            )
+    
+    def flakiness(self, nodeids: Optional[List[str]] = None) -> Dict[str, Dict]:
+        """Flakiness of tests over their last `window` runs.
+        
+        The score is the share of consecutive attempts whose pass/fail
+        outcome flipped, retries within a run included. A test that always
+        fails scores 0 and a regression flips once, while a test alternating
+        between passing and failing approaches 1.
+        """
+        query = '''
+            SELECT nodeid, outcome, attempts FROM (
+                SELECT nodeid, outcome, attempts, run_id,
+                       ROW_NUMBER() OVER (PARTITION BY nodeid ORDER BY run_id DESC) AS recent
+                FROM outcomes
+            )
+            WHERE recent <= ?
+        '''
+        params = [self.window]
+        if nodeids is not None:
+            query += f" AND nodeid IN ({','.join('?' * len(nodeids))})"
+            params.extend(nodeids)
+        query += ' ORDER BY nodeid, run_id'
+        
+        attempts = defaultdict(list)
+        for row in self.conn.execute(query, params):
+            if row['outcome'] == 'skipped':
+                continue
+            # Retries happen only after failures, and stop at the first pass
+            attempts[row['nodeid']].extend([False] * (row['attempts'] - 1))
+            attempts[row['nodeid']].append(row['outcome'] == 'passed')
+        
+        scores = {}
+        for nodeid, passes in attempts.items():
+            flips = sum(1 for a, b in zip(passes, passes[1:]) if a != b)
+            scores[nodeid] = {
+                'score': flips / (len(passes) - 1) if len(passes) > 1 else 0.0,
+                'attempts': len(passes),
+                'failures': passes.count(False),
+                'flips': flips
+            }
+        return scores
+    
+    def flaky_tests(self, threshold: float = 0.0, min_attempts: int = 5,
+                    limit: Optional[int] = None) -> List[Dict]:
+        """Tests scoring above a flakiness threshold, flakiest first."""
+        flaky = [
+            {'nodeid': nodeid, **stats}
+            for nodeid, stats in self.flakiness().items()
+            if stats['score'] > threshold and stats['attempts'] >= min_attempts
+        ]
+        flaky.sort(key=lambda t: (t['score'], t['failures']), reverse=True)
+        return flaky[:limit] if limit else flaky
+    
+    def quarantined(self, run_id: int) -> set:
+        """Tests quarantined for a run."""
+        return {row['nodeid'] for row in self.conn.execute(
+            'SELECT nodeid FROM quarantine WHERE since_run < ? AND until_run >= ?',
+            (run_id, run_id)
+        )}
+    
+    def update_quarantine(self, run_id: int, threshold: float, runs: int,
+                          min_attempts: int = 5) -> Tuple[List[str], List[str]]:
+        """Quarantine this run's flaky tests for the next `runs` runs.
+        
+        A test whose quarantine expired and that passed at the first attempt
+        when it ran again is released. Returns quarantined and released tests.
+        """
+        ran = {row['nodeid']: row for row in self.conn.execute(
+            'SELECT nodeid, outcome, attempts FROM outcomes WHERE run_id = ?', (run_id,)
+        )}
+        held = {row['nodeid']: row['since_run'] for row in self.conn.execute(
+            'SELECT nodeid, since_run FROM quarantine'
+        ) if row['nodeid'] in ran}
+        scores = self.flakiness(list(ran))
+        
+        quarantined, released = [], []
+        with self.conn:
+            for nodeid, row in ran.items():
+                stats = scores.get(nodeid)
+                if nodeid in held and row['outcome'] == 'passed' and row['attempts'] == 1:
+                    self.conn.execute('DELETE FROM quarantine WHERE nodeid = ?', (nodeid,))
+                    released.append(nodeid)
+                elif stats and stats['score'] >= threshold and stats['attempts'] >= min_attempts:
+                    self.conn.execute(
+                        'INSERT OR REPLACE INTO quarantine VALUES (?, ?, ?, ?)',
+                        (nodeid, held.get(nodeid, run_id), run_id + runs, stats['score'])
+                    )
+                    quarantined.append(nodeid)
+        return sorted(quarantined), sorted(released)
+    
+    def release(self, nodeid: str) -> bool:
+        """Take a test out of quarantine."""
+        with self.conn:
+            cursor = self.conn.execute('DELETE FROM quarantine WHERE nodeid = ?', (nodeid,))
+        return cursor.rowcount > 0
+    
+    def run_trend(self, last: int = 30) -> List[Dict]:
+        """Totals of the most recent finished runs, oldest first."""
+        rows = self.conn.execute(
+            'SELECT * FROM runs WHERE tests IS NOT NULL ORDER BY id DESC LIMIT ?', (last,)
+        ).fetchall()
+        trend = []
+        for row in reversed(rows):
+            entry = dict(row)
+            entry['pass_rate'] = (row['passed'] / row['tests'] * 100) if row['tests'] else 0.0
+            trend.append(entry)
+        return trend
+    
+    def test_trend(self, nodeid: str, last: int = 30) -> List[Dict]:
+        """Outcomes and durations of one test over its most recent runs, oldest first."""
+        rows = self.conn.execute('''
+            SELECT o.run_id, r.started_at, r.revision, o.outcome, o.duration, o.attempts
+            FROM outcomes o JOIN runs r ON r.id = o.run_id
+            WHERE o.nodeid = ?
+            ORDER BY o.run_id DESC LIMIT ?
+        ''', (nodeid, last)).fetchall()
+        return [dict(row) for row in reversed(rows)]
+    
+    def close(self):
+        self.conn.close()
+
 class IntelligentTestRunner:
     """Intelligent test runner with parallel execution and resource management."""
     
-    def __init__(self, adapter: RepositoryAdapter, max_workers: int = 4):
+    def __init__(self, adapter: RepositoryAdapter, max_workers: Optional[int] = None,
+                 worker_pool: bool = False, retries: Optional[int] = None,
+                 quarantine: Optional[bool] = None):
         self.adapter = adapter
-        self.max_workers = max_workers
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.worker_pool = worker_pool  # run pytest files on warm workers
+        self.pool = None
+        self.durations = TestDurationStore(
+            adapter.repo_root / '.test_automation' / 'test_durations.json'
+        )
+        # Opened for the length of a run, so other commands leave no database behind
+        self.history_path = adapter.repo_root / '.test_automation' / 'test_history.db'
+        self.history = None
+        # Flaky test policies: retry failed tests, and skip tests flaky enough
+        # to quarantine until their quarantine runs out
+        self.retries = retries if retries is not None else adapter.config.get('flaky_retries', 0)
+        self.quarantine = (quarantine if quarantine is not None
+                           else adapter.config.get('quarantine_flaky', False))
+        self.flaky_threshold = adapter.config.get('flaky_threshold', 0.3)
+        self.quarantine_runs = adapter.config.get('quarantine_runs', 10)
+        self.quarantined = set()
+        self.schedule_stats = {}
+        self.flakiness = {}
         self.results = []
         
     def run_all(self, tests: Dict[str, List[Path]], 
                 parallel: bool = True,
                 coverage: bool = False) -> List[TestResult]:
         """Run all discovered tests."""
-        if parallel:
-            return self._run_parallel(tests, coverage)
-        else:
-            return self._run_sequential(tests, coverage)
+        jobs, estimates = self._schedule(tests)
+        workers = self._worker_count(estimates) if parallel else 1
+        
+        self.history = TestHistoryStore(self.history_path)
+        try:
+            run_id = self.history.start_run(self._revision())
+            self.quarantined = self.history.quarantined(run_id) if self.quarantine else set()
+            
+            if self.worker_pool and self._uses_pytest():
+                self.pool = PytestWorkerPool(
+                    self.adapter.repo_root,
+                    workers,
+                    preload=self.adapter.config.get('preload_modules', []),
+                    recycle_after=self.adapter.config.get('worker_recycle_after', 200)
+                )
+            start_time = time.time()
+            try:
+                if parallel:
+                    results = self._run_parallel(jobs, workers, coverage)
+                else:
+                    results = self._run_sequential(jobs, coverage)
+            finally:
+                if self.pool:
+                    self.pool.close()
+                    self.pool = None
+            
+            elapsed = time.time() - start_time
+            for result, test_file in results:
+                self.durations.record(self._duration_key(test_file), result.duration, result.status)
+            self.durations.save()
+            measured = [result.duration for result, _ in results if result.duration > 0]
+            self.schedule_stats = self._schedule_stats(measured, workers, elapsed)
+            
+            self.history.finish_run(
+                run_id, [(result, self._duration_key(test_file)) for result, test_file in results], elapsed
+            )
+            self.flakiness = self._flakiness_stats(run_id, results)
+        finally:
+            self.history.close()
+            self.history = None
+        
+        return [result for result, _ in results]
+    
+    def _flakiness_stats(self, run_id: int, results: List[Tuple[TestResult, Path]]) -> Dict:
+        """Flaky test activity of a run, applying the quarantine policy."""
+        stats = {
+            'quarantined': sorted(self.quarantined),
+            'passed_on_retry': sorted(
+                case.nodeid for result, _ in results for case in result.test_cases or []
+                if case.outcome == 'passed' and case.attempts > 1
+            ),
+            'newly_quarantined': [],
+            'released': [],
+            'flaky': self.history.flaky_tests(limit=20)
+        }
+        if self.quarantine:
+            stats['newly_quarantined'], stats['released'] = self.history.update_quarantine(
+                run_id, self.flaky_threshold, self.quarantine_runs
+            )
+        return stats
     
-    def _run_parallel(self, tests: Dict[str, List[Path]], 
-                     coverage: bool) -> List[TestResult]:
-        """Run tests in parallel."""
+    def _revision(self) -> Optional[str]:
+        """Current git commit, if the repository has one."""
+        try:
+            process = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True,
+                                     text=True, cwd=self.adapter.repo_root)
+        except OSError:
+            return None
+        return process.stdout.strip() if process.returncode == 0 else None
+    
+    def _duration_key(self, test_file: Path) -> str:
+        """Stable key of a test file for the duration store."""
+        try:
+            return test_file.resolve().relative_to(self.adapter.repo_root.resolve()).as_posix()
+        except ValueError:
+            return test_file.resolve().as_posix()
+    
+    def _schedule(self, tests: Dict[str, List[Path]]) -> Tuple[List[Tuple[str, Path]], List[float]]:
+        """Order test files longest expected duration first (LPT).
+        
+        Files without history are estimated at the median known duration;
+        with no history at all, larger files go first.
+        """
+        jobs = [(module, test_file) for module, test_files in tests.items()
+                for test_file in test_files]
+        known = {}
+        for _, test_file in jobs:
+            estimate = self.durations.estimate(self._duration_key(test_file))
+            if estimate is not None:
+                known[test_file] = estimate
+        
+        default = sorted(known.values())[len(known) // 2] if known else 1.0
+        
+        def sort_key(job):
+            test_file = job[1]
+            size = test_file.stat().st_size if test_file.exists() else 0
+            return known.get(test_file, default), size
+        
+        jobs.sort(key=sort_key, reverse=True)
+        return jobs, [known.get(test_file, default) for _, test_file in jobs]
+    
+    def _worker_count(self, estimates: List[float]) -> int:
+        """Workers for a run: the configured count, capped by what the files can keep busy."""
+        workers = min(self.max_workers, len(estimates))
+        longest = max(estimates, default=0.0)
+        if longest > 0:
+            # Beyond total/longest workers the longest file alone sets the makespan
+            workers = min(workers, math.ceil(sum(estimates) / longest))
+        return max(1, workers)
+    
+    @staticmethod
+    def _schedule_stats(durations: List[float], workers: int, makespan: float) -> Dict:
+        """Achieved makespan against the critical path and the best possible makespan."""
+        critical_path = max(durations, default=0.0)
+        lower_bound = max(critical_path, sum(durations) / workers)
+        return {
+            'workers': workers,
+            'test_files': len(durations),
+            'total_test_time': sum(durations),
+            'critical_path': critical_path,
+            'lower_bound': lower_bound,
+            'makespan': makespan,
+            'efficiency': lower_bound / makespan if makespan > 0 else 1.0
+        }
+    
+    def _uses_pytest(self) -> bool:
+        """Whether test files are run with pytest."""
+        return self.adapter.repo_type != 'node'
+    
+    def _run_parallel(self, jobs: List[Tuple[str, Path]], workers: int,
+                     coverage: bool) -> List[Tuple[TestResult, Path]]:
+        """Run tests in parallel, submitted in schedule order."""
         results = []
         
-        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-            futures = []
-            for module, test_files in tests.items():
-                for test_file in test_files:
-                    future = executor.submit(
-                        self._run_single_test, 
-                        module, 
-                        test_file, 
-                        coverage
-                    )
-                    futures.append(future)
+        # Free workers take the next file in LPT order, so long files start first
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {}
+            for module, test_file in jobs:
+                future = executor.submit(
+                    self._run_single_test, 
+                    module, 
+                    test_file, 
+                    coverage
+                )
+                futures[future] = test_file
             
             for future in as_completed(futures):
                 try:
                     result = future.result(timeout=300)
-                    results.append(result)
+                    results.append((result, futures[future]))
                 except Exception as e:
                     print(f"Test execution error: {e}")
         
         return results
     
-    def _run_sequential(self, tests: Dict[str, List[Path]], 
-                       coverage: bool) -> List[TestResult]:
+    def _run_sequential(self, jobs: List[Tuple[str, Path]],
+                       coverage: bool) -> List[Tuple[TestResult, Path]]:
         """Run tests sequentially."""
         results = []
         
-        for module, test_files in tests.items():
-            for test_file in test_files:
-                result = self._run_single_test(module, test_file, coverage)
-                results.append(result)
+        for module, test_file in jobs:
+            result = self._run_single_test(module, test_file, coverage)
+            results.append((result, test_file))
         
         return results
     
     def _run_single_test(self, module: str, test_file: Path, 
                         coverage: bool) -> TestResult:
-        """Run a single test file."""
+        """Run a single test file, retrying failed tests when configured."""
+        deselect = self._quarantined_in(test_file)
+        if self.pool:
+            result = self._run_in_worker(module, test_file, coverage, deselect)
+        else:
+            result = self._run_test_file(module, test_file, coverage, deselect)
+        return self._retry_failures(result, test_file)
+    
+    def _quarantined_in(self, test_file: Path) -> List[str]:
+        """Quarantined tests of a test file."""
+        prefix = self._duration_key(test_file) + '::'
+        return sorted(nodeid for nodeid in self.quarantined if nodeid.startswith(prefix))
+    
+    def _retry_failures(self, result: TestResult, test_file: Path) -> TestResult:
+        """Rerun a file's failed tests up to `retries` times, in a fresh process.
+        
+        Tests that pass on a retry count as passed, with their attempts
+        recorded so the history sees them as flaky. Collection errors and
+        files without per-test results are not retried. Retries run without
+        coverage; the file keeps the coverage of its first run.
+        """
+        if not self.retries or result.status != 'failed' or not result.test_cases:
+            return result
+        cases = {case.nodeid: case for case in result.test_cases}
+        failing = [nodeid for nodeid, case in cases.items()
+                   if case.outcome in ('failed', 'error')]
+        if not failing or any(case.phase == 'collect' for case in cases.values()):
+            return result
+        
+        duration = result.duration
+        for attempt in range(2, self.retries + 2):
+            report_dir = Path(tempfile.mkdtemp(prefix='test_report_'))
+            start_time = time.time()
+            try:
+                subprocess.run(
+                    [sys.executable, '-m', 'pytest', *failing, f'--rootdir={self.adapter.repo_root}',
+                     f'--junitxml={report_dir / "junit.xml"}', '-q'],
+                    capture_output=True, text=True, timeout=300, cwd=self.adapter.repo_root
+                )
+                retried = self._parse_junit_report(report_dir / 'junit.xml', test_file)
+            except subprocess.TimeoutExpired:
+                retried = None
+            finally:
+                duration += time.time() - start_time
+                shutil.rmtree(report_dir, ignore_errors=True)
+            if not retried:
+                break
+            
+            for case in retried:
+                if case.nodeid in cases:
+                    case.attempts = attempt
+                    cases[case.nodeid] = case
+            failing = [nodeid for nodeid in failing
+                       if cases[nodeid].outcome in ('failed', 'error')]
+            if not failing:
+                break
+        
+        # Failing tests were all that made the file fail, so its status
+        # follows the retried outcomes
+        return self._file_result(
+            result.module, test_file, 1 if failing else 0, duration,
+            result.stdout, result.stderr, list(cases.values()), result.coverage_data
+        )
+    
+    def _run_test_file(self, module: str, test_file: Path, coverage: bool,
+                       deselect: List[str]) -> TestResult:
+        """Run a single test file in its own process."""
         start_time = time.time()
+        report_dir = Path(tempfile.mkdtemp(prefix='test_report_'))
         
         # Build test command based on repository type
-        cmd = self._build_test_command(test_file, coverage)
+        cmd = self._build_test_command(test_file, coverage, report_dir, deselect)
         
         try:
             process = subprocess.run(
@@ -626,16 +1527,13 @@ class IntelligentTestRunner:
             
             duration = time.time() - start_time
             
-            return TestResult(
-                module=module,
-                test_file=test_file.name,
-                test_name=None,
-                status='passed' if process.returncode == 0 else 'failed',
-                duration=duration,
-                error_message=process.stderr if process.returncode != 0 else None,
-                stdout=process.stdout,
-                stderr=process.stderr,
-                coverage_data=self._extract_coverage_data(process.stdout) if coverage else None
+            return self._file_result(
+                module, test_file, process.returncode, duration,
+                process.stdout, process.stderr,
+                self._parse_junit_report(report_dir / 'junit.xml', test_file),
+                self._load_coverage_report(report_dir / 'coverage.json', process.stdout)
+                if coverage else None,
+                deselected=bool(deselect)
             )
             
         except subprocess.TimeoutExpired:
@@ -656,25 +1554,228 @@ class IntelligentTestRunner:
                 duration=time.time() - start_time,
                 error_message=f"Execution error: {str(e)}"
             )
+        finally:
+            shutil.rmtree(report_dir, ignore_errors=True)
+    
+    def _run_in_worker(self, module: str, test_file: Path, coverage: bool,
+                       deselect: List[str]) -> TestResult:
+        """Run a single test file on a warm pytest worker."""
+        report_dir = Path(tempfile.mkdtemp(prefix='test_report_'))
+        try:
+            response = self.pool.run(test_file, self._pytest_args(coverage, report_dir, deselect))
+            coverage_data = self._load_coverage_report(
+                report_dir / 'coverage.json', response.get('stdout', '')
+            ) if coverage else None
+        finally:
+            shutil.rmtree(report_dir, ignore_errors=True)
+        
+        if response.get('timed_out'):
+            return TestResult(
+                module=module,
+                test_file=test_file.name,
+                test_name=None,
+                status='error',
+                duration=self.pool.timeout,
+                error_message=f"Test timed out after {self.pool.timeout:g} seconds; worker restarted"
+            )
+        if response.get('crashed'):
+            return TestResult(
+                module=module,
+                test_file=test_file.name,
+                test_name=None,
+                status='error',
+                duration=0.0,
+                error_message=f"Test worker crashed (exit code {response.get('returncode')}); "
+                              f"worker restarted"
+            )
+        
+        return self._file_result(
+            module, test_file, response['exit_code'], response['duration'],
+            response['stdout'], response['stderr'],
+            [TestCaseResult(**test) for test in response['tests']],
+            coverage_data,
+            deselected=bool(deselect)
+        )
+    
+    def _file_result(self, module: str, test_file: Path, returncode: int, duration: float,
+                     stdout: str, stderr: str, test_cases: Optional[List[TestCaseResult]],
+                     coverage_data: Optional[Dict], deselected: bool = False) -> TestResult:
+        """Result of a test file from its exit code and per-test outcomes."""
+        if deselected and returncode == 5:
+            returncode = 0  # pytest found no tests: quarantine deselected them all
+        failed = returncode != 0 or any(
+            case.outcome in ('failed', 'error') for case in test_cases or []
+        )
+        if failed:
+            status = 'failed'
+        elif (test_cases or deselected) and all(case.outcome == 'skipped'
+                                                for case in test_cases or []):
+            status = 'skipped'
+        else:
+            status = 'passed'
+        
+        failures = [case.message for case in test_cases or []
+                    if case.message and case.outcome in ('failed', 'error')]
+        return TestResult(
+            module=module,
+            test_file=test_file.name,
+            test_name=None,
+            status=status,
+            duration=duration,
+            error_message=('\n\n'.join(failures) or stderr or stdout) if failed else None,
+            stdout=stdout,
+            stderr=stderr,
+            coverage_data=coverage_data,
+            test_cases=test_cases
+        )
     
-    def _build_test_command(self, test_file: Path, coverage: bool) -> List[str]:
+    def _pytest_args(self, coverage: bool, report_dir: Path,
+                     deselect: List[str] = ()) -> List[str]:
+        """pytest arguments after the test file; reports go to report_dir."""
+        # Per-test detail comes from the structured reports, not verbose output.
+        # Node ids are relative to the repository root wherever pytest's
+        # rootdir would be, so history, retries and quarantine agree on them
+        args = [f'--rootdir={self.adapter.repo_root}',
+                *(arg for nodeid in deselect for arg in ('--deselect', nodeid))]
+        if coverage and self.adapter.repo_type == 'python':
+            return [*args, '--cov', f'--cov-report=json:{report_dir / "coverage.json"}', '-q']
+        return [*args, '-q']
+    
+    def _build_test_command(self, test_file: Path, coverage: bool,
+                            report_dir: Path, deselect: List[str] = ()) -> List[str]:
         """Build test command based on repository configuration."""
         runner = self.adapter.config.get('runner', 'pytest')
         
-        if self.adapter.repo_type == 'python':
-            if coverage:
-                return ['python', '-m', 'pytest', str(test_file), 
-                       '--cov', '--cov-report=json', '-v']
-            else:
-                return ['python', '-m', 'pytest', str(test_file), '-v']
-        elif self.adapter.repo_type == 'node':
+        if self.adapter.repo_type == 'node':
             return ['npm', 'test', str(test_file)]
-        else:
-            # Generic fallback
-            return ['python', '-m', 'pytest', str(test_file), '-v']
+        # Python repositories, and the generic fallback
+        return [sys.executable, '-m', 'pytest', str(test_file),
+                f'--junitxml={report_dir / "junit.xml"}',
+                *self._pytest_args(coverage, report_dir, deselect)]
+    
+    def _parse_junit_report(self, report_file: Path,
+                            test_file: Path) -> Optional[List[TestCaseResult]]:
+        """Per-test outcomes from a pytest JUnit XML report."""
+        if not report_file.exists():
+            return None
+        try:
+            root = ET.parse(report_file).getroot()
+        except ET.ParseError:
+            return None
+        
+        # pytest's classname is the node id's path in dotted form plus any
+        # classes; runs pass --rootdir so the path is relative to the repo root
+        try:
+            rel_path = test_file.resolve().relative_to(self.adapter.repo_root.resolve()).as_posix()
+        except ValueError:
+            rel_path = test_file.name
+        module_name = rel_path[:-3].replace('/', '.')
+        
+        cases = []
+        definitions = None  # parsed on the first skip
+        for case in root.iter('testcase'):
+            classname = case.get('classname', '')
+            name = case.get('name', '')
+            qualname = None
+            if classname == module_name or classname.startswith(module_name + '.'):
+                classes = classname[len(module_name) + 1:]
+                nodeid = '::'.join([rel_path, *(classes.split('.') if classes else []), name])
+                qualname = '.'.join([*(classes.split('.') if classes else []), name.split('[')[0]])
+            elif not classname and name == module_name:
+                nodeid = rel_path  # collection error or module-level skip
+            else:
+                nodeid = f"{classname}::{name}" if classname else name
+            
+            outcome, phase, message = 'passed', 'call', None
+            for child in case:
+                if child.tag not in ('failure', 'error', 'skipped'):
+                    continue
+                summary = child.get('message') or ''
+                message = child.text or summary
+                if child.tag == 'failure':
+                    outcome = 'failed'
+                elif child.tag == 'skipped':
+                    outcome, message = 'skipped', summary
+                    if nodeid == rel_path:
+                        phase = 'collect'
+                    else:
+                        if definitions is None:
+                            definitions = self._test_definitions(test_file)
+                        phase = self._skipped_phase(child, test_file, definitions.get(qualname))
+                else:
+                    outcome = 'error'
+                    phase = next((p for p in ('setup', 'teardown', 'collect') if p in summary), 'call')
+            
+            cases.append(TestCaseResult(
+                nodeid=nodeid,
+                outcome=outcome,
+                duration=float(case.get('time') or 0.0),
+                phase=phase,
+                message=message
+            ))
+        return cases
+    
+    @staticmethod
+    def _test_definitions(test_file: Path) -> Dict[str, int]:
+        """Line of each function definition in a test file, by dotted class path and name."""
+        try:
+            tree = ast.parse(test_file.read_bytes())
+        except (OSError, SyntaxError, ValueError):
+            return {}
+        
+        definitions = {}
+        def visit(node, prefix):
+            for child in ast.iter_child_nodes(node):
+                if isinstance(child, ast.ClassDef):
+                    visit(child, prefix + child.name + '.')
+                elif isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                    definitions[prefix + child.name] = child.lineno
+        visit(tree, '')
+        return definitions
+    
+    def _skipped_phase(self, skipped: ET.Element, test_file: Path,
+                       definition_line: Optional[int]) -> str:
+        """Phase a JUnit skip happened in, as pytest reports it to plugins.
+        
+        Skip marks and skipping fixtures are reported at the test's own
+        location and happen during setup; pytest.skip() in the test body
+        is reported where it was called. Expected failures happen in call.
+        """
+        if skipped.get('type') == 'pytest.xfail':
+            return 'call'
+        # The text is "path:line: reason"
+        match = re.match(r'(.+?):(\d+): ', skipped.text or '')
+        if (match and definition_line is not None
+                and int(match.group(2)) > definition_line
+                and (self.adapter.repo_root / match.group(1)).resolve() == test_file.resolve()):
+            return 'call'
+        return 'setup'
+    
+    def _load_coverage_report(self, report_file: Path, output: str) -> Optional[Dict]:
+        """Total and per-file coverage from a coverage.py JSON report."""
+        if not report_file.exists():
+            return self._extract_coverage_data(output)
+        try:
+            with open(report_file) as f:
+                report = json.load(f)
+        except (json.JSONDecodeError, OSError):
+            return self._extract_coverage_data(output)
+        
+        return {
+            'coverage_percentage': round(report['totals']['percent_covered']),
+            'files': {
+                path: {
+                    'percent_covered': data['summary']['percent_covered'],
+                    'covered_lines': data['summary']['covered_lines'],
+                    'num_statements': data['summary']['num_statements'],
+                    'missing_lines': data.get('missing_lines', [])
+                }
+                for path, data in report.get('files', {}).items()
+            }
+        }
     
     def _extract_coverage_data(self, output: str) -> Optional[Dict]:
-        """Extract coverage data from test output."""
+        """Extract coverage data from test output, for runners without a JSON report."""
         # Simple coverage extraction - can be enhanced
         coverage_match = re.search(r'TOTAL\s+\d+\s+\d+\s+(\d+)%', output)
         if coverage_match:
@@ -1504,10 +2605,16 @@ class ComprehensiveReporter:
                        results: List[TestResult],
                        analyses: List[FailureAnalysis],
                        fix_results: Dict,
-                       format: str = 'html') -> Path:
+                       format: str = 'html',
+                       scheduling: Optional[Dict] = None,
+                       flakiness: Optional[Dict] = None) -> Path:
         """Generate comprehensive test report."""
         
         report_data = self._compile_report_data(results, analyses, fix_results)
+        if scheduling:
+            report_data['scheduling'] = scheduling
+        if flakiness:
+            report_data['flakiness'] = flakiness
         
         if format == 'html':
             return self._generate_html_report(report_data)
@@ -1573,10 +2680,61 @@ class ComprehensiveReporter:
                 'fixes_applied': fixes_applied
             },
             'modules': module_results,
+            'test_cases': self._summarize_test_cases(results),
+            'coverage_files': self._merge_file_coverage(results),
             'failure_types': self._categorize_failures(results, analyses),
             'recommendations': self._generate_recommendations(results, analyses)
         }
     
+    def _summarize_test_cases(self, results: List[TestResult]) -> Optional[Dict]:
+        """Per-test counts, failures and slowest tests across all files."""
+        cases = [case for r in results for case in r.test_cases or []]
+        if not cases:
+            return None
+        
+        counts = defaultdict(int)
+        for case in cases:
+            counts[case.outcome] += 1
+        return {
+            'total': len(cases),
+            'passed': counts['passed'],
+            'failed': counts['failed'],
+            'skipped': counts['skipped'],
+            'errors': counts['error'],
+            'failing': [case.nodeid for case in cases if case.outcome in ('failed', 'error')],
+            'slowest': [
+                {'nodeid': case.nodeid, 'duration': case.duration}
+                for case in sorted(cases, key=lambda c: c.duration, reverse=True)[:10]
+            ]
+        }
+    
+    def _merge_file_coverage(self, results: List[TestResult]) -> Dict[str, Dict]:
+        """Combine per-file coverage from every test file's report.
+        
+        A line is covered if any test file covered it, so the missing lines
+        of a source file are those missed by every report that measured it.
+        """
+        merged = {}
+        for result in results:
+            for path, cov in ((result.coverage_data or {}).get('files') or {}).items():
+                if path not in merged:
+                    merged[path] = {'num_statements': cov['num_statements'],
+                                    'missing_lines': set(cov['missing_lines'])}
+                else:
+                    merged[path]['missing_lines'] &= set(cov['missing_lines'])
+        
+        files = {}
+        for path, cov in sorted(merged.items()):
+            statements = cov['num_statements']
+            covered = statements - len(cov['missing_lines'])
+            files[path] = {
+                'percent_covered': covered / statements * 100 if statements else 100.0,
+                'covered_lines': covered,
+                'num_statements': statements,
+                'missing_lines': sorted(cov['missing_lines'])
+            }
+        return files
+    
     def _categorize_failures(self, results: List[TestResult], 
                             analyses: List[FailureAnalysis]) -> Dict:
         """Categorize failures by type."""
@@ -1824,6 +2982,28 @@ class ComprehensiveReporter:
         for module, stats in data['modules'].items():
             md_content += f"| {module} | {stats['total']} | {stats['passed']} | {stats['failed']} | {stats['duration']:.2f}s |\n"
         
+        if data.get('test_cases'):
+            cases = data['test_cases']
+            md_content += "\n## Test Cases\n\n"
+            md_content += (f"- **Total:** {cases['total']} "
+                           f"({cases['passed']} passed, {cases['failed']} failed, "
+                           f"{cases['skipped']} skipped, {cases['errors']} errors)\n")
+            if cases['failing']:
+                md_content += "\n### Failing Tests\n"
+                for nodeid in cases['failing']:
+                    md_content += f"- `{nodeid}`\n"
+            md_content += "\n### Slowest Tests\n"
+            for case in cases['slowest']:
+                md_content += f"- `{case['nodeid']}` {case['duration']:.2f}s\n"
+        
+        if data.get('coverage_files'):
+            md_content += "\n## Coverage by File\n\n"
+            md_content += "| File | Statements | Covered | Coverage |\n"
+            md_content += "|------|------------|---------|----------|\n"
+            for path, cov in data['coverage_files'].items():
+                md_content += (f"| {path} | {cov['num_statements']} | {cov['covered_lines']} | "
+                               f"{cov['percent_covered']:.1f}% |\n")
+        
         md_content += "\n## Failure Analysis\n\n"
         md_content += "| Failure Type | Count | Fixable |\n"
         md_content += "|--------------|-------|--------|\n"
@@ -1835,6 +3015,29 @@ class ComprehensiveReporter:
         for rec in data['recommendations']:
             md_content += f"- {rec}\n"
         
+        if data.get('scheduling'):
+            sched = data['scheduling']
+            md_content += "\n## Scheduling\n\n"
+            md_content += f"- **Workers:** {sched['workers']}\n"
+            md_content += f"- **Critical Path:** {sched['critical_path']:.2f}s (longest test file)\n"
+            md_content += f"- **Lower Bound:** {sched['lower_bound']:.2f}s\n"
+            md_content += f"- **Achieved Makespan:** {sched['makespan']:.2f}s\n"
+            md_content += f"- **Efficiency:** {sched['efficiency']:.1%}\n"
+        
+        if data.get('flakiness'):
+            flaky = data['flakiness']
+            md_content += "\n## Flaky Tests\n\n"
+            md_content += f"- **Passed on Retry:** {len(flaky['passed_on_retry'])}\n"
+            md_content += f"- **Quarantined This Run:** {len(flaky['quarantined'])}\n"
+            md_content += f"- **Newly Quarantined:** {len(flaky['newly_quarantined'])}\n"
+            md_content += f"- **Released:** {len(flaky['released'])}\n"
+            if flaky['flaky']:
+                md_content += "\n| Test | Flakiness | Failures | Attempts |\n"
+                md_content += "|------|-----------|----------|----------|\n"
+                for test in flaky['flaky']:
+                    md_content += (f"| `{test['nodeid']}` | {test['score']:.2f} | "
+                                   f"{test['failures']} | {test['attempts']} |\n")
+        
         report_path = self.report_dir / f"report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.md"
         report_path.write_text(md_content)
         
@@ -1843,10 +3046,12 @@ class ComprehensiveReporter:
 class TestAutomationEnhanced:
     """Main enhanced test automation orchestrator."""
     
-    def __init__(self):
+    def __init__(self, worker_pool: bool = False, max_workers: Optional[int] = None,
+                 retries: Optional[int] = None, quarantine: Optional[bool] = None):
         self.adapter = RepositoryAdapter()
         self.discovery = EnhancedTestDiscovery(self.adapter)
-        self.runner = IntelligentTestRunner(self.adapter)
+        self.runner = IntelligentTestRunner(self.adapter, max_workers, worker_pool=worker_pool,
+                                            retries=retries, quarantine=quarantine)
         self.analyzer = AIFailureAnalyzer(self.adapter)
         self.fixer = AutoFixEngine(self.adapter)
         self.reporter = ComprehensiveReporter(self.adapter)
@@ -1855,15 +3060,32 @@ class TestAutomationEnhanced:
         
     def run_all(self, parallel: bool = True, coverage: bool = False,
                 auto_fix: bool = False, report_format: str = 'html',
-                generate_module_summary: bool = True) -> Dict:
-        """Run complete test automation workflow."""
+                generate_module_summary: bool = True,
+                changed_since: Optional[str] = None) -> Dict:
+        """Run complete test automation workflow.
+        
+        With changed_since, only test files affected by changes since that
+        git revision run, plus those that failed last time.
+        """
         
         print(f"🔍 Discovering tests in {self.adapter.repo_root.name}...")
         tests = self.discovery.discover_all()
         print(f"   Found {sum(len(v) for v in tests.values())} tests across {len(tests)} modules")
         
+        if changed_since:
+            tests = self._select_impacted(tests, changed_since)
+        
         print("\n🚀 Running tests...")
         results = self.runner.run_all(tests, parallel=parallel, coverage=coverage)
+        sched = self.runner.schedule_stats
+        print(f"   Makespan {sched['makespan']:.1f}s vs critical path {sched['critical_path']:.1f}s "
+              f"(lower bound {sched['lower_bound']:.1f}s, {sched['efficiency']:.0%} efficient, "
+              f"{sched['workers']} workers)")
+        flaky = self.runner.flakiness
+        if flaky['passed_on_retry'] or flaky['quarantined'] or flaky['newly_quarantined']:
+            print(f"   🔁 {len(flaky['passed_on_retry'])} tests passed on retry, "
+                  f"{len(flaky['quarantined'])} quarantined tests skipped, "
+                  f"{len(flaky['newly_quarantined'])} newly quarantined")
         
         print("\n🔬 Analyzing failures...")
         analyses = []
@@ -1895,7 +3117,8 @@ class TestAutomationEnhanced:
         
         print("\n📊 Generating report...")
         report_path = self.reporter.generate_report(
-            results, analyses, fix_results, format=report_format
+            results, analyses, fix_results, format=report_format, scheduling=sched,
+            flakiness=flaky
         )
         print(f"   Report saved to: {report_path}")
         
@@ -1912,9 +3135,46 @@ class TestAutomationEnhanced:
                 'pass_rate': (passed / total * 100) if total > 0 else 0
             },
             'report': str(report_path),
+            'scheduling': sched,
+            'flakiness': flaky,
             'module_summaries': module_summaries if generate_module_summary else None
         }
     
+    def test_history(self, last: int = 30, nodeid: Optional[str] = None) -> Dict:
+        """Flaky tests, quarantine and pass-rate trend from the test history."""
+        if not self.runner.history_path.exists():
+            return {'runs': [], 'flaky': [], 'quarantined': [], 'test': [] if nodeid else None}
+        history = TestHistoryStore(self.runner.history_path)
+        try:
+            runs = history.run_trend(last)
+            next_run = runs[-1]['id'] + 1 if runs else 1
+            return {
+                'runs': runs,
+                'flaky': history.flaky_tests(),
+                'quarantined': sorted(history.quarantined(next_run)),
+                'test': history.test_trend(nodeid, last) if nodeid else None
+            }
+        finally:
+            history.close()
+    
+    def _select_impacted(self, tests: Dict[str, List[Path]], since: str) -> Dict[str, List[Path]]:
+        """Narrow discovered tests to those affected by changes since a revision."""
+        impact = TestImpactAnalyzer(self.adapter)
+        changed = impact.changed_files(since)
+        if changed is None:
+            print(f"   ⚠️  Could not diff against '{since}'; running all tests")
+            return tests
+        
+        failing = self.runner.durations.failing()
+        selected, stats = impact.select(tests, changed, failing)
+        if stats['full_run']:
+            print(f"   🎯 {stats['changed_files']} changed files include project configuration; "
+                  f"running all tests")
+        else:
+            print(f"   🎯 {stats['changed_files']} changed files affect {stats['selected_tests']} "
+                  f"of {stats['total_tests']} test files (incl. previous failures)")
+        return selected
+    
     def health_check(self) -> Dict:
         """Perform health check of test infrastructure."""
         
@@ -2119,7 +3379,8 @@ def main():
     
     parser.add_argument('command', choices=[
         'run-all', 'run-module', 'analyze', 'fix', 'report', 'health-check',
-        'validate-pattern', 'generate-test', 'fix-patterns', 'generate-summary'
+        'validate-pattern', 'generate-test', 'fix-patterns', 'generate-summary',
+        'flaky-tests'
     ])
     parser.add_argument('--parallel', action='store_true', default=True)
     parser.add_argument('--coverage', action='store_true')
@@ -2133,10 +3394,24 @@ def main():
     parser.add_argument('--pattern', choices=['aaa'], default='aaa', help='Test pattern to enforce (default: aaa)')
     parser.add_argument('--generate-summary', action='store_true', default=True, 
                        help='Generate module test summaries for refactoring guidance (default: True)')
+    parser.add_argument('--worker-pool', action='store_true',
+                       help='Run pytest files on warm long-lived workers instead of one process each')
+    parser.add_argument('--workers', type=int,
+                       help='Maximum parallel test workers (default: CPU count)')
+    parser.add_argument('--changed-since', nargs='?', const='HEAD', metavar='REF',
+                       help='Run only tests affected by changes since a git revision '
+                            '(default: HEAD, i.e. uncommitted changes) plus previous failures')
+    parser.add_argument('--retries', type=int,
+                       help='Rerun failed tests up to N times; passes on retry count as flaky')
+    parser.add_argument('--quarantine', action='store_true', default=None,
+                       help='Skip tests whose flakiness score crosses the threshold for a number of runs')
+    parser.add_argument('--test', help='Test node id for the flaky-tests trend')
+    parser.add_argument('--last', type=int, default=30, help='Runs shown by flaky-tests (default: 30)')
     
     args = parser.parse_args()
     
-    automation = TestAutomationEnhanced()
+    automation = TestAutomationEnhanced(worker_pool=args.worker_pool, max_workers=args.workers,
+                                        retries=args.retries, quarantine=args.quarantine)
     
     if args.command == 'run-all':
         # When running tests, also validate AAA pattern if requested
@@ -2152,7 +3427,8 @@ def main():
             coverage=args.coverage,
             auto_fix=args.auto_fix,
             report_format=args.format,
-            generate_module_summary=args.generate_summary
+            generate_module_summary=args.generate_summary,
+            changed_since=args.changed_since
         )
         
         if result['success']:
@@ -2246,8 +3522,32 @@ def main():
             print("   - Specific refactoring recommendations")
             print("   - Priority ordering for safe refactoring")
     
+    elif args.command == 'flaky-tests':
+        history = automation.test_history(args.last, args.test)
+        if args.format == 'json':
+            print(json.dumps(history, indent=2, default=str))
+            return
+        
+        print(f"\n📈 Last {len(history['runs'])} runs:")
+        for run in history['runs']:
+            print(f"   #{run['id']} {run['started_at'][:19]}  {run['pass_rate']:5.1f}% of "
+                  f"{run['tests']} tests  {run['duration']:.1f}s")
+        print(f"\n🔁 Flaky tests ({len(history['flaky'])}):")
+        for test in history['flaky'][:20]:
+            icon = "🚧" if test['nodeid'] in history['quarantined'] else "  "
+            print(f"   {icon} {test['score']:.2f}  {test['nodeid']} "
+                  f"({test['failures']}/{test['attempts']} attempts failed)")
+        if history['test']:
+            print(f"\n🧪 {args.test}:")
+            for run in history['test']:
+                print(f"   #{run['run_id']} {run['outcome']:<8} {run['duration'] or 0:.2f}s"
+                      f"{'  (%d attempts)' % run['attempts'] if run['attempts'] > 1 else ''}")
+    
     else:
         print(f"Command '{args.command}' not yet implemented")
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    if sys.argv[1:2] == [PytestWorkerPool.WORKER_FLAG]:
+        _pytest_worker_main(sys.argv[2:])
+    else:
+        main()
\ No newline at end of file
@@ -9,17 +9,38 @@ Plus v2.0 features: RAG optimization, context engineering, memory management
 
 import os
 import sys
+import gzip
 import yaml
 import shutil
 import hashlib
 import argparse
+from abc import ABC, abstractmethod
 from pathlib import Path
 from datetime import datetime
 from typing import Dict, List, Optional, Any, Tuple
 from enum import Enum
 import json
 import re
+import sqlite3
+import struct
 import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    from agent_os.integration.context_retrieval import ChunkEmbeddingIndex
+except ImportError:
+    ChunkEmbeddingIndex = None  # numpy missing, or run outside the agent_os package
 
 class AgentMode(Enum):
     """Agent operation modes"""
@@ -65,14 +86,443 @@ class ChunkingStrategy(Enum):
     HYBRID = "hybrid"          # Combined approach
     PHASED = "phased"          # Phased approach for large docs
 
+class ExtractionPatternSet:
+    """
+    Entity and relationship rules for knowledge extraction, compiled into one regex
+    
+    Each word start is tried once: first as the source of a relationship
+    (source, verb and target separated by whitespace, verb matched
+    case-insensitively), then against the entity patterns. The verb and
+    target sit in a lookahead, so they are still scanned as words in their
+    own right and a single finditer pass yields everything.
+    
+    entities:  (entity_type, regex matching a whole word)
+    relations: (verb regex, relationship_type)
+    """
+    
+    def __init__(self, entities: List[Tuple[str, str]], relations: List[Tuple[str, str]]):
+        self.entities = list(entities)
+        self.relations = list(relations)
+        
+        entity_alternatives = "|".join(
+            f"(?P<e{i}>{pattern})" for i, (_, pattern) in enumerate(self.entities)
+        )
+        verb_alternatives = "|".join(
+            f"(?P<r{i}>(?i:{pattern}))" for i, (pattern, _) in enumerate(self.relations)
+        )
+        
+        scanner = []
+        if self.relations:
+            scanner.append(rf"\b(?P<src>\w+)(?=\s+(?:{verb_alternatives})\s+(?P<tgt>\w+))")
+        if self.entities:
+            scanner.append(rf"\b(?:{entity_alternatives})\b")
+        self.scanner = re.compile("|".join(scanner) or r"(?!)")
+        self.entity_word = re.compile(entity_alternatives or r"(?!)")
+        
+        self.entity_groups = {f"e{i}": entity_type for i, (entity_type, _) in enumerate(self.entities)}
+        self.relation_groups = [f"r{i}" for i in range(len(self.relations))]
+    
+    def extend(self, entities: List[Tuple[str, str]] = (),
+               relations: List[Tuple[str, str]] = ()) -> "ExtractionPatternSet":
+        """New pattern set with extra rules after the existing ones"""
+        return ExtractionPatternSet(self.entities + list(entities), self.relations + list(relations))
+    
+    def extract(self, text: str, entities: Dict[str, str], relations: List[List[Tuple[str, str]]]):
+        """
+        Scan text once, adding entity names (name -> type) and per-rule
+        (source, target) pairs. Like re.findall per verb, a match for a
+        verb may not start inside that verb's previous match.
+        """
+        entity_groups = self.entity_groups
+        relation_groups = self.relation_groups
+        entity_word = self.entity_word.fullmatch
+        last_end = [-1] * len(relation_groups)
+        
+        for match in self.scanner.finditer(text):
+            group = match.lastgroup
+            if group in entity_groups:
+                entities.setdefault(match[0], entity_groups[group])
+                continue
+            
+            source = match["src"]
+            entity = entity_word(source)
+            if entity:
+                entities.setdefault(source, entity_groups[entity.lastgroup])
+            
+            rule = next(i for i, name in enumerate(relation_groups) if match[name] is not None)
+            if match.start() < last_end[rule]:
+                continue
+            last_end[rule] = match.end("tgt")
+            relations[rule].append((source, match["tgt"]))
+
+
+DEFAULT_EXTRACTION_PATTERNS = ExtractionPatternSet(
+    entities=[("concept", r"[A-Z][a-z]+")],
+    relations=[("is", "related"), ("has", "related"), ("contains", "related")]
+)
+
+# Extraction rules per specialization; anything missing uses the defaults
+EXTRACTION_PATTERN_SETS = {
+    AgentSpecialization.DOMAIN: DEFAULT_EXTRACTION_PATTERNS.extend(
+        entities=[("term", r"[A-Z]{2,}[0-9]*")],
+        relations=[("uses", "uses"), ("requires", "requires"), (r"depends\s+on", "depends_on")]
+    )
+}
+
+
+def register_extraction_patterns(specialization: AgentSpecialization,
+                                 pattern_set: ExtractionPatternSet):
+    """Use pattern_set for knowledge extraction in agents of this specialization"""
+    EXTRACTION_PATTERN_SETS[specialization] = pattern_set
+
+
+class KnowledgeGraph:
+    """
+    Indexed knowledge graph built during phase 3
+    
+    Node keys (lowercased entity names and relationship targets) are
+    interned to integer ids. Each entity node keeps its first entity record,
+    the highest-confidence record and a mention count. Edges are
+    deduplicated on (source, target, type): repeats raise the edge weight
+    and keep the highest confidence. Edge fields live in parallel arrays,
+    and CSR adjacency plus the by-type index are built lazily.
+    Nodes are also indexed by source document.
+    """
+    
+    MAGIC = b"KGRAPH01"
+    
+    def __init__(self):
+        self.node_ids: Dict[str, int] = {}
+        self.keys: List[str] = []
+        self.first: List[Optional[Dict]] = []  # None for nodes that are only targets
+        self.best: List[Optional[Dict]] = []
+        self.mentions = array('i')
+        self.type_conflicts: Dict[int, List[str]] = {}
+        
+        self.edge_ids: Dict[Tuple[int, int, int], int] = {}
+        self.edge_src = array('i')
+        self.edge_tgt = array('i')
+        self.edge_type = array('i')
+        self.edge_weight = array('i')
+        self.edge_confidence = array('d')
+        self.edge_type_ids: Dict[str, int] = {}
+        self.edge_type_names: List[str] = []
+        
+        self.source_ids: Dict[str, int] = {}
+        self.source_names: List[str] = []
+        self.source_nodes: List[array] = []
+        
+        self.entity_count = 0
+        self._adjacency = None  # (offsets, edge indices) by source node
+        self._by_type = None
+    
+    def _intern(self, key: str) -> int:
+        node = self.node_ids.get(key)
+        if node is None:
+            node = self.node_ids[key] = len(self.keys)
+            self.keys.append(key)
+            self.first.append(None)
+            self.best.append(None)
+            self.mentions.append(0)
+        return node
+    
+    def add_entity(self, entity: Dict) -> int:
+        """Add one entity mention, returning its node id"""
+        node = self._intern(entity["name"].lower())
+        best = self.best[node]
+        
+        if best is None:
+            self.first[node] = self.best[node] = entity
+            self.entity_count += 1
+        else:
+            if entity.get("confidence", 0) > best.get("confidence", 0):
+                self.best[node] = entity
+            if entity.get("type") != self.first[node].get("type"):
+                types = self.type_conflicts.setdefault(node, [self.first[node].get("type")])
+                if entity.get("type") not in types:
+                    types.append(entity.get("type"))
+        self.mentions[node] += 1
+        
+        source = entity.get("source")
+        if source is not None:
+            source_id = self.source_ids.get(source)
+            if source_id is None:
+                source_id = self.source_ids[source] = len(self.source_names)
+                self.source_names.append(source)
+                self.source_nodes.append(array('i'))
+            self.source_nodes[source_id].append(node)
+        
+        self._by_type = None
+        return node
+    
+    def add_relationship(self, relationship: Dict) -> bool:
+        """Add or reinforce an edge; only entity nodes can be edge sources"""
+        source = self.node_ids.get(relationship["source"].lower())
+        if source is None or self.first[source] is None:
+            return False
+        
+        target = self._intern(relationship["target"].lower())
+        edge_type = self.edge_type_ids.get(relationship["type"])
+        if edge_type is None:
+            edge_type = self.edge_type_ids[relationship["type"]] = len(self.edge_type_names)
+            self.edge_type_names.append(relationship["type"])
+        
+        edge_key = (source, target, edge_type)
+        edge = self.edge_ids.get(edge_key)
+        if edge is None:
+            self.edge_ids[edge_key] = len(self.edge_src)
+            self.edge_src.append(source)
+            self.edge_tgt.append(target)
+            self.edge_type.append(edge_type)
+            self.edge_weight.append(1)
+            self.edge_confidence.append(relationship["confidence"])
+            self._adjacency = None
+        else:
+            self.edge_weight[edge] += 1
+            if relationship["confidence"] > self.edge_confidence[edge]:
+                self.edge_confidence[edge] = relationship["confidence"]
+        return True
+    
+    def entity_nodes(self):
+        """Entity node ids in first-mention order"""
+        return (node for node, entity in enumerate(self.first) if entity is not None)
+    
+    def neighbors(self, key: str) -> List[Dict]:
+        """Outgoing edges of a node"""
+        node = self.node_ids.get(key.lower())
+        if node is None:
+            return []
+        
+        if self._adjacency is None:
+            # Counting sort of edge indices by source node
+            offsets = array('i', [0]) * (len(self.keys) + 1)
+            for source in self.edge_src:
+                offsets[source + 1] += 1
+            for i in range(len(self.keys)):
+                offsets[i + 1] += offsets[i]
+            cursor = array('i', offsets)
+            edges = array('i', [0]) * len(self.edge_src)
+            for edge, source in enumerate(self.edge_src):
+                edges[cursor[source]] = edge
+                cursor[source] += 1
+            self._adjacency = (offsets, edges)
+        
+        offsets, edges = self._adjacency
+        return [{
+            "target": self.keys[self.edge_tgt[edge]],
+            "type": self.edge_type_names[self.edge_type[edge]],
+            "weight": self.edge_weight[edge],
+            "confidence": self.edge_confidence[edge]
+        } for edge in edges[offsets[node]:offsets[node + 1]]]
+    
+    def nodes_by_type(self) -> Dict[str, List[int]]:
+        """Entity node ids grouped by the type of their best entity record"""
+        if self._by_type is None:
+            by_type = {}
+            for node in self.entity_nodes():
+                by_type.setdefault(self.best[node].get("type", "unknown"), []).append(node)
+            self._by_type = by_type
+        return self._by_type
+    
+    def nodes_from_source(self, source: str) -> List[int]:
+        """Entity node ids mentioned by a source document"""
+        source_id = self.source_ids.get(source)
+        return list(self.source_nodes[source_id]) if source_id is not None else []
+    
+    def summary(self) -> Dict:
+        """Counts for phase results"""
+        return {
+            "nodes": self.entity_count,
+            "terms": len(self.keys) - self.entity_count,
+            "edges": len(self.edge_src),
+            "relationship_mentions": sum(self.edge_weight),
+            "sources": len(self.source_names)
+        }
+    
+    def save(self, path: Path):
+        """Write the graph in a binary format: header, JSON string table, raw arrays"""
+        meta = json.dumps({
+            "keys": self.keys,
+            "first": self.first,
+            "best": [None if best is first else best for best, first in zip(self.best, self.first)],
+            "type_conflicts": {str(node): types for node, types in self.type_conflicts.items()},
+            "edge_types": self.edge_type_names,
+            "sources": self.source_names,
+            "source_sizes": [len(nodes) for nodes in self.source_nodes]
+        }, separators=(",", ":")).encode()
+        
+        arrays = [self.mentions, self.edge_src, self.edge_tgt, self.edge_type,
+                  self.edge_weight, self.edge_confidence] + self.source_nodes
+        with open(path, 'wb') as f:
+            f.write(struct.pack('<8sIIQ', self.MAGIC, len(self.keys), len(self.edge_src), len(meta)))
+            f.write(meta)
+            for values in arrays:
+                if sys.byteorder == 'big':
+                    values = array(values.typecode, values)
+                    values.byteswap()
+                f.write(values.tobytes())
+    
+    @classmethod
+    def load(cls, path: Path) -> "KnowledgeGraph":
+        """Read a graph written by save()"""
+        with open(path, 'rb') as f:
+            header = f.read(struct.calcsize('<8sIIQ'))
+            magic, node_count, edge_count, meta_size = struct.unpack('<8sIIQ', header)
+            if magic != cls.MAGIC:
+                raise ValueError(f"Not a knowledge graph file: {path}")
+            meta = json.loads(f.read(meta_size))
+            
+            def read_array(typecode: str, count: int) -> array:
+                values = array(typecode)
+                values.frombytes(f.read(values.itemsize * count))
+                if sys.byteorder == 'big':
+                    values.byteswap()
+                return values
+            
+            graph = cls()
+            graph.keys = meta["keys"]
+            graph.node_ids = {key: node for node, key in enumerate(graph.keys)}
+            graph.first = meta["first"]
+            graph.best = [best if best is not None else first
+                          for best, first in zip(meta["best"], graph.first)]
+            graph.type_conflicts = {int(node): types for node, types in meta["type_conflicts"].items()}
+            graph.entity_count = sum(1 for entity in graph.first if entity is not None)
+            graph.mentions = read_array('i', node_count)
+            
+            graph.edge_src = read_array('i', edge_count)
+            graph.edge_tgt = read_array('i', edge_count)
+            graph.edge_type = read_array('i', edge_count)
+            graph.edge_weight = read_array('i', edge_count)
+            graph.edge_confidence = read_array('d', edge_count)
+            graph.edge_type_names = meta["edge_types"]
+            graph.edge_type_ids = {name: i for i, name in enumerate(graph.edge_type_names)}
+            graph.edge_ids = {
+                (source, target, edge_type): edge
+                for edge, (source, target, edge_type)
+                in enumerate(zip(graph.edge_src, graph.edge_tgt, graph.edge_type))
+            }
+            
+            graph.source_names = meta["sources"]
+            graph.source_ids = {name: i for i, name in enumerate(graph.source_names)}
+            graph.source_nodes = [read_array('i', size) for size in meta["source_sizes"]]
+        
+        return graph
+
+
+class PhaseResultSerializer(ABC):
+    """File format for phase results; dump/load work on binary file objects"""
+    
+    extension = None
+    
+    @abstractmethod
+    def dump(self, results: Dict, f):
+        """Write results to a binary file object"""
+    
+    @abstractmethod
+    def load(self, f) -> Dict:
+        """Read results written by dump()"""
+
+
+class JsonLinesSerializer(PhaseResultSerializer):
+    """
+    One JSON record per line: list-valued keys are written one item per
+    line, so large entity and relationship lists stream in and out
+    """
+    
+    extension = "jsonl"
+    
+    def dump(self, results: Dict, f):
+        encode = json.JSONEncoder(separators=(",", ":"), default=str).encode
+        lines = []
+        
+        for key, value in results.items():
+            if isinstance(value, list) and value:
+                lines.extend(encode({"key": key, "item": item}) for item in value)
+            else:
+                lines.append(encode({"key": key, "value": value}))
+            
+            if len(lines) >= 10000:
+                f.write(("\n".join(lines) + "\n").encode())
+                lines = []
+        
+        if lines:
+            f.write(("\n".join(lines) + "\n").encode())
+    
+    def load(self, f) -> Dict:
+        results = {}
+        for line in f:
+            record = json.loads(line)
+            if "item" in record:
+                results.setdefault(record["key"], []).append(record["item"])
+            else:
+                results[record["key"]] = record["value"]
+        return results
+
+
+class MsgpackSerializer(PhaseResultSerializer):
+    """Compact binary results; requires the msgpack package"""
+    
+    extension = "msgpack"
+    
+    def dump(self, results: Dict, f):
+        f.write(msgpack.packb(results, use_bin_type=True, default=str))
+    
+    def load(self, f) -> Dict:
+        return msgpack.unpackb(f.read(), raw=False, strict_map_key=False)
+
+
+PHASE_RESULT_SERIALIZERS = {"jsonl": JsonLinesSerializer()}
+if msgpack is not None:
+    PHASE_RESULT_SERIALIZERS["msgpack"] = MsgpackSerializer()
+
+# Compression name -> (file suffix, open function for binary modes)
+PHASE_RESULT_COMPRESSION = {
+    "none": ("", open),
+    "gzip": (".gz", lambda path, mode: gzip.open(path, mode, compresslevel=6))
+}
+if zstandard is not None:
+    PHASE_RESULT_COMPRESSION["zstd"] = (".zst", zstandard.open)
+
+
+# Processor held by each phase 3 extraction worker, set by _init_extraction_worker
+_extraction_processor = None
+
+
+def _init_extraction_worker(processor):
+    """Process pool initializer: keep the processor for _extract_shard calls"""
+    global _extraction_processor
+    _extraction_processor = processor
+
+
+def _extract_shard(shard: List[Tuple[int, str]]) -> List[Tuple[int, Dict]]:
+    """Extract knowledge for a shard of (index, path) pairs in a pool worker"""
+    return [(index, _extraction_processor._extract_knowledge(Path(path))) for index, path in shard]
+
+
 class PhasedDocumentProcessor:
     """
     Implements phased approach to reading vast documentation
     Based on mixed-documentation-agent specification
     """
     
-    def __init__(self, agent_path: Path):
+    # Documents per extraction task by size class: large files go alone,
+    # small ones are batched so pool overhead stays small
+    EXTRACTION_SHARD_SIZES = {"small": 64, "medium": 8, "large": 1, "very_large": 1}
+    
+    def __init__(self, agent_path: Path, workers: int = 1,
+                 result_format: str = "auto", compression: str = "none"):
         self.agent_path = agent_path
+        self.workers = workers  # phase 3 extraction processes; 1 extracts serially
+        
+        # Phase result persistence: msgpack when installed, JSON Lines otherwise
+        if result_format == "auto":
+            result_format = "msgpack" if "msgpack" in PHASE_RESULT_SERIALIZERS else "jsonl"
+        if result_format not in PHASE_RESULT_SERIALIZERS:
+            raise ValueError(f"Unsupported phase result format: {result_format}")
+        if compression not in PHASE_RESULT_COMPRESSION:
+            raise ValueError(f"Unsupported phase result compression: {compression}")
+        self.result_format = result_format
+        self.compression = compression
         self.processing_path = agent_path / "processing"
         self.phases_path = self.processing_path / "phases"
         self.metrics_path = self.processing_path / "metrics"
@@ -82,8 +532,17 @@ class PhasedDocumentProcessor:
         self.phases_path.mkdir(parents=True, exist_ok=True)
         self.metrics_path.mkdir(parents=True, exist_ok=True)
         
+        # Per-document phase 3 output of the current run, one JSON line each
+        self.extraction_checkpoint = self.phases_path / "extraction_checkpoint.jsonl"
+        
         # Phase tracking
         self.phase_status = self.load_phase_status()
+        
+        # Extraction rules for this agent's specialization
+        self.extraction_patterns = self._load_extraction_patterns()
+        
+        # Knowledge graph from phase 3, used by synthesis and validation
+        self.knowledge_graph = None
     
     def load_phase_status(self) -> dict:
         """Load or initialize phase processing status"""
@@ -98,6 +557,20 @@ class PhasedDocumentProcessor:
             "last_updated": datetime.now().isoformat()
         }
     
+    def _load_extraction_patterns(self) -> ExtractionPatternSet:
+        """Pattern set for the specialization in agent.yaml, defaults otherwise"""
+        config_file = self.agent_path / "agent.yaml"
+        if config_file.exists():
+            with open(config_file, 'r') as f:
+                specialization = (yaml.safe_load(f) or {}).get("specialization")
+            try:
+                return EXTRACTION_PATTERN_SETS.get(
+                    AgentSpecialization(specialization), DEFAULT_EXTRACTION_PATTERNS
+                )
+            except ValueError:
+                pass
+        return DEFAULT_EXTRACTION_PATTERNS
+    
     def save_phase_status(self):
         """Save phase processing status"""
         status_file = self.processing_path / "phase_status.yaml"
@@ -105,6 +578,53 @@ class PhasedDocumentProcessor:
         with open(status_file, 'w') as f:
             yaml.dump(self.phase_status, f, default_flow_style=False)
     
+    def begin_run(self, doc_paths: List[Path], module_name: Optional[str] = None,
+                  resume: bool = True) -> List[str]:
+        """
+        Start a processing run, or resume the unfinished run over the same documents
+        Returns the phases the resumed run had already completed.
+        """
+        run_id = hashlib.sha256(
+            "\n".join([module_name or ""] + [str(p) for p in doc_paths]).encode()
+        ).hexdigest()[:16]
+        
+        run = self.phase_status.get("run") or {}
+        if resume and run.get("id") == run_id and not run.get("finished"):
+            return list(run.get("completed_phases", []))
+        
+        # A new run: checkpoints and the graph left by the previous one no longer apply
+        for stale in (self.extraction_checkpoint, self.phases_path / "knowledge_graph.bin"):
+            if stale.exists():
+                stale.unlink()
+        self.phase_status["run"] = {
+            "id": run_id,
+            "documents": len(doc_paths),
+            "started_at": datetime.now().isoformat(),
+            "completed_phases": [],
+            "finished": False
+        }
+        self.save_phase_status()
+        return []
+    
+    def run_phase(self, phase: ProcessingPhase, execute) -> Dict:
+        """Results of a phase the current run already completed, else execute()"""
+        run = self.phase_status.get("run") or {}
+        if phase.value in run.get("completed_phases", []):
+            results = self._load_phase_results(phase)
+            if results:
+                print(f"   ↻ {phase.value}: restored from checkpoint")
+                return results
+        return execute()
+    
+    def finish_run(self):
+        """Mark the current run complete so the next one starts fresh"""
+        if self.extraction_checkpoint.exists():
+            self.extraction_checkpoint.unlink()
+        if self.phase_status.get("run"):
+            self.phase_status["run"]["finished"] = True
+            self.phase_status["run"]["finished_at"] = datetime.now().isoformat()
+            self.save_phase_status()
+    
     def phase1_discovery(self, doc_paths: List[Path]) -> Dict:
         """
         Phase 1: Document Discovery and Classification
@@ -227,48 +747,55 @@ class PhasedDocumentProcessor:
             "source_mapping": {}
         }
         
+        # Reset before the extraction pool pickles the processor
+        self.knowledge_graph = None
+        graph = KnowledgeGraph()
+        
         # Process documents by priority
         priority_order = ["high_priority", "medium_priority", "low_priority"]
+        doc_paths = [
+            doc_path_str
+            for priority in priority_order
+            for doc_path_str in quality_results.get(priority, [])
+            if Path(doc_path_str).exists()
+        ]
         
-        for priority in priority_order:
-            doc_paths = quality_results.get(priority, [])
-            
+        # Documents checkpointed earlier in this run are not extracted again
+        checkpoint = self._load_extraction_checkpoint()
+        pending = [doc_path_str for doc_path_str in doc_paths if doc_path_str not in checkpoint]
+        if len(pending) < len(doc_paths):
+            print(f"  Resuming extraction: {len(doc_paths) - len(pending)} documents checkpointed")
+        
+        # Results arrive in priority order whether extracted serially or in a pool
+        extracted_docs = self._extract_documents(pending)
+        with open(self.extraction_checkpoint, 'a', encoding='utf-8') as log:
             for doc_path_str in doc_paths:
-                doc_path = Path(doc_path_str)
-                
-                if not doc_path.exists():
-                    continue
-                
-                print(f"  Extracting from: {doc_path.name}")
-                
-                # Extract knowledge
-                extracted = self._extract_knowledge(doc_path)
-                
-                # Store entities
-                extraction_results["extracted_entities"].extend(extracted["entities"])
-                
-                # Store relationships
-                extraction_results["extracted_relationships"].extend(extracted["relationships"])
-                
-                # Update knowledge graph
-                self._update_knowledge_graph(
-                    extraction_results["knowledge_graph"],
-                    extracted
-                )
-                
-                # Maintain source mapping
-                extraction_results["source_mapping"][doc_path_str] = {
-                    "entities": len(extracted["entities"]),
-                    "relationships": len(extracted["relationships"]),
-                    "extraction_time": datetime.now().isoformat()
-                }
+                entry = checkpoint.get(doc_path_str)
+                if entry is None:
+                    print(f"  Extracting from: {Path(doc_path_str).name}")
+                    _, extracted = next(extracted_docs)
+                    entry = {
+                        "path": doc_path_str,
+                        "stamp": self._document_stamp(Path(doc_path_str)),
+                        "extraction_time": datetime.now().isoformat(),
+                        "extracted": extracted
+                    }
+                    log.write(json.dumps(entry) + "\n")
+                    log.flush()
+                self._merge_extracted(extraction_results, graph, doc_path_str, entry)
+        
+        # The graph itself is stored in binary; phase results carry its counts
+        self.knowledge_graph = graph
+        graph.save(self.phases_path / "knowledge_graph.bin")
+        extraction_results["knowledge_graph"] = graph.summary()
         
         # Calculate metrics
         extraction_results["extraction_metrics"] = {
             "total_entities": len(extraction_results["extracted_entities"]),
             "total_relationships": len(extraction_results["extracted_relationships"]),
             "unique_entities": len(set(e["name"] for e in extraction_results["extracted_entities"])),
-            "graph_nodes": len(extraction_results["knowledge_graph"])
+            "graph_nodes": graph.entity_count,
+            "graph_edges": len(graph.edge_src)
         }
         
         # Save phase results
@@ -292,32 +819,23 @@ class PhasedDocumentProcessor:
             "synthesis_metrics": {}
         }
         
-        # Consolidate entities
-        entity_map = {}
-        for entity in extraction_results["extracted_entities"]:
-            key = entity.get("name", "").lower()
-            if key not in entity_map:
-                entity_map[key] = []
-            entity_map[key].append(entity)
-        
-        # Resolve conflicts and synthesize
-        for key, entities in entity_map.items():
-            if len(entities) > 1:
-                # Conflict detected - resolve
-                resolved = self._resolve_entity_conflict(entities)
+        # Entities are consolidated per graph node as they are added
+        graph = self._knowledge_graph(extraction_results)
+        
+        # Resolve conflicts and synthesize: nodes mentioned more than once
+        # keep their highest-confidence entity
+        for node in graph.entity_nodes():
+            key = graph.keys[node]
+            if graph.mentions[node] > 1:
                 synthesis_results["conflict_resolutions"].append({
                     "entity": key,
-                    "sources": len(entities),
-                    "resolution": resolved["method"]
+                    "sources": graph.mentions[node],
+                    "resolution": "highest_confidence"
                 })
-                synthesis_results["synthesized_knowledge"][key] = resolved["entity"]
-            else:
-                synthesis_results["synthesized_knowledge"][key] = entities[0]
+            synthesis_results["synthesized_knowledge"][key] = graph.best[node]
         
         # Build knowledge hierarchy
-        synthesis_results["knowledge_hierarchy"] = self._build_hierarchy(
-            synthesis_results["synthesized_knowledge"]
-        )
+        synthesis_results["knowledge_hierarchy"] = self._build_hierarchy(graph)
         
         # Calculate metrics
         synthesis_results["synthesis_metrics"] = {
@@ -358,7 +876,7 @@ class PhasedDocumentProcessor:
                 validation_results["issues_found"].extend(validation["issues"])
         
         # Consistency checks
-        consistency = self._check_consistency(synthesis_results["synthesized_knowledge"])
+        consistency = self._check_consistency(self._knowledge_graph())
         validation_results["consistency_checks"] = consistency
         
         # Calculate quality metrics
@@ -433,6 +951,103 @@ class PhasedDocumentProcessor:
         
         return integration_results
     
+    def _merge_extracted(self, extraction_results: Dict, graph: KnowledgeGraph,
+                         doc_path_str: str, entry: Dict):
+        """Add one document's checkpointed extraction to the phase 3 results"""
+        extracted = entry["extracted"]
+        
+        # Store entities
+        extraction_results["extracted_entities"].extend(extracted["entities"])
+        
+        # Store relationships
+        extraction_results["extracted_relationships"].extend(extracted["relationships"])
+        
+        # Update knowledge graph
+        self._update_knowledge_graph(graph, extracted)
+        
+        # Maintain source mapping
+        extraction_results["source_mapping"][doc_path_str] = {
+            "entities": len(extracted["entities"]),
+            "relationships": len(extracted["relationships"]),
+            "extraction_time": entry["extraction_time"]
+        }
+    
+    def _document_stamp(self, doc_path: Path) -> List[int]:
+        """Size and mtime of a document, to tell whether a checkpoint still applies"""
+        stat_result = doc_path.stat()
+        return [stat_result.st_size, stat_result.st_mtime_ns]
+    
+    def _load_extraction_checkpoint(self) -> Dict[str, Dict]:
+        """Checkpointed extractions of this run whose documents are unchanged"""
+        checkpoint = {}
+        if not self.extraction_checkpoint.exists():
+            return checkpoint
+        
+        torn = False
+        with open(self.extraction_checkpoint, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    torn = True  # cut short by an interrupted write
+                    continue
+                checkpoint[entry["path"]] = entry
+        
+        # Rewrite without the torn line so later appends start on a fresh line
+        if torn:
+            with open(self.extraction_checkpoint, 'w', encoding='utf-8') as f:
+                for entry in checkpoint.values():
+                    f.write(json.dumps(entry) + "\n")
+        
+        return {
+            doc_path_str: entry for doc_path_str, entry in checkpoint.items()
+            if Path(doc_path_str).exists()
+            and self._document_stamp(Path(doc_path_str)) == entry["stamp"]
+        }
+    
+    def _extract_documents(self, doc_paths: List[str]):
+        """
+        Yield (path, extracted) for each document in input order
+        With more than one worker, documents are sharded by size class and
+        extracted in a process pool; results are buffered until every
+        earlier document is done, so the merge order matches serial runs.
+        """
+        if self.workers <= 1 or len(doc_paths) < 2:
+            for doc_path_str in doc_paths:
+                yield doc_path_str, self._extract_knowledge(Path(doc_path_str))
+            return
+        
+        shards = self._shard_by_size(doc_paths)
+        done = {}
+        next_index = 0
+        
+        with ProcessPoolExecutor(max_workers=self.workers,
+                                 initializer=_init_extraction_worker,
+                                 initargs=(self,)) as pool:
+            pending = {pool.submit(_extract_shard, shard) for shard in shards}
+            
+            while pending:
+                finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    done.update(future.result())
+                
+                while next_index in done:
+                    yield doc_paths[next_index], done.pop(next_index)
+                    next_index += 1
+    
+    def _shard_by_size(self, doc_paths: List[str]) -> List[List[Tuple[int, str]]]:
+        """Group (index, path) pairs into extraction tasks, largest size class first"""
+        by_class = {size_class: [] for size_class in ("very_large", "large", "medium", "small")}
+        for index, doc_path_str in enumerate(doc_paths):
+            size_class = self._classify_size(Path(doc_path_str).stat().st_size)
+            by_class[size_class].append((index, doc_path_str))
+        
+        shards = []
+        for size_class, docs in by_class.items():
+            shard_size = self.EXTRACTION_SHARD_SIZES[size_class]
+            shards.extend(docs[i:i + shard_size] for i in range(0, len(docs), shard_size))
+        return shards
+    
     def _classify_size(self, size: int) -> str:
         """Classify document by size"""
         if size < 10 * 1024:  # < 10KB
@@ -506,37 +1121,31 @@ class PhasedDocumentProcessor:
         relationships = []
         
         try:
-            with open(doc_path, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read()
+            # Entities (e.g. capitalized words) and relationships (e.g.
+            # "X is Y", "X has Y") come from one scan per block; documents
+            # are read in bounded blocks of whole lines, so very large files
+            # never sit in memory at once
+            patterns = self.extraction_patterns
+            entity_types = {}
+            pattern_matches = [[] for _ in patterns.relations]
             
-            # Simple entity extraction (can be enhanced with NLP)
-            # Extract capitalized words as potential entities
-            words = re.findall(r'\b[A-Z][a-z]+\b', content)
-            unique_words = set(words)
+            for content in self._iter_text_blocks(doc_path):
+                patterns.extract(content, entity_types, pattern_matches)
             
-            for word in unique_words:
+            for word in sorted(entity_types):
                 entities.append({
                     "name": word,
-                    "type": "concept",
+                    "type": entity_types[word],
                     "source": str(doc_path),
                     "confidence": 0.7
                 })
             
-            # Simple relationship extraction
-            # Look for patterns like "X is Y" or "X has Y"
-            patterns = [
-                r'(\w+)\s+is\s+(\w+)',
-                r'(\w+)\s+has\s+(\w+)',
-                r'(\w+)\s+contains\s+(\w+)'
-            ]
-            
-            for pattern in patterns:
-                matches = re.findall(pattern, content, re.IGNORECASE)
-                for match in matches:
+            for (_, relation_type), matches in zip(patterns.relations, pattern_matches):
+                for source, target in matches:
                     relationships.append({
-                        "source": match[0],
-                        "target": match[1],
-                        "type": "related",
+                        "source": source,
+                        "target": target,
+                        "type": relation_type,
                         "confidence": 0.6
                     })
         
@@ -548,40 +1157,54 @@ class PhasedDocumentProcessor:
             "relationships": relationships
         }
     
-    def _update_knowledge_graph(self, graph: Dict, extracted: Dict):
+    def _iter_text_blocks(self, doc_path: Path, block_chars: int = 1024 * 1024):
+        """Read a document as blocks of roughly block_chars, cut at line starts"""
+        block = []
+        size = 0
+        
+        for text, _, _, line_start in iter_text_pieces(doc_path):
+            if size >= block_chars and line_start:
+                yield "".join(block)
+                block = []
+                size = 0
+            block.append(text)
+            size += len(text)
+        
+        if block:
+            yield "".join(block)
+    
+    def _update_knowledge_graph(self, graph: KnowledgeGraph, extracted: Dict):
         """Update knowledge graph with extracted data"""
         # Add entities as nodes
         for entity in extracted["entities"]:
-            key = entity["name"].lower()
-            if key not in graph:
-                graph[key] = {
-                    "entity": entity,
-                    "connections": []
-                }
+            graph.add_entity(entity)
         
-        # Add relationships as edges
+        # Add relationships as weighted edges from known entities
         for rel in extracted["relationships"]:
-            source_key = rel["source"].lower()
-            target_key = rel["target"].lower()
-            
-            if source_key in graph:
-                graph[source_key]["connections"].append({
-                    "target": target_key,
-                    "type": rel["type"],
-                    "confidence": rel["confidence"]
-                })
+            graph.add_relationship(rel)
     
-    def _resolve_entity_conflict(self, entities: List[Dict]) -> Dict:
-        """Resolve conflicts between multiple entity definitions"""
-        # Simple resolution: choose highest confidence
-        best_entity = max(entities, key=lambda e: e.get("confidence", 0))
-        
-        return {
-            "entity": best_entity,
-            "method": "highest_confidence"
-        }
+    def _knowledge_graph(self, extraction_results: Optional[Dict] = None) -> KnowledgeGraph:
+        """
+        Graph from phase 3 of this run. A run resumed after phase 3 loads
+        the graph file phase 3 saved; only if that is missing is the graph
+        rebuilt from the phase 3 results, given or saved.
+        """
+        if self.knowledge_graph is None:
+            graph_file = self.phases_path / "knowledge_graph.bin"
+            if graph_file.exists():
+                self.knowledge_graph = KnowledgeGraph.load(graph_file)
+            else:
+                if extraction_results is None:
+                    extraction_results = self._load_phase_results(ProcessingPhase.EXTRACTION)
+                graph = KnowledgeGraph()
+                self._update_knowledge_graph(graph, {
+                    "entities": extraction_results.get("extracted_entities", []),
+                    "relationships": extraction_results.get("extracted_relationships", [])
+                })
+                self.knowledge_graph = graph
+        return self.knowledge_graph
     
-    def _build_hierarchy(self, knowledge: Dict) -> Dict:
+    def _build_hierarchy(self, graph: KnowledgeGraph) -> Dict:
         """Build knowledge hierarchy"""
         hierarchy = {
             "root": {
@@ -590,19 +1213,17 @@ class PhasedDocumentProcessor:
             }
         }
         
-        # Simple hierarchy based on entity types
-        for key, entity in knowledge.items():
-            entity_type = entity.get("type", "unknown")
-            
-            if entity_type not in hierarchy["root"]["children"]:
-                hierarchy["root"]["children"][entity_type] = {
-                    "children": {},
-                    "level": 1
-                }
-            
-            hierarchy["root"]["children"][entity_type]["children"][key] = {
-                "entity": entity,
-                "level": 2
+        # Simple hierarchy based on entity types, from the graph's type index
+        for entity_type, nodes in graph.nodes_by_type().items():
+            hierarchy["root"]["children"][entity_type] = {
+                "children": {
+                    graph.keys[node]: {
+                        "entity": graph.best[node],
+                        "level": 2
+                    }
+                    for node in nodes
+                },
+                "level": 1
             }
         
         return hierarchy
@@ -642,28 +1263,20 @@ class PhasedDocumentProcessor:
             "issues": issues
         }
     
-    def _check_consistency(self, knowledge: Dict) -> Dict:
+    def _check_consistency(self, graph: KnowledgeGraph) -> Dict:
         """Check knowledge consistency"""
-        inconsistencies = []
-        
-        # Check for duplicate entities with different types
-        type_map = {}
-        for key, entity in knowledge.items():
-            entity_name = entity.get("name", "").lower()
-            entity_type = entity.get("type")
-            
-            if entity_name in type_map:
-                if type_map[entity_name] != entity_type:
-                    inconsistencies.append({
-                        "issue": "type_mismatch",
-                        "entity": entity_name,
-                        "types": [type_map[entity_name], entity_type]
-                    })
-            else:
-                type_map[entity_name] = entity_type
+        # Entities mentioned with different types, recorded as they were added
+        inconsistencies = [
+            {
+                "issue": "type_mismatch",
+                "entity": graph.keys[node],
+                "types": types
+            }
+            for node, types in sorted(graph.type_conflicts.items())
+        ]
         
         # Calculate consistency score
-        total_entities = len(knowledge)
+        total_entities = graph.entity_count
         consistency_score = 1.0 - (len(inconsistencies) / max(total_entities, 1))
         
         return {
@@ -696,27 +1309,69 @@ class PhasedDocumentProcessor:
         knowledge_str = json.dumps(knowledge, sort_keys=True)
         return hashlib.sha256(knowledge_str.encode()).hexdigest()[:16]
     
+    def _phase_result_file(self, phase: ProcessingPhase, result_format: str,
+                           compression: str) -> Path:
+        """Path of a phase result file for a format and compression"""
+        extension = PHASE_RESULT_SERIALIZERS[result_format].extension
+        suffix = PHASE_RESULT_COMPRESSION[compression][0]
+        return self.phases_path / f"{phase.value}_results.{extension}{suffix}"
+    
     def _save_phase_results(self, phase: ProcessingPhase, results: Dict):
         """Save phase processing results"""
-        phase_file = self.phases_path / f"{phase.value}_results.yaml"
-        with open(phase_file, 'w') as f:
-            yaml.dump(results, f, default_flow_style=False)
+        phase_file = self._phase_result_file(phase, self.result_format, self.compression)
+        opener = PHASE_RESULT_COMPRESSION[self.compression][1]
+        with opener(phase_file, 'wb') as f:
+            PHASE_RESULT_SERIALIZERS[self.result_format].dump(results, f)
+        
+        # Drop results left in other formats so loads never see stale data
+        for stale in self.phases_path.glob(f"{phase.value}_results.*"):
+            if stale != phase_file:
+                stale.unlink()
         
         # Update phase status
         self.phase_status["completed_phases"].append(phase.value)
+        run = self.phase_status.get("run")
+        if run and phase.value not in run["completed_phases"]:
+            run["completed_phases"].append(phase.value)
         self.phase_status["phase_metrics"][phase.value] = {
             "completed_at": datetime.now().isoformat(),
-            "result_size": len(str(results))
+            "result_size": phase_file.stat().st_size,
+            "result_file": phase_file.name
         }
         self.save_phase_status()
     
     def _load_phase_results(self, phase: ProcessingPhase) -> Dict:
         """Load phase processing results"""
+        for result_format in PHASE_RESULT_SERIALIZERS:
+            for compression, (_, opener) in PHASE_RESULT_COMPRESSION.items():
+                phase_file = self._phase_result_file(phase, result_format, compression)
+                if phase_file.exists():
+                    with opener(phase_file, 'rb') as f:
+                        return PHASE_RESULT_SERIALIZERS[result_format].load(f)
+        
+        # Results saved before the serializers were introduced
         phase_file = self.phases_path / f"{phase.value}_results.yaml"
         if phase_file.exists():
             with open(phase_file, 'r') as f:
                 return yaml.safe_load(f) or {}
         return {}
+    
+    def export_phase_results(self, export_path: Optional[Path] = None) -> List[Path]:
+        """Write saved phase results as human-readable YAML"""
+        export_path = export_path or self.phases_path / "export"
+        export_path.mkdir(parents=True, exist_ok=True)
+        
+        exported = []
+        for phase in ProcessingPhase:
+            results = self._load_phase_results(phase)
+            if not results:
+                continue
+            export_file = export_path / f"{phase.value}_results.yaml"
+            with open(export_file, 'w') as f:
+                yaml.dump(results, f, default_flow_style=False)
+            exported.append(export_file)
+        
+        return exported
 
 
 class ModularAgentManager:
@@ -994,6 +1649,548 @@ class ModularAgentManager:
             return 16000  # Full context for general agents
 
 
+def iter_text_pieces(source, encoding: str = 'utf-8', block_size: int = 1024 * 1024):
+    """
+    Yield (text, byte_offset, byte_length, line_start) pieces of a document.
+    
+    `source` is a file path or an open text/binary stream. Pieces are whole
+    lines unless a line is longer than `block_size`, in which case it is cut
+    after its last whitespace so no word spans two pieces. Bytes are decoded
+    with errors ignored; text streams are encoded only to count bytes.
+    """
+    if isinstance(source, (str, Path)):
+        with open(source, 'rb') as f:
+            yield from iter_text_pieces(f, encoding, block_size)
+        return
+    
+    offset = 0
+    line_start = True
+    carry = None
+    
+    while True:
+        read = source.readline(block_size)
+        piece = carry + read if carry else read
+        carry = None
+        if not piece:
+            break
+        
+        binary = isinstance(piece, bytes)
+        if read and not piece.endswith(b'\n' if binary else '\n'):
+            # Line continues: hold back a trailing partial word
+            cut = len(piece) if piece[-1:].isspace() else len(piece) - len(piece.rsplit(None, 1)[-1])
+            piece, carry = piece[:cut], piece[cut:]
+            if not piece:
+                continue
+        
+        if binary:
+            text, length = piece.decode(encoding, errors='ignore'), len(piece)
+        else:
+            text, length = piece, len(piece.encode(encoding, errors='ignore'))
+        
+        yield text, offset, length, line_start
+        offset += length
+        line_start = text.endswith('\n')
+
+
+class WordWindow:
+    """
+    Fixed-size word windows with overlap, fed incrementally
+    
+    A window closes as soon as its words joined by single spaces reach
+    `limit` characters, and the next window starts with its last `overlap`
+    words. The joined length is kept as a running count, so each window is
+    joined once rather than once per word.
+    """
+    
+    def __init__(self, limit: int, overlap: int = 50, encoding: Optional[str] = None):
+        self.limit = limit
+        self.overlap = overlap
+        self.encoding = encoding  # offsets are bytes when set, characters otherwise
+        self.words = []  # (word, start, end)
+        self.length = -1  # len(" ".join(words)) == sum of word lengths + len(words) - 1
+    
+    def feed(self, text: str, offset: int = 0):
+        """Add text starting at offset, yielding (chunk_text, start, end) per closed window"""
+        count_bytes = self.encoding is not None and not text.isascii()
+        position = 0
+        byte_position = offset
+        
+        for match in re.finditer(r'\S+', text):
+            word = match.group()
+            if count_bytes:
+                byte_position += len(text[position:match.start()].encode(self.encoding, errors='ignore'))
+                start = byte_position
+                byte_position += len(word.encode(self.encoding, errors='ignore'))
+                end = byte_position
+                position = match.end()
+            else:
+                start, end = offset + match.start(), offset + match.end()
+            
+            self.words.append((word, start, end))
+            self.length += len(word) + 1
+            
+            if self.length >= self.limit:
+                yield self._window()
+                self.words = self.words[-self.overlap:] if self.overlap else []
+                self.length = sum(len(w) for w, _, _ in self.words) + len(self.words) - 1
+    
+    def close(self):
+        """Yield the trailing window, overlap included"""
+        if self.words:
+            yield self._window()
+        self.words = []
+        self.length = -1
+    
+    def _window(self) -> Tuple[str, int, int]:
+        return " ".join(w for w, _, _ in self.words), self.words[0][1], self.words[-1][2]
+
+
+class SectionSplitter:
+    """
+    Incremental form of the heading re.split used by the chunkers
+    
+    Pieces from iter_text_pieces are fed in order. A section is buffered only
+    until it exceeds `limit` characters; after that its pieces go straight to
+    a nested splitter for subsections or to a WordWindow, so memory is bound
+    by the chunk limits rather than the document size.
+    Yields (text, phase, size, byte_start, byte_end) tuples.
+    """
+    
+    def __init__(self, levels: Tuple[int, int], limit: int, phase: Optional[int],
+                 subsections=None, window: Tuple[int, Optional[int]] = (1500, None),
+                 encoding: str = 'utf-8'):
+        self.heading = re.compile(r'#{%d,%d}\s' % levels)
+        self.limit = limit
+        self.phase = phase
+        self.subsections = subsections  # factory for the nested splitter
+        self.window_size, self.window_phase = window
+        self.encoding = encoding
+        
+        self.in_heading = None  # 'blank' while the heading match is still all whitespace, else 'line'
+        self.buffer = []
+        self.chars = 0
+        self.large = None
+    
+    def feed(self, text: str, offset: int, length: int, line_start: bool):
+        """Feed one piece of the document"""
+        if self.in_heading is None and line_start:
+            match = self.heading.match(text)
+            if match:
+                yield from self._close_section()
+                # \s+ runs on through blank lines, then .*? takes the rest of a line
+                self.in_heading = 'line' if text[match.end():].strip() else 'blank'
+                if self.in_heading == 'line':
+                    yield from self._end_heading(text, offset, length)
+                return
+        
+        if self.in_heading == 'blank':
+            if not text.strip():
+                return
+            self.in_heading = 'line'
+        
+        if self.in_heading == 'line':
+            yield from self._end_heading(text, offset, length)
+            return
+        
+        yield from self._add(text, offset, length, line_start)
+    
+    def close(self):
+        """Flush the last section"""
+        yield from self._close_section()
+        self.in_heading = None
+    
+    def _end_heading(self, text: str, offset: int, length: int):
+        # The heading match stops before the newline, which opens the next section
+        if text.endswith('\n'):
+            self.in_heading = None
+            yield from self._add('\n', offset + length - 1, 1, True)
+    
+    def _add(self, text: str, offset: int, length: int, line_start: bool):
+        if self.large is not None:
+            yield from self._feed_large(text, offset, length, line_start)
+            return
+        
+        self.buffer.append((text, offset, length, line_start))
+        self.chars += len(text)
+        
+        if self.chars > self.limit:
+            # Section is too large to keep whole: replay it into the next level
+            if self.subsections:
+                self.large = self.subsections()
+            else:
+                self.large = WordWindow(self.window_size, encoding=self.encoding)
+            buffered, self.buffer = self.buffer, []
+            for piece in buffered:
+                yield from self._feed_large(*piece)
+    
+    def _feed_large(self, text: str, offset: int, length: int, line_start: bool):
+        if isinstance(self.large, WordWindow):
+            for chunk_text, start, end in self.large.feed(text, offset):
+                yield chunk_text, self.window_phase, len(chunk_text), start, end
+        else:
+            yield from self.large.feed(text, offset, length, line_start)
+    
+    def _close_section(self):
+        if self.large is not None:
+            if isinstance(self.large, WordWindow):
+                for chunk_text, start, end in self.large.close():
+                    yield chunk_text, self.window_phase, len(chunk_text), start, end
+            else:
+                yield from self.large.close()
+            self.large = None
+        elif self.buffer:
+            section = "".join(text for text, _, _, _ in self.buffer)
+            stripped = section.strip()
+            if stripped:
+                lead = len(section) - len(section.lstrip())
+                start = self.buffer[0][1] + len(section[:lead].encode(self.encoding, errors='ignore'))
+                end = start + len(stripped.encode(self.encoding, errors='ignore'))
+                yield stripped, self.phase, len(section), start, end
+        
+        self.buffer = []
+        self.chars = 0
+
+
+class ChunkStore:
+    """
+    Content-addressed chunk index backed by SQLite
+    
+    Chunk text is stored once per SHA256 of the text and documents keep an
+    ordered list of references to it, so boilerplate repeated across
+    documents costs one row of text. Each document also records its size,
+    mtime, content hash and chunking strategy so unchanged documents can be
+    skipped without re-chunking.
+    """
+    
+    def __init__(self, db_path: Path, batch_size: int = 500):
+        self.db_path = db_path
+        self.batch_size = batch_size
+        
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self._create_tables()
+    
+    def _create_tables(self):
+        """Create chunk, reference and document tables"""
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS chunks (
+                hash TEXT PRIMARY KEY,
+                text TEXT,
+                size INTEGER
+            )
+        """)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS document_chunks (
+                doc_path TEXT,
+                position INTEGER,
+                chunk_id TEXT,
+                chunk_hash TEXT,
+                phase INTEGER,
+                byte_start INTEGER,
+                byte_end INTEGER,
+                PRIMARY KEY (doc_path, position)
+            )
+        """)
+        self.conn.execute("""
+            CREATE INDEX IF NOT EXISTS document_chunks_hash
+            ON document_chunks (chunk_hash)
+        """)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS documents (
+                path TEXT PRIMARY KEY,
+                content_hash TEXT,
+                size INTEGER,
+                mtime_ns INTEGER,
+                strategy TEXT,
+                chunk_count INTEGER,
+                indexed_at TEXT
+            )
+        """)
+        self.conn.commit()
+    
+    @staticmethod
+    def file_hash(path: Path) -> str:
+        """SHA256 of a file's bytes, read in blocks"""
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(block)
+        return digest.hexdigest()
+    
+    def get_document(self, path: str) -> Optional[Dict]:
+        """Indexed state of a document, or None"""
+        row = self.conn.execute(
+            "SELECT content_hash, size, mtime_ns, strategy, chunk_count FROM documents WHERE path = ?",
+            (path,)
+        ).fetchone()
+        if row is None:
+            return None
+        return dict(zip(("content_hash", "size", "mtime_ns", "strategy", "chunk_count"), row))
+    
+    def touch_document(self, path: str, stat_result: os.stat_result):
+        """Record a new size/mtime for a document whose content did not change"""
+        self.conn.execute(
+            "UPDATE documents SET size = ?, mtime_ns = ? WHERE path = ?",
+            (stat_result.st_size, stat_result.st_mtime_ns, path)
+        )
+        self.conn.commit()
+    
+    def replace_document(self, path: str, content_hash: str, stat_result: os.stat_result,
+                         strategy: str, chunks, hash_fn) -> Dict:
+        """
+        Replace a document's chunk references with `chunks`
+        Only chunks whose hash is not stored yet have their text written.
+        """
+        self.conn.execute("DELETE FROM document_chunks WHERE doc_path = ?", (path,))
+        
+        counts = {"chunks": 0, "new_chunks": 0}
+        chunk_rows = []
+        ref_rows = []
+        
+        def flush():
+            before = self.conn.total_changes
+            self.conn.executemany("INSERT OR IGNORE INTO chunks VALUES (?, ?, ?)", chunk_rows)
+            counts["new_chunks"] += self.conn.total_changes - before
+            self.conn.executemany(
+                "INSERT INTO document_chunks VALUES (?, ?, ?, ?, ?, ?, ?)", ref_rows
+            )
+            chunk_rows.clear()
+            ref_rows.clear()
+        
+        for position, chunk in enumerate(chunks):
+            chunk_hash = hash_fn(chunk["text"])
+            chunk_rows.append((chunk_hash, chunk["text"], chunk["size"]))
+            ref_rows.append((path, position, chunk["id"], chunk_hash, chunk.get("phase"),
+                             chunk.get("byte_start"), chunk.get("byte_end")))
+            counts["chunks"] += 1
+            if len(ref_rows) >= self.batch_size:
+                flush()
+        flush()
+        
+        self.conn.execute(
+            "INSERT OR REPLACE INTO documents VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (path, content_hash, stat_result.st_size, stat_result.st_mtime_ns,
+             strategy, counts["chunks"], datetime.now().isoformat())
+        )
+        self.conn.commit()
+        return counts
+    
+    def remove_document(self, path: str):
+        """Drop a document and its chunk references"""
+        self.conn.execute("DELETE FROM document_chunks WHERE doc_path = ?", (path,))
+        self.conn.execute("DELETE FROM documents WHERE path = ?", (path,))
+        self.conn.commit()
+    
+    def prune(self) -> int:
+        """Delete chunks no document references; returns the number removed"""
+        cursor = self.conn.execute("""
+            DELETE FROM chunks WHERE NOT EXISTS (
+                SELECT 1 FROM document_chunks WHERE chunk_hash = chunks.hash
+            )
+        """)
+        self.conn.commit()
+        return cursor.rowcount
+    
+    def get_chunks(self, path: str) -> List[Dict]:
+        """Chunks of a document in order, in the chunk_document record shape"""
+        rows = self.conn.execute("""
+            SELECT r.chunk_id, c.text, d.strategy, r.phase, c.size, r.byte_start, r.byte_end, c.hash
+            FROM document_chunks r
+            JOIN chunks c ON c.hash = r.chunk_hash
+            JOIN documents d ON d.path = r.doc_path
+            WHERE r.doc_path = ?
+            ORDER BY r.position
+        """, (path,))
+        
+        chunks = []
+        for chunk_id, text, strategy, phase, size, byte_start, byte_end, chunk_hash in rows:
+            chunk = {"id": chunk_id, "text": text, "strategy": strategy}
+            if phase is not None:
+                chunk["phase"] = phase
+            chunk.update({"size": size, "byte_start": byte_start, "byte_end": byte_end,
+                          "hash": chunk_hash})
+            chunks.append(chunk)
+        return chunks
+    
+    def stats(self) -> Dict:
+        """Store-wide dedup figures"""
+        documents = self.conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+        chunk_refs, referenced_bytes = self.conn.execute("""
+            SELECT COUNT(*), COALESCE(SUM(c.size), 0)
+            FROM document_chunks r JOIN chunks c ON c.hash = r.chunk_hash
+        """).fetchone()
+        unique_chunks, stored_bytes = self.conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM chunks"
+        ).fetchone()
+        
+        return {
+            "documents": documents,
+            "chunk_refs": chunk_refs,
+            "unique_chunks": unique_chunks,
+            "dedup_ratio": round(1 - unique_chunks / chunk_refs, 4) if chunk_refs else 0.0,
+            "stored_bytes": stored_bytes,
+            "bytes_saved": max(referenced_bytes - stored_bytes, 0)
+        }
+    
+    def close(self):
+        """Close the database connection"""
+        self.conn.close()
+
+
+class DocumentRegistry:
+    """
+    Documentation registry backed by SQLite
+    
+    Documents and module memberships are rows, so registering a document
+    writes one row instead of the whole registry, and a module lists each
+    document once however often it is processed. The small sections
+    (chunks, embeddings, phases, module metadata) are one JSON value each.
+    Validation issues are appended to the YAML validation log.
+    """
+    
+    SECTIONS = ("chunks", "embeddings", "phases", "modules")
+    REQUIRED_FIELDS = ["path", "category", "hash", "title", "added_date"]
+    
+    def __init__(self, db_path: Path, validation_log: Path):
+        self.db_path = db_path
+        self.validation_log = validation_log
+        self.pending_validations = []
+        
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self._create_tables()
+    
+    def _create_tables(self):
+        """Create document, membership and section tables"""
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS documents (
+                doc_id TEXT PRIMARY KEY,
+                info TEXT
+            )
+        """)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS module_documents (
+                module TEXT,
+                path TEXT,
+                PRIMARY KEY (module, path)
+            ) WITHOUT ROWID
+        """)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS sections (
+                name TEXT PRIMARY KEY,
+                value TEXT
+            )
+        """)
+        self.conn.commit()
+    
+    def is_empty(self) -> bool:
+        """Whether nothing has been stored yet"""
+        return not any(
+            self.conn.execute(f"SELECT 1 FROM {table} LIMIT 1").fetchone()
+            for table in ("documents", "module_documents", "sections")
+        )
+    
+    def load_sections(self) -> Dict:
+        """All sections, empty ones included"""
+        sections = {name: {} for name in self.SECTIONS}
+        for name, value in self.conn.execute("SELECT name, value FROM sections"):
+            sections[name] = json.loads(value)
+        return sections
+    
+    def save_sections(self, sections: Dict):
+        """Stage the sections for the next commit"""
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO sections (name, value) VALUES (?, ?)",
+            [(name, json.dumps(value, default=str)) for name, value in sections.items()]
+        )
+    
+    def upsert_document(self, doc_id: str, info: Dict):
+        """Add or replace one document, validating only that document"""
+        self._validate_document(doc_id, info)
+        self.conn.execute(
+            "INSERT OR REPLACE INTO documents (doc_id, info) VALUES (?, ?)",
+            (doc_id, json.dumps(info, default=str))
+        )
+    
+    def get_document(self, doc_id: str) -> Optional[Dict]:
+        """Stored info of a document, or None"""
+        row = self.conn.execute(
+            "SELECT info FROM documents WHERE doc_id = ?", (doc_id,)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+    
+    def remove_document(self, doc_id: str):
+        """Drop a document from the registry"""
+        self.conn.execute("DELETE FROM documents WHERE doc_id = ?", (doc_id,))
+    
+    def iter_documents(self):
+        """Yield (doc_id, info) for every document"""
+        for doc_id, info in self.conn.execute("SELECT doc_id, info FROM documents"):
+            yield doc_id, json.loads(info)
+    
+    def document_count(self) -> int:
+        """Number of registered documents"""
+        return self.conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+    
+    def add_module_documents(self, module: str, paths: List[str]) -> int:
+        """Add documents to a module; returns how many were not members yet"""
+        before = self.conn.total_changes
+        self.conn.executemany(
+            "INSERT OR IGNORE INTO module_documents (module, path) VALUES (?, ?)",
+            [(module, path) for path in paths]
+        )
+        return self.conn.total_changes - before
+    
+    def module_documents(self, module: str) -> List[str]:
+        """Documents of a module, each once"""
+        return [
+            row[0] for row in self.conn.execute(
+                "SELECT path FROM module_documents WHERE module = ? ORDER BY path",
+                (module,)
+            )
+        ]
+    
+    def _validate_document(self, doc_id: str, info: Dict) -> bool:
+        """Queue a validation issue for a document with missing fields"""
+        missing_fields = [f for f in self.REQUIRED_FIELDS if f not in info]
+        if missing_fields:
+            self.pending_validations.append({
+                "doc_id": doc_id,
+                "issue": "missing_fields",
+                "fields": missing_fields,
+                "timestamp": datetime.now().isoformat()
+            })
+        return not missing_fields
+    
+    def validate_all(self) -> int:
+        """Validate every document; returns the number of issues found"""
+        return sum(
+            not self._validate_document(doc_id, info)
+            for doc_id, info in self.iter_documents()
+        )
+    
+    def commit(self):
+        """Commit staged rows and append queued validation issues to the log"""
+        self.conn.commit()
+        if not self.pending_validations:
+            return
+        
+        # Entries continue the log's top-level "validations" list
+        new_log = not self.validation_log.exists()
+        with open(self.validation_log, 'a') as f:
+            if new_log:
+                f.write("validations:\n")
+            yaml.dump(self.pending_validations, f, default_flow_style=False)
+        self.pending_validations = []
+    
+    def close(self):
+        """Commit and close the database connection"""
+        self.commit()
+        self.conn.close()
+
+
 class EnhancedDocumentationManager:
     """
     Enhanced documentation manager v3.0 combining:
@@ -1002,15 +2199,23 @@ class EnhancedDocumentationManager:
     - Modular agent management
     """
     
-    def __init__(self, agent_path: Path):
+    def __init__(self, agent_path: Path, workers: int = 1,
+                 result_format: str = "auto", compression: str = "none"):
         self.agent_path = agent_path
         self.context_path = agent_path / "context"
-        self.registry_file = self.context_path / "docs_registry.yaml"
+        self.registry_file = self.context_path / "docs_registry.yaml"  # pre-SQLite registry
         self.validation_log = self.context_path / "validation_log.yaml"
-        self.chunk_index = self.context_path / "chunk_index.json"
+        self.chunk_index = self.context_path / "chunk_index.db"
+        self.embedding_index = self.context_path / "embeddings"
+        self.context_path.mkdir(parents=True, exist_ok=True)
+        self.doc_registry = DocumentRegistry(
+            self.context_path / "docs_registry.db", self.validation_log
+        )
         
         # Initialize processors
-        self.phased_processor = PhasedDocumentProcessor(agent_path)
+        self.phased_processor = PhasedDocumentProcessor(
+            agent_path, workers, result_format, compression
+        )
         self.modular_manager = ModularAgentManager(agent_path.parent)
         
         # Load registry
@@ -1031,102 +2236,112 @@ class EnhancedDocumentationManager:
             layer_dir.mkdir(parents=True, exist_ok=True)
     
     def load_registry(self) -> dict:
-        """Load or initialize documentation registry"""
-        if self.registry_file.exists():
-            with open(self.registry_file, 'r') as f:
-                return yaml.safe_load(f) or {
-                    "documents": {}, 
-                    "chunks": {}, 
-                    "embeddings": {},
-                    "phases": {},
-                    "modules": {}
-                }
-        return {
-            "documents": {}, 
-            "chunks": {}, 
-            "embeddings": {},
-            "phases": {},
-            "modules": {}
-        }
+        """
+        Load the registry sections, importing a YAML registry on first use
+        Documents themselves stay in the database; see register_document.
+        """
+        if self.doc_registry.is_empty() and self.registry_file.exists():
+            self._import_yaml_registry()
+        return self.doc_registry.load_sections()
     
-    def save_registry(self):
-        """Save documentation registry with validation"""
-        self.context_path.mkdir(parents=True, exist_ok=True)
-        
-        # Validate registry before saving
-        self.validate_registry()
+    def _import_yaml_registry(self):
+        """Move a docs_registry.yaml from before the SQLite registry into it"""
+        with open(self.registry_file, 'r') as f:
+            legacy = yaml.safe_load(f) or {}
+        
+        for doc_id, doc_info in (legacy.get("documents") or {}).items():
+            self.doc_registry.upsert_document(doc_id, doc_info)
+        
+        modules = legacy.get("modules") or {}
+        for module_name, module_info in modules.items():
+            self.doc_registry.add_module_documents(
+                module_name, module_info.pop("documents", None) or []
+            )
         
-        with open(self.registry_file, 'w') as f:
-            yaml.dump(self.registry, f, default_flow_style=False, sort_keys=False)
+        self.doc_registry.save_sections({
+            name: legacy.get(name) or {} for name in DocumentRegistry.SECTIONS
+        })
+        self.doc_registry.commit()
     
-    def validate_registry(self):
-        """Validate registry for context poisoning prevention"""
-        validation_results = []
-        
-        for doc_id, doc_info in self.registry.get("documents", {}).items():
-            # Check for missing required fields
-            required_fields = ["path", "category", "hash", "title", "added_date"]
-            missing_fields = [f for f in required_fields if f not in doc_info]
-            
-            if missing_fields:
-                validation_results.append({
-                    "doc_id": doc_id,
-                    "issue": "missing_fields",
-                    "fields": missing_fields,
-                    "timestamp": datetime.now().isoformat()
-                })
-        
-        # Save validation log
-        if validation_results:
-            with open(self.validation_log, 'w') as f:
-                yaml.dump({"validations": validation_results}, f)
+    def save_registry(self):
+        """Save the registry sections; documents are written as they are registered"""
+        self.doc_registry.save_sections(self.registry)
+        self.doc_registry.commit()
+    
+    def register_document(self, doc_id: str, doc_info: Dict):
+        """Add or update one document, validating only that document"""
+        self.doc_registry.upsert_document(doc_id, doc_info)
+    
+    def validate_registry(self) -> int:
+        """Validate every document for context poisoning prevention"""
+        issues = self.doc_registry.validate_all()
+        self.doc_registry.commit()
+        return issues
     
     def process_documents_phased(self, doc_paths: List[Path], 
-                                module_name: Optional[str] = None) -> Dict:
+                                module_name: Optional[str] = None,
+                                resume: bool = True) -> Dict:
         """
         Process documents using phased approach
         Implements mixed-documentation-agent specification
+        An interrupted run over the same documents resumes from its last
+        completed phase, and phase 3 from its last extracted document,
+        unless resume is False.
         """
         print("\n📚 Starting Phased Document Processing")
         print(f"   Total documents: {len(doc_paths)}")
         if module_name:
             print(f"   Target module: {module_name}")
         
+        processor = self.phased_processor
+        completed = processor.begin_run(doc_paths, module_name, resume)
+        if completed:
+            print(f"   ↻ Resuming run: {len(completed)} of {len(ProcessingPhase)} phases complete")
+        
         results = {}
         
         # Phase 1: Discovery
-        results["discovery"] = self.phased_processor.phase1_discovery(doc_paths)
+        results["discovery"] = processor.run_phase(
+            ProcessingPhase.DISCOVERY,
+            lambda: processor.phase1_discovery(doc_paths)
+        )
         print(f"   ✓ Discovery complete: {results['discovery']['total_documents']} documents")
         
         # Phase 2: Quality Assessment
-        results["quality"] = self.phased_processor.phase2_quality_assessment(
-            results["discovery"]
+        results["quality"] = processor.run_phase(
+            ProcessingPhase.QUALITY_ASSESSMENT,
+            lambda: processor.phase2_quality_assessment(results["discovery"])
         )
         print(f"   ✓ Quality assessment: {len(results['quality']['high_priority'])} high priority")
         
         # Phase 3: Extraction
-        results["extraction"] = self.phased_processor.phase3_extraction(
-            results["quality"], self
+        results["extraction"] = processor.run_phase(
+            ProcessingPhase.EXTRACTION,
+            lambda: processor.phase3_extraction(results["quality"], self)
         )
         print(f"   ✓ Extraction: {results['extraction']['extraction_metrics']['total_entities']} entities")
         
         # Phase 4: Synthesis
-        results["synthesis"] = self.phased_processor.phase4_synthesis(
-            results["extraction"]
+        results["synthesis"] = processor.run_phase(
+            ProcessingPhase.SYNTHESIS,
+            lambda: processor.phase4_synthesis(results["extraction"])
         )
         print(f"   ✓ Synthesis: {results['synthesis']['synthesis_metrics']['total_synthesized']} synthesized")
         
         # Phase 5: Validation
-        results["validation"] = self.phased_processor.phase5_validation(
-            results["synthesis"]
+        results["validation"] = processor.run_phase(
+            ProcessingPhase.VALIDATION,
+            lambda: processor.phase5_validation(results["synthesis"])
         )
         print(f"   ✓ Validation: {results['validation']['quality_metrics']['validation_pass_rate']:.1%} pass rate")
         
         # Phase 6: Integration
-        results["integration"] = self.phased_processor.phase6_integration(
-            results["validation"], self
+        results["integration"] = processor.run_phase(
+            ProcessingPhase.INTEGRATION,
+            lambda: processor.phase6_integration(results["validation"], self)
         )
         print(f"   ✓ Integration: {results['integration']['integration_metrics']['total_integrated']} integrated")
+        processor.finish_run()
         
         # Update registry with phase results
         self.registry["phases"][datetime.now().isoformat()] = {
@@ -1136,17 +2351,31 @@ class EnhancedDocumentationManager:
             "integration_rate": results["integration"]["integration_metrics"]["integration_rate"]
         }
         
+        # Chunk index: unchanged documents and known chunks are skipped
+        chunk_stats = self.index_documents(doc_paths)
+        self.registry["chunks"] = chunk_stats["store"]
+        print(f"   ✓ Chunk index: {chunk_stats['documents_indexed']} indexed, "
+              f"{chunk_stats['documents_unchanged']} unchanged, "
+              f"{chunk_stats['store']['dedup_ratio']:.1%} dedup ratio")
+        
+        # Embeddings of new chunks for retrieval of relevant context
+        if ChunkEmbeddingIndex is not None:
+            embedding_stats = ChunkEmbeddingIndex(self.embedding_index).update(self.chunk_index)
+            self.registry["embeddings"] = embedding_stats
+            print(f"   ✓ Embeddings: {embedding_stats['new_chunks']} new, "
+                  f"{embedding_stats['chunks']} chunks in {embedding_stats['lists']} lists")
+        
         # If module specified, update module registry
         if module_name:
             if module_name not in self.registry["modules"]:
                 self.registry["modules"][module_name] = {
-                    "documents": [],
                     "last_processed": None,
                     "knowledge_count": 0
                 }
             
-            self.registry["modules"][module_name]["documents"].extend(
-                [str(p) for p in doc_paths]
+            # Membership is a set; reprocessing a document does not repeat it
+            self.doc_registry.add_module_documents(
+                module_name, [str(p) for p in doc_paths]
             )
             self.registry["modules"][module_name]["last_processed"] = datetime.now().isoformat()
             self.registry["modules"][module_name]["knowledge_count"] = \
@@ -1156,10 +2385,75 @@ class EnhancedDocumentationManager:
         
         return results
     
+    def search_context(self, query: str, k: int = 5) -> List[Dict]:
+        """Chunks most relevant to a query, from the local embedding index"""
+        if ChunkEmbeddingIndex is None:
+            raise RuntimeError("Context search needs numpy and the agent_os package")
+        return ChunkEmbeddingIndex(self.embedding_index).search(query, self.chunk_index, k)
+    
     def calculate_hash(self, content: str) -> str:
         """Calculate SHA256 hash of content"""
         return hashlib.sha256(content.encode()).hexdigest()
     
+    def index_documents(self, doc_paths: List[Path],
+                        strategy: ChunkingStrategy = ChunkingStrategy.PHASED) -> Dict:
+        """
+        Chunk documents into the content-addressed chunk index
+        Documents with unchanged size and mtime, or failing that an unchanged
+        content hash, are skipped; chunks already stored are only referenced.
+        """
+        stats = {
+            "documents_indexed": 0,
+            "documents_unchanged": 0,
+            "documents_removed": 0,
+            "chunks": 0,
+            "new_chunks": 0
+        }
+        
+        store = ChunkStore(self.chunk_index)
+        try:
+            for doc_path in doc_paths:
+                path = str(doc_path)
+                state = store.get_document(path)
+                
+                if not doc_path.exists():
+                    if state:
+                        store.remove_document(path)
+                        stats["documents_removed"] += 1
+                    continue
+                
+                stat_result = doc_path.stat()
+                if state and state["strategy"] == strategy.value:
+                    if (state["size"] == stat_result.st_size
+                            and state["mtime_ns"] == stat_result.st_mtime_ns):
+                        stats["documents_unchanged"] += 1
+                        continue
+                    
+                    content_hash = store.file_hash(doc_path)
+                    if state["content_hash"] == content_hash:
+                        store.touch_document(path, stat_result)
+                        stats["documents_unchanged"] += 1
+                        continue
+                else:
+                    content_hash = store.file_hash(doc_path)
+                
+                counts = store.replace_document(
+                    path, content_hash, stat_result, strategy.value,
+                    self.chunk_document_stream(doc_path, strategy), self.calculate_hash
+                )
+                stats["documents_indexed"] += 1
+                stats["chunks"] += counts["chunks"]
+                stats["new_chunks"] += counts["new_chunks"]
+            
+            store.prune()
+            stats["store"] = store.stats()
+        finally:
+            store.close()
+        
+        deduplicated = stats["chunks"] - stats["new_chunks"]
+        stats["dedup_ratio"] = round(deduplicated / stats["chunks"], 4) if stats["chunks"] else 0.0
+        return stats
+    
     def chunk_document(self, content: str, 
                       strategy: ChunkingStrategy = ChunkingStrategy.PHASED) -> List[Dict]:
         """
@@ -1172,6 +2466,47 @@ class EnhancedDocumentationManager:
             # Use existing chunking strategies from v2.0
             return self._standard_chunking(content, strategy)
     
+    def chunk_document_stream(self, source, 
+                              strategy: ChunkingStrategy = ChunkingStrategy.PHASED,
+                              encoding: str = 'utf-8'):
+        """
+        Streaming chunk_document over a file path or text/binary stream
+        
+        Yields the same chunks as chunk_document would for the whole text,
+        with the same ids, plus byte_start/byte_end offsets into the source.
+        Only the current section (up to the strategy's size limits) is held
+        in memory, so documents larger than memory can be chunked.
+        """
+        if strategy == ChunkingStrategy.PHASED:
+            prefix = "phased"
+            splitter = SectionSplitter(
+                (1, 2), 4000, 1,
+                subsections=lambda: SectionSplitter((3, 6), 2000, 2, window=(1500, 3), encoding=encoding),
+                encoding=encoding
+            )
+        elif strategy == ChunkingStrategy.HYBRID:
+            prefix = "hybrid"
+            splitter = SectionSplitter((1, 6), 2400, None, window=(2000, None), encoding=encoding)
+        else:
+            # No streaming form for strategies _standard_chunking does not implement
+            return
+        
+        chunk_id = 0
+        
+        def records(sections):
+            nonlocal chunk_id
+            for text, phase, size, byte_start, byte_end in sections:
+                record = {"id": f"{prefix}_{chunk_id}", "text": text, "strategy": prefix}
+                if phase is not None:
+                    record["phase"] = phase
+                record.update({"size": size, "byte_start": byte_start, "byte_end": byte_end})
+                chunk_id += 1
+                yield record
+        
+        for piece in iter_text_pieces(source, encoding):
+            yield from records(splitter.feed(*piece))
+        yield from records(splitter.close())
+    
     def _phased_chunking(self, content: str) -> List[Dict]:
         """
         Phased chunking strategy for large documents
@@ -1197,31 +2532,13 @@ class EnhancedDocumentationManager:
                     
                     # Phase 3: If still large, use fixed-size chunks
                     if len(subsection) > 2000:
-                        words = subsection.split()
-                        current_chunk = []
-                        
-                        for word in words:
-                            current_chunk.append(word)
-                            
-                            if len(" ".join(current_chunk)) >= 1500:
-                                chunk_text = " ".join(current_chunk)
-                                chunks.append({
-                                    "id": f"phased_{chunk_id}",
-                                    "text": chunk_text,
-                                    "strategy": "phased",
-                                    "phase": 3,
-                                    "size": len(chunk_text)
-                                })
-                                current_chunk = current_chunk[-50:]  # Overlap
-                                chunk_id += 1
-                        
-                        if current_chunk:
+                        for chunk_text, _, _ in self._word_windows(subsection, 1500):
                             chunks.append({
                                 "id": f"phased_{chunk_id}",
-                                "text": " ".join(current_chunk),
+                                "text": chunk_text,
                                 "strategy": "phased",
                                 "phase": 3,
-                                "size": len(" ".join(current_chunk))
+                                "size": len(chunk_text)
                             })
                             chunk_id += 1
                     else:
@@ -1264,27 +2581,12 @@ class EnhancedDocumentationManager:
                 
                 if len(section) > 2400:
                     # Break into smaller chunks
-                    words = section.split()
-                    current_chunk = []
-                    
-                    for word in words:
-                        current_chunk.append(word)
-                        if len(" ".join(current_chunk)) >= 2000:
-                            chunks.append({
-                                "id": f"hybrid_{chunk_id}",
-                                "text": " ".join(current_chunk),
-                                "strategy": "hybrid",
-                                "size": len(" ".join(current_chunk))
-                            })
-                            current_chunk = current_chunk[-50:]
-                            chunk_id += 1
-                    
-                    if current_chunk:
+                    for chunk_text, _, _ in self._word_windows(section, 2000):
                         chunks.append({
                             "id": f"hybrid_{chunk_id}",
-                            "text": " ".join(current_chunk),
+                            "text": chunk_text,
                             "strategy": "hybrid",
-                            "size": len(" ".join(current_chunk))
+                            "size": len(chunk_text)
                         })
                         chunk_id += 1
                 else:
@@ -1297,6 +2599,63 @@ class EnhancedDocumentationManager:
                     chunk_id += 1
         
         return chunks
+    
+    @staticmethod
+    def _word_windows(text: str, limit: int, overlap: int = 50):
+        """Yield (chunk_text, start, end) word windows over text, see WordWindow"""
+        window = WordWindow(limit, overlap)
+        yield from window.feed(text)
+        yield from window.close()
+    
+    def benchmark_chunking(self, sizes_mb: List[int]) -> List[Dict]:
+        """
+        Time both chunkers on synthetic markdown corpora of the given sizes.
+        Linear scaling shows up as a flat seconds-per-MB column.
+        """
+        vocabulary = ("agent module context phase extraction synthesis "
+                      "validation integration registry chunk document "
+                      "knowledge graph entity relation overlap").split()
+        
+        # ~1MB block: sections with subsections large enough for windowing
+        lines = []
+        word_index = 0
+        while sum(len(line) + 1 for line in lines) < 1024 * 1024:
+            lines.append(f"## Section {len(lines)}")
+            for sub in range(3):
+                lines.append(f"### Subsection {sub}")
+                for _ in range(40):
+                    words = [vocabulary[(word_index + i * 7) % len(vocabulary)] for i in range(12)]
+                    word_index += 1
+                    lines.append(" ".join(words) + ".")
+        block = "\n".join(lines) + "\n"
+        
+        results = []
+        print("\n⏱️  Chunking benchmark")
+        for size_mb in sizes_mb:
+            content = block * size_mb
+            row = {"size_mb": size_mb}
+            
+            for name, chunker in (
+                ("phased", self._phased_chunking),
+                ("hybrid", lambda text: self._standard_chunking(text, ChunkingStrategy.HYBRID))
+            ):
+                started = time.perf_counter()
+                chunk_count = len(chunker(content))
+                elapsed = time.perf_counter() - started
+                row[name] = {
+                    "chunks": chunk_count,
+                    "seconds": round(elapsed, 3),
+                    "seconds_per_mb": round(elapsed / size_mb, 4)
+                }
+            
+            results.append(row)
+            print(f"   {size_mb:>5} MB  phased {row['phased']['seconds']:>8.2f}s "
+                  f"({row['phased']['seconds_per_mb']:.4f} s/MB)  "
+                  f"hybrid {row['hybrid']['seconds']:>8.2f}s "
+                  f"({row['hybrid']['seconds_per_mb']:.4f} s/MB)")
+            del content
+        
+        return results
 
 
 class EnhancedAgentGeneratorV3:
@@ -1307,9 +2666,13 @@ class EnhancedAgentGeneratorV3:
     - Plus all v2.0 features
     """
     
-    def __init__(self, module_name: str, mode: AgentMode = AgentMode.CREATE):
+    def __init__(self, module_name: str, mode: AgentMode = AgentMode.CREATE, workers: int = 1,
+                 result_format: str = "auto", compression: str = "none"):
         self.module_name = module_name
         self.mode = mode
+        self.workers = workers
+        self.result_format = result_format
+        self.compression = compression
         self.agent_path = Path("agents") / module_name
         self.doc_manager = None
         self.modular_manager = ModularAgentManager(Path("agents"))
@@ -1317,14 +2680,18 @@ class EnhancedAgentGeneratorV3:
         if mode == AgentMode.UPDATE:
             if not self.agent_path.exists():
                 raise ValueError(f"Agent '{module_name}' does not exist. Use --mode create to create it.")
-            self.doc_manager = EnhancedDocumentationManager(self.agent_path)
+            self.doc_manager = EnhancedDocumentationManager(
+                self.agent_path, self.workers, self.result_format, self.compression
+            )
         elif mode == AgentMode.CREATE:
             if self.agent_path.exists():
                 raise ValueError(f"Agent '{module_name}' already exists. Use --mode update to modify it.")
         elif mode == AgentMode.REFRESH:
             if not self.agent_path.exists():
                 raise ValueError(f"Agent '{module_name}' does not exist. Cannot refresh.")
-            self.doc_manager = EnhancedDocumentationManager(self.agent_path)
+            self.doc_manager = EnhancedDocumentationManager(
+                self.agent_path, self.workers, self.result_format, self.compression
+            )
     
     def create_agent(self, agent_type: str = "general-purpose",
                     repos: List[str] = None,
@@ -1453,7 +2820,9 @@ class EnhancedAgentGeneratorV3:
             yaml.dump(agent_config, f, default_flow_style=False)
         
         # Initialize documentation manager
-        self.doc_manager = EnhancedDocumentationManager(self.agent_path)
+        self.doc_manager = EnhancedDocumentationManager(
+            self.agent_path, self.workers, self.result_format, self.compression
+        )
         self.doc_manager.save_registry()
         
         # Process initial documents if provided
@@ -1505,8 +2874,8 @@ This agent implements mandatory v3.0 principles:
 │   ├── metrics/             # Processing metrics
 │   └── phase_status.yaml    # Current status
 ├── context/                 # Context management
-│   ├── docs_registry.yaml   # Documentation registry
-│   ├── chunk_index.json     # Chunk index
+│   ├── docs_registry.db     # Documentation registry
+│   ├── chunk_index.db       # Content-addressed chunk index
 │   ├── module/              # Module-specific docs
 │   ├── submodule/           # Submodule-specific docs
 │   └── [other layers]/      # Context layers
@@ -1642,6 +3011,9 @@ Examples:
   # Check agent health
   %(prog)s my-module --mode update --health-check
   
+  # Find the chunks relevant to a question
+  %(prog)s my-module --mode update --search-context "retry policy" --top-k 3
+  
 Specialization Levels:
   - general-purpose: Broad capabilities
   - module-specific: Focused on module (>5 specs)
@@ -1686,6 +3058,53 @@ Specialization Levels:
             help='Use phased approach for document processing (mandatory for large collections)'
         )
         
+        self.parser.add_argument(
+            '--restart',
+            action='store_true',
+            help='Discard checkpoints of an interrupted phased run instead of resuming it'
+        )
+        
+        self.parser.add_argument(
+            '--workers',
+            type=int,
+            default=1,
+            help='Worker processes for phase 3 knowledge extraction (default: 1, serial)'
+        )
+        
+        self.parser.add_argument(
+            '--phase-format',
+            choices=['auto'] + list(PHASE_RESULT_SERIALIZERS),
+            default='auto',
+            help='Phase result file format (default: auto, msgpack when installed else jsonl)'
+        )
+        
+        self.parser.add_argument(
+            '--phase-compression',
+            choices=list(PHASE_RESULT_COMPRESSION),
+            default='none',
+            help='Phase result compression (default: none)'
+        )
+        
+        self.parser.add_argument(
+            '--export-phase-results',
+            action='store_true',
+            help='Export saved phase results as YAML for reading'
+        )
+        
+        self.parser.add_argument(
+            '--search-context',
+            type=str,
+            metavar='QUERY',
+            help='Show the indexed chunks most relevant to a query'
+        )
+        
+        self.parser.add_argument(
+            '--top-k',
+            type=int,
+            default=5,
+            help='Chunks returned by --search-context (default: 5)'
+        )
+        
         # Agent configuration
         self.parser.add_argument(
             '--type',
@@ -1741,6 +3160,15 @@ Specialization Levels:
             const='all',
             help='List documentation (optionally filtered by category)'
         )
+        
+        # Diagnostics
+        self.parser.add_argument(
+            '--benchmark-chunking',
+            nargs='?',
+            const='1,10,100',
+            metavar='SIZES_MB',
+            help='Benchmark the chunkers on synthetic corpora (comma-separated MB, default: 1,10,100)'
+        )
     
     def parse(self):
         """Parse and validate arguments"""
@@ -1751,6 +3179,12 @@ Specialization Levels:
             if args.health_check:
                 self.parser.error("Health check requires --mode update or refresh")
         
+        if args.workers < 1:
+            self.parser.error("--workers must be at least 1")
+        
+        if args.top_k < 1:
+            self.parser.error("--top-k must be at least 1")
+        
         if args.process_docs and not args.phased:
             print("⚠️  Warning: Large document collections should use --phased approach")
         
@@ -1764,12 +3198,23 @@ def main():
         parser = EnhancedArgumentParserV3()
         args = parser.parse()
         
+        if args.benchmark_chunking:
+            # Chunking benchmark runs against a throwaway agent directory
+            import tempfile
+            sizes_mb = [int(size) for size in args.benchmark_chunking.split(',')]
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                doc_manager = EnhancedDocumentationManager(Path(tmp_dir) / args.module_name)
+                doc_manager.benchmark_chunking(sizes_mb)
+            return
+        
         # Convert arguments
         repos = args.repos.split(',') if args.repos else None
         mode = AgentMode(args.mode)
         
         # Create generator
-        generator = EnhancedAgentGeneratorV3(args.module_name, mode)
+        generator = EnhancedAgentGeneratorV3(
+            args.module_name, mode, args.workers, args.phase_format, args.phase_compression
+        )
         
         if mode == AgentMode.CREATE:
             # Process documents if provided
@@ -1814,7 +3259,7 @@ def main():
                 
                 if args.phased:
                     results = generator.doc_manager.process_documents_phased(
-                        documents, args.module_name
+                        documents, args.module_name, resume=not args.restart
                     )
                     print(f"\n✅ Phased processing complete")
                     print(f"   Integration rate: {results['integration']['integration_metrics']['integration_rate']:.1%}")
@@ -1822,6 +3267,21 @@ def main():
                     print("Processing documents without phased approach...")
                     # Standard processing
             
+            elif args.export_phase_results:
+                # Human-readable copies of the binary phase results
+                exported = generator.doc_manager.phased_processor.export_phase_results()
+                print(f"\n📤 Exported {len(exported)} phase results")
+                for export_file in exported:
+                    print(f"   {export_file}")
+            
+            elif args.search_context:
+                # Relevant chunks from the local embedding index
+                matches = generator.doc_manager.search_context(args.search_context, args.top_k)
+                print(f"\n🔎 {len(matches)} relevant chunks")
+                for match in matches:
+                    source = match["documents"][0]
+                    print(f"   {match['score']:.3f}  {Path(source['path']).name} #{source['position']}")
+            
             elif args.add_doc:
                 # Add documentation
                 category = DocumentCategory(args.category)
@@ -8,9 +8,17 @@ from .prompt_evolution import PromptEvolutionTracker
 from .context_optimizer import ContextOptimizer
 from .workflow_refresh import WorkflowRefreshManager
 
+# Context retrieval needs numpy, an optional dependency
+try:
+    from .context_retrieval import ChunkEmbeddingIndex, HashingVectorizer
+except ImportError:
+    ChunkEmbeddingIndex = HashingVectorizer = None  # numpy missing
+
 __all__ = [
     'EnhancedSpecsIntegration',
     'PromptEvolutionTracker', 
     'ContextOptimizer',
+    'ChunkEmbeddingIndex',
+    'HashingVectorizer',
     'WorkflowRefreshManager'
 ]
\ No newline at end of file
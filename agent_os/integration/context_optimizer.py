@@ -7,6 +7,11 @@ import json
 from pathlib import Path
 from typing import Dict, Any, List, Optional
 
+try:
+    from .context_retrieval import ChunkEmbeddingIndex
+except ImportError:
+    ChunkEmbeddingIndex = None  # numpy missing: contexts pass through unchanged
+
 
 class ContextOptimizer:
     """Optimize and cache agent context for better performance."""
@@ -20,6 +25,11 @@ class ContextOptimizer:
         self.agent_path = agent_path
         self.cache_dir = agent_path / "context" / "optimized"
         self.cache_file = self.cache_dir / "cache.json"
+        self.chunk_index = agent_path / "context" / "chunk_index.db"
+        self.embedding_index = (
+            ChunkEmbeddingIndex(agent_path / "context" / "embeddings")
+            if ChunkEmbeddingIndex is not None else None
+        )
         
         # Ensure cache directory exists
         self.cache_dir.mkdir(parents=True, exist_ok=True)
@@ -27,18 +37,27 @@ class ContextOptimizer:
     def optimize_context(self, context: Dict[str, Any]) -> Dict[str, Any]:
         """Optimize context for better performance.
         
+        When the context has a "query", numpy is installed and the agent's
+        chunks are embedded, the "top_k" (default 5) most relevant chunks
+        are added as "relevant_chunks", so the agent can load those instead
+        of whole documents.
+        
         Args:
             context: Raw context data
             
         Returns:
             Optimized context data
         """
-        # For now, just return the context as-is
-        # Future implementation could include:
-        # - Text summarization
-        # - Embedding generation
-        # - Semantic chunking
-        return context
+        query = context.get("query")
+        if (not query or self.embedding_index is None or not self.chunk_index.exists()
+                or not self.embedding_index.exists()):
+            return context
+        
+        optimized = dict(context)
+        optimized["relevant_chunks"] = self.embedding_index.search(
+            query, self.chunk_index, k=context.get("top_k", 5)
+        )
+        return optimized
     
     def cache_context(self, context: Dict[str, Any]) -> None:
         """Cache optimized context.
@@ -0,0 +1,383 @@
+"""Local Context Retrieval for Agent OS.
+
+This module embeds the chunks of an agent's chunk index and finds the
+chunks most relevant to a query, so agents can load those instead of
+whole documents. Everything runs locally on the CPU.
+"""
+
+import json
+import re
+import sqlite3
+import zlib
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+
+class HashingVectorizer:
+    """Map text to fixed-size term-frequency vectors by feature hashing."""
+
+    # Cached term features are dropped past this many terms
+    MAX_CACHED_TERMS = 1_000_000
+
+    def __init__(self, dimensions: int = 512, bigrams: bool = True):
+        """Initialize hashing vectorizer.
+
+        Args:
+            dimensions: Vector length; terms are hashed into this many buckets
+            bigrams: Whether adjacent word pairs are features as well
+        """
+        self.dimensions = dimensions
+        self.bigrams = bigrams
+        self._features: Dict[str, tuple] = {}
+
+    def _feature(self, term: str) -> tuple:
+        """Bucket and sign of a term, stable across processes."""
+        feature = self._features.get(term)
+        if feature is None:
+            if len(self._features) >= self.MAX_CACHED_TERMS:
+                self._features.clear()
+            digest = zlib.crc32(term.encode('utf-8'))
+            feature = (digest % self.dimensions, 1.0 if digest & 0x80000000 else -1.0)
+            self._features[term] = feature
+        return feature
+
+    def transform(self, texts: List[str]) -> np.ndarray:
+        """Vectorize texts with sublinear term frequencies.
+
+        Args:
+            texts: Texts to vectorize
+
+        Returns:
+            float32 matrix with one row per text
+        """
+        matrix = np.zeros((len(texts), self.dimensions), dtype=np.float32)
+
+        for row, text in zip(matrix, texts):
+            tokens = TOKEN_PATTERN.findall(text.lower())
+            counts = Counter(tokens)
+            if self.bigrams:
+                counts.update(map(" ".join, zip(tokens, tokens[1:])))
+            if not counts:
+                continue
+
+            features = [self._feature(term) for term in counts]
+            buckets = np.fromiter((f[0] for f in features), dtype=np.int64, count=len(features))
+            signs = np.fromiter((f[1] for f in features), dtype=np.float32, count=len(features))
+            weights = 1.0 + np.log(np.fromiter(counts.values(), dtype=np.float32, count=len(counts)))
+            np.add.at(row, buckets, signs * weights)
+
+        return matrix
+
+
+class ChunkEmbeddingIndex:
+    """TF-IDF embeddings of indexed chunks with approximate nearest-neighbour search.
+
+    Raw hashed term frequencies are kept in a memory-mapped float32 matrix,
+    one row per distinct chunk, so an update only vectorizes chunks that are
+    new to the chunk index. IDF weights and row norms are recomputed from
+    the matrix on each update. Search probes the nearest clusters of an
+    inverted file (k-means over the weighted rows) and ranks only their rows
+    by cosine similarity; small indexes are scanned exactly.
+    """
+
+    # Below this many rows every search is an exact scan
+    EXACT_SEARCH_ROWS = 4096
+
+    # Rows read from the matrix at a time when recomputing norms and lists
+    BLOCK_ROWS = 8192
+
+    # Rebuild from scratch once fewer than this share of rows is still indexed
+    MIN_LIVE_RATIO = 0.75
+
+    def __init__(self, index_path: Path, dimensions: int = 512, bigrams: bool = True):
+        """Initialize chunk embedding index.
+
+        Args:
+            index_path: Directory holding the index files
+            dimensions: Embedding dimensions for a new index
+            bigrams: Whether a new index embeds word pairs as well
+        """
+        self.index_path = index_path
+        self.meta_file = index_path / "index.json"
+        self.vectors_file = index_path / "vectors.f32"
+        self.hashes_file = index_path / "chunk_hashes.txt"
+        self.arrays_file = index_path / "index_arrays.npz"
+
+        self.meta = self._load_meta() or {
+            "dimensions": dimensions,
+            "bigrams": bigrams,
+            "rows": 0
+        }
+        self.vectorizer = HashingVectorizer(self.meta["dimensions"], self.meta["bigrams"])
+        self._arrays: Optional[Dict[str, np.ndarray]] = None
+        self._hashes: Optional[List[str]] = None
+
+    def exists(self) -> bool:
+        """Whether the index has any embedded chunks."""
+        return self.meta["rows"] > 0 and self.arrays_file.exists()
+
+    def _load_meta(self) -> Optional[Dict[str, Any]]:
+        """Load index metadata."""
+        if self.meta_file.exists():
+            with open(self.meta_file, 'r') as f:
+                return json.load(f)
+        return None
+
+    def _load_hashes(self) -> List[str]:
+        """Chunk hash of each matrix row, in row order."""
+        if self._hashes is None:
+            self._hashes = []
+            if self.hashes_file.exists():
+                with open(self.hashes_file, 'r') as f:
+                    self._hashes = f.read().split()[:self.meta["rows"]]
+        return self._hashes
+
+    def _load_arrays(self) -> Dict[str, np.ndarray]:
+        """IDF weights, row norms and inverted lists."""
+        if self._arrays is None:
+            with np.load(self.arrays_file) as arrays:
+                self._arrays = {name: arrays[name] for name in arrays.files}
+        return self._arrays
+
+    def _matrix(self) -> np.ndarray:
+        """Memory-mapped raw term-frequency matrix."""
+        return np.memmap(self.vectors_file, dtype=np.float32, mode='r',
+                         shape=(self.meta["rows"], self.meta["dimensions"]))
+
+    def _reset(self) -> None:
+        """Remove every index file."""
+        for index_file in (self.meta_file, self.vectors_file, self.hashes_file, self.arrays_file):
+            if index_file.exists():
+                index_file.unlink()
+        self.meta["rows"] = 0
+        self._arrays = None
+        self._hashes = None
+
+    def _truncate(self, hashes: List[str]) -> None:
+        """Drop rows an interrupted update wrote past the recorded row count."""
+        row_bytes = self.meta["rows"] * self.meta["dimensions"] * 4
+        if self.vectors_file.exists() and self.vectors_file.stat().st_size != row_bytes:
+            with open(self.vectors_file, 'r+b') as f:
+                f.truncate(row_bytes)
+        if self.hashes_file.exists():
+            with open(self.hashes_file, 'w') as f:
+                f.write("".join(f"{chunk_hash}\n" for chunk_hash in hashes))
+
+    def update(self, chunk_db: Path, batch_size: int = 500) -> Dict[str, Any]:
+        """Embed chunks added to a chunk index since the last update.
+
+        Args:
+            chunk_db: SQLite chunk index written by the documentation manager
+            batch_size: Chunks read and vectorized at a time
+
+        Returns:
+            Index statistics for the registry's embeddings map
+        """
+        self.index_path.mkdir(parents=True, exist_ok=True)
+
+        conn = sqlite3.connect(chunk_db)
+        try:
+            live = {row[0] for row in conn.execute("SELECT DISTINCT chunk_hash FROM document_chunks")}
+
+            # Rows of chunks no longer referenced are skipped by search, but
+            # still count towards IDF; rebuild once they make up too much
+            hashes = self._load_hashes()
+            self._truncate(hashes)
+            if hashes and len(live.intersection(hashes)) < self.MIN_LIVE_RATIO * len(hashes):
+                self._reset()
+                hashes = []
+
+            known = set(hashes)
+            new_hashes = sorted(live - known)
+            self._hashes = None
+
+            with open(self.vectors_file, 'ab') as vectors, open(self.hashes_file, 'a') as hash_log:
+                for start in range(0, len(new_hashes), batch_size):
+                    batch = new_hashes[start:start + batch_size]
+                    placeholders = ",".join("?" * len(batch))
+                    texts = dict(conn.execute(
+                        f"SELECT hash, text FROM chunks WHERE hash IN ({placeholders})", batch
+                    ))
+                    batch = [chunk_hash for chunk_hash in batch if chunk_hash in texts]
+                    vectors.write(self.vectorizer.transform([texts[h] for h in batch]).tobytes())
+                    hash_log.write("".join(f"{chunk_hash}\n" for chunk_hash in batch))
+                    self.meta["rows"] += len(batch)
+        finally:
+            conn.close()
+
+        if new_hashes or not self.arrays_file.exists():
+            self._build_arrays()
+
+        self.meta["updated_at"] = datetime.now().isoformat()
+        with open(self.meta_file, 'w') as f:
+            json.dump(self.meta, f, indent=2)
+
+        return {
+            "chunks": self.meta["rows"],
+            "live_chunks": len(live),
+            "new_chunks": len(new_hashes),
+            "dimensions": self.meta["dimensions"],
+            "lists": int(len(self._load_arrays()["centroids"])) if self.meta["rows"] else 0,
+            "updated_at": self.meta["updated_at"]
+        }
+
+    def _blocks(self, matrix: np.ndarray):
+        """Yield (start, rows) blocks of a matrix."""
+        for start in range(0, len(matrix), self.BLOCK_ROWS):
+            yield start, np.asarray(matrix[start:start + self.BLOCK_ROWS])
+
+    def _build_arrays(self) -> None:
+        """Recompute IDF weights, row norms and the inverted file."""
+        self._arrays = None
+        rows = self.meta["rows"]
+        if rows == 0:
+            if self.arrays_file.exists():
+                self.arrays_file.unlink()
+            return
+
+        matrix = self._matrix()
+
+        # Smoothed IDF from the buckets each row uses
+        document_frequency = np.zeros(self.meta["dimensions"], dtype=np.float64)
+        for _, block in self._blocks(matrix):
+            document_frequency += np.count_nonzero(block, axis=0)
+        idf = (np.log((1 + rows) / (1 + document_frequency)) + 1).astype(np.float32)
+
+        norms = np.empty(rows, dtype=np.float32)
+        for start, block in self._blocks(matrix):
+            norms[start:start + len(block)] = np.linalg.norm(block * idf, axis=1)
+        norms[norms == 0] = 1.0
+
+        # Inverted file: about sqrt(rows) clusters trained on a sample
+        n_lists = int(min(1024, max(1, np.sqrt(rows))))
+        rng = np.random.default_rng(0)
+        sample_rows = np.sort(rng.choice(rows, size=min(rows, 64 * n_lists), replace=False))
+        sample = np.asarray(matrix[sample_rows]) * idf / norms[sample_rows, None]
+        centroids = self._train_centroids(sample, n_lists, rng)
+
+        assignments = np.empty(rows, dtype=np.int32)
+        for start, block in self._blocks(matrix):
+            weighted = block * idf / norms[start:start + len(block), None]
+            assignments[start:start + len(block)] = np.argmax(weighted @ centroids.T, axis=1)
+
+        order = np.argsort(assignments, kind='stable').astype(np.int64)
+        offsets = np.zeros(n_lists + 1, dtype=np.int64)
+        np.cumsum(np.bincount(assignments, minlength=n_lists), out=offsets[1:])
+
+        np.savez(self.arrays_file, idf=idf, norms=norms, centroids=centroids,
+                 order=order, offsets=offsets)
+        self._arrays = {"idf": idf, "norms": norms, "centroids": centroids,
+                        "order": order, "offsets": offsets}
+
+    @staticmethod
+    def _train_centroids(sample: np.ndarray, n_lists: int, rng,
+                         iterations: int = 10) -> np.ndarray:
+        """Spherical k-means over unit-length rows."""
+        centroids = sample[rng.choice(len(sample), size=n_lists, replace=False)].copy()
+        for _ in range(iterations):
+            assignments = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignments, sample)
+            lengths = np.linalg.norm(sums, axis=1)
+            filled = lengths > 0
+            centroids[filled] = sums[filled] / lengths[filled, None]
+        return centroids
+
+    def search(self, query: str, chunk_db: Path, k: int = 5,
+               nprobe: int = 8) -> List[Dict[str, Any]]:
+        """Find the chunks most similar to a query.
+
+        Args:
+            query: Query text
+            chunk_db: SQLite chunk index the embeddings were built from
+            k: Number of chunks to return
+            nprobe: Inverted lists searched; more is slower and more exact
+
+        Returns:
+            Chunks by descending similarity, with their text and the
+            documents that contain them
+        """
+        if not self.exists():
+            return []
+
+        arrays = self._load_arrays()
+        idf = arrays["idf"]
+        query_vector = self.vectorizer.transform([query])[0] * idf
+        query_norm = np.linalg.norm(query_vector)
+        if query_norm == 0:
+            return []
+        query_vector = query_vector / query_norm
+
+        matrix = self._matrix()
+        if self.meta["rows"] <= self.EXACT_SEARCH_ROWS:
+            candidates = np.arange(self.meta["rows"])
+        else:
+            offsets = arrays["offsets"]
+            lists = np.argsort(-(arrays["centroids"] @ query_vector))[:nprobe]
+            candidates = np.sort(np.concatenate([
+                arrays["order"][offsets[i]:offsets[i + 1]] for i in lists
+            ]))
+        if len(candidates) == 0:
+            return []
+
+        scores = (np.asarray(matrix[candidates]) @ (query_vector * idf)) / arrays["norms"][candidates]
+
+        # Only chunks with some similarity to the query are results
+        ranking = np.argsort(-scores, kind='stable')
+        ranking = ranking[scores[ranking] > 0]
+
+        # Rows of chunks since dropped from the chunk index are skipped, so
+        # keep describing larger batches until k live chunks are found
+        hashes = self._load_hashes()
+        results: List[Dict[str, Any]] = []
+        start, fetch = 0, 2 * k
+        while start < len(ranking) and len(results) < k:
+            ranked = [(hashes[candidates[i]], float(scores[i]))
+                      for i in ranking[start:start + fetch]]
+            results.extend(self._describe(chunk_db, ranked))
+            start += fetch
+            fetch *= 2
+        return results[:k]
+
+    @staticmethod
+    def _describe(chunk_db: Path, ranked: List[tuple]) -> List[Dict[str, Any]]:
+        """Attach text and document references to ranked chunk hashes."""
+        chunk_hashes = [chunk_hash for chunk_hash, _ in ranked]
+        placeholders = ",".join("?" * len(chunk_hashes))
+
+        conn = sqlite3.connect(chunk_db)
+        try:
+            texts = dict(conn.execute(
+                f"SELECT hash, text FROM chunks WHERE hash IN ({placeholders})", chunk_hashes
+            ))
+            references: Dict[str, List[Dict[str, Any]]] = {}
+            for chunk_hash, doc_path, position, chunk_id in conn.execute(
+                f"SELECT chunk_hash, doc_path, position, chunk_id FROM document_chunks "
+                f"WHERE chunk_hash IN ({placeholders}) ORDER BY doc_path, position",
+                chunk_hashes
+            ):
+                references.setdefault(chunk_hash, []).append({
+                    "path": doc_path,
+                    "position": position,
+                    "chunk_id": chunk_id
+                })
+        finally:
+            conn.close()
+
+        return [
+            {
+                "chunk_hash": chunk_hash,
+                "score": score,
+                "text": texts[chunk_hash],
+                "documents": references[chunk_hash]
+            }
+            for chunk_hash, score in ranked
+            if chunk_hash in texts and chunk_hash in references
+        ]
@@ -0,0 +1,172 @@
+"""Tests for local chunk embeddings and nearest-neighbour search"""
+
+import builtins
+import importlib
+import sys
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from agent_os.commands.create_module_agent import ChunkStore
+from agent_os.integration.context_retrieval import ChunkEmbeddingIndex, HashingVectorizer
+
+TOPICS = ["pump pressure seal", "valve actuator torque", "sensor calibration drift",
+          "controller loop tuning", "manifold flow balance", "gauge dial reading"]
+
+
+class _Stat:
+    st_size = 0
+    st_mtime_ns = 0
+
+
+def _chunk_db(path, documents):
+    """Chunk index with one document per entry of `documents`: path -> list of chunk texts."""
+    store = ChunkStore(path)
+    try:
+        for doc_path, texts in documents.items():
+            chunks = [{"id": f"standard_{i}", "text": text, "size": len(text)}
+                      for i, text in enumerate(texts)]
+            store.replace_document(doc_path, doc_path, _Stat(), "standard", chunks,
+                                   lambda text: str(abs(hash(text))))
+    finally:
+        store.close()
+    return path
+
+
+def _remove(chunk_db, doc_paths):
+    store = ChunkStore(chunk_db)
+    try:
+        for doc_path in doc_paths:
+            store.remove_document(doc_path)
+    finally:
+        store.close()
+
+
+@pytest.fixture
+def corpus_db(tmp_path):
+    documents = {
+        f"{topic.split()[0]}_{i}.md": [f"{topic} note {i} part {j}" for j in range(4)]
+        for topic in TOPICS for i in range(5)
+    }
+    return _chunk_db(tmp_path / "chunk_index.db", documents)
+
+
+class TestHashingVectorizer:
+    def test_features_are_stable_and_signed(self):
+        vectorizer = HashingVectorizer(64)
+        first = vectorizer.transform(["Pump pressure pump"])
+        again = HashingVectorizer(64).transform(["pump PRESSURE pump"])
+        assert first.dtype == np.float32 and first.shape == (1, 64)
+        np.testing.assert_array_equal(first, again)
+
+    def test_empty_text_is_a_zero_row(self):
+        assert not HashingVectorizer(32).transform(["", "!!"]).any()
+
+
+class TestChunkEmbeddingIndex:
+    def test_update_embeds_only_new_chunks(self, tmp_path, corpus_db):
+        index = ChunkEmbeddingIndex(tmp_path / "embeddings")
+        stats = index.update(corpus_db)
+        assert stats["chunks"] == stats["new_chunks"] == stats["live_chunks"] == 120
+
+        _chunk_db(corpus_db, {"extra.md": ["brand new chunk about gaskets"]})
+        stats = ChunkEmbeddingIndex(tmp_path / "embeddings").update(corpus_db)
+        assert stats["new_chunks"] == 1 and stats["chunks"] == 121
+
+    def test_search_ranks_matching_chunks_first(self, tmp_path, corpus_db):
+        index = ChunkEmbeddingIndex(tmp_path / "embeddings")
+        index.update(corpus_db)
+
+        results = index.search("valve actuator torque", corpus_db, k=5)
+        assert len(results) == 5
+        assert all(result["text"].startswith("valve actuator torque") for result in results)
+        assert [r["score"] for r in results] == sorted((r["score"] for r in results), reverse=True)
+        assert results[0]["documents"][0]["path"].startswith("valve_")
+
+    def test_unrelated_chunks_are_not_results(self, tmp_path):
+        chunk_db = _chunk_db(tmp_path / "chunk_index.db", {
+            "a.md": ["impeller blade inspection"],
+            "b.md": [f"filler text number {i}" for i in range(30)],
+        })
+        index = ChunkEmbeddingIndex(tmp_path / "embeddings")
+        index.update(chunk_db)
+
+        results = index.search("impeller", chunk_db, k=5)
+        assert [result["text"] for result in results] == ["impeller blade inspection"]
+        assert index.search("zeppelin", chunk_db, k=5) == []
+        assert all(result["score"] > 0 for result in index.search("text", chunk_db, k=50))
+
+    def test_search_skips_chunks_dropped_since_the_update(self, tmp_path, corpus_db):
+        index = ChunkEmbeddingIndex(tmp_path / "embeddings")
+        index.update(corpus_db)
+
+        ranking = index.search("valve actuator torque", corpus_db, k=120)
+
+        # Drop every document behind the first 2k results; the embeddings keep their rows
+        dropped = {result["documents"][0]["path"] for result in ranking[:8]}
+        _remove(corpus_db, dropped)
+        expected = [result["chunk_hash"] for result in ranking
+                    if result["documents"][0]["path"] not in dropped][:4]
+
+        results = ChunkEmbeddingIndex(tmp_path / "embeddings").search(
+            "valve actuator torque", corpus_db, k=4)
+        assert [result["chunk_hash"] for result in results] == expected
+        assert len(expected) == 4
+
+    def test_mostly_stale_index_is_rebuilt(self, tmp_path, corpus_db):
+        index = ChunkEmbeddingIndex(tmp_path / "embeddings")
+        index.update(corpus_db)
+        _remove(corpus_db, [f"{topic.split()[0]}_{i}.md" for topic in TOPICS[:2] for i in range(5)])
+
+        stats = ChunkEmbeddingIndex(tmp_path / "embeddings").update(corpus_db)
+        assert stats["chunks"] == stats["live_chunks"] == 80
+        assert stats["new_chunks"] == 80
+
+    def test_inverted_file_search_agrees_with_exact_search(self, tmp_path, corpus_db, monkeypatch):
+        exact = ChunkEmbeddingIndex(tmp_path / "embeddings")
+        exact.update(corpus_db)
+        expected = exact.search("sensor calibration", corpus_db, k=6)
+
+        monkeypatch.setattr(ChunkEmbeddingIndex, "EXACT_SEARCH_ROWS", 10)
+        approximate = ChunkEmbeddingIndex(tmp_path / "embeddings")
+        lists = len(approximate._load_arrays()["centroids"])
+        assert lists > 1
+        results = approximate.search("sensor calibration", corpus_db, k=6, nprobe=lists)
+        assert [r["chunk_hash"] for r in results] == [r["chunk_hash"] for r in expected]
+
+    def test_interrupted_update_is_truncated(self, tmp_path, corpus_db):
+        index = ChunkEmbeddingIndex(tmp_path / "embeddings")
+        index.update(corpus_db)
+        with open(index.vectors_file, 'ab') as f:
+            f.write(b"\0" * 100)
+        with open(index.hashes_file, 'a') as f:
+            f.write("deadbeef\n")
+
+        stats = ChunkEmbeddingIndex(tmp_path / "embeddings").update(corpus_db)
+        assert stats["chunks"] == 120 and stats["new_chunks"] == 0
+        assert index.vectors_file.stat().st_size == 120 * 512 * 4
+
+    def test_empty_index(self, tmp_path):
+        chunk_db = _chunk_db(tmp_path / "chunk_index.db", {})
+        index = ChunkEmbeddingIndex(tmp_path / "embeddings")
+        assert index.update(chunk_db)["chunks"] == 0
+        assert index.search("anything", chunk_db) == []
+
+
+def test_package_imports_without_numpy(monkeypatch):
+    real_import = builtins.__import__
+
+    def no_numpy(name, *args, **kwargs):
+        if name == "numpy" or name.startswith("numpy."):
+            raise ImportError("No module named 'numpy'")
+        return real_import(name, *args, **kwargs)
+
+    for name in list(sys.modules):
+        if name.startswith("agent_os.integration"):
+            monkeypatch.delitem(sys.modules, name)
+    monkeypatch.setattr(builtins, "__import__", no_numpy)
+
+    integration = importlib.import_module("agent_os.integration")
+    assert integration.ChunkEmbeddingIndex is None
+    assert integration.HashingVectorizer is None
@@ -0,0 +1,801 @@
+"""Tests for the create-module-agent command's document pipeline"""
+
+import io
+import os
+import random
+import re
+from pathlib import Path
+
+import pytest
+import yaml
+
+from agent_os.commands import create_module_agent as cma
+from agent_os.commands.create_module_agent import ChunkingStrategy
+
+VOCABULARY = ("agent module context phase extraction Synthesis validation "
+              "integration registry chunk document Knowledge graph entity "
+              "relation overlap naïve café ß").split()
+
+
+@pytest.fixture
+def doc_manager(tmp_path):
+    """Documentation manager for a scratch agent directory."""
+    manager = cma.EnhancedDocumentationManager(tmp_path / "agents" / "demo")
+    yield manager
+    manager.doc_registry.close()
+
+
+def _markdown(seed, sections=12):
+    """Markdown with heading levels 1-6, short and oversized sections and odd whitespace."""
+    rng = random.Random(seed)
+    lines = []
+    for section in range(sections):
+        level = rng.choice([1, 2, 2, 3, 4, 6])
+        if rng.random() < 0.1:
+            # Heading whose \s+ runs on through blank lines into the next text line
+            lines.append("#" * level + " ")
+            lines.append("")
+            lines.append(f"Heading text {section}")
+        else:
+            lines.append("#" * level + f" Heading {section}")
+        paragraphs = rng.choice([0, 1, 3, 30, 80])
+        for _ in range(paragraphs):
+            words = [rng.choice(VOCABULARY) for _ in range(rng.randint(1, 25))]
+            separator = rng.choice([" ", "  ", "\t", "  "])
+            lines.append(separator.join(words))
+            if rng.random() < 0.2:
+                lines.append("")
+    return "\n".join(lines) + rng.choice(["", "\n", "\n\n"])
+
+
+def _reference_windows(text, limit):
+    """The original chunker loop: re-join the window after every word."""
+    windows = []
+    current = []
+    for word in text.split():
+        current.append(word)
+        if len(" ".join(current)) >= limit:
+            windows.append(" ".join(current))
+            current = current[-50:]
+    if current:
+        windows.append(" ".join(current))
+    return windows
+
+
+def _reference_chunks(content, strategy):
+    """Chunks as the quadratic chunkers produced them."""
+    chunks = []
+
+    def add(prefix, text, size, phase=None):
+        chunk = {"id": f"{prefix}_{len(chunks)}", "text": text, "strategy": prefix}
+        if phase is not None:
+            chunk["phase"] = phase
+        chunk["size"] = size
+        chunks.append(chunk)
+
+    if strategy == ChunkingStrategy.PHASED:
+        for section in re.split(r'^#{1,2}\s+.*?$', content, flags=re.MULTILINE):
+            if not section.strip():
+                continue
+            if len(section) <= 4000:
+                add("phased", section.strip(), len(section), 1)
+                continue
+            for subsection in re.split(r'^#{3,6}\s+.*?$', section, flags=re.MULTILINE):
+                if not subsection.strip():
+                    continue
+                if len(subsection) > 2000:
+                    for window in _reference_windows(subsection, 1500):
+                        add("phased", window, len(window), 3)
+                else:
+                    add("phased", subsection.strip(), len(subsection), 2)
+    else:
+        for section in re.split(r'^#{1,6}\s+.*?$', content, flags=re.MULTILINE):
+            if not section.strip():
+                continue
+            if len(section) > 2400:
+                for window in _reference_windows(section, 2000):
+                    add("hybrid", window, len(window))
+            else:
+                add("hybrid", section.strip(), len(section))
+    return chunks
+
+
+class TestChunking:
+    @pytest.mark.parametrize("strategy", [ChunkingStrategy.PHASED, ChunkingStrategy.HYBRID])
+    @pytest.mark.parametrize("seed", range(8))
+    def test_matches_original_chunker(self, doc_manager, strategy, seed):
+        content = _markdown(seed)
+        assert doc_manager.chunk_document(content, strategy) == _reference_chunks(content, strategy)
+
+    def test_windows_overlap_by_fifty_words(self):
+        words = [f"w{i:04d}" for i in range(1000)]
+        windows = list(cma.EnhancedDocumentationManager._word_windows(" ".join(words), 1500))
+        texts = [text for text, _, _ in windows]
+        assert texts == _reference_windows(" ".join(words), 1500)
+        for previous, current in zip(texts, texts[1:]):
+            assert previous.split()[-50:] == current.split()[:50]
+        assert all(len(text) >= 1500 for text in texts[:-1])
+
+    def test_window_offsets_slice_the_source(self):
+        text = "  alpha\tbeta \n gamma  " * 200
+        for chunk_text, start, end in cma.EnhancedDocumentationManager._word_windows(text, 300):
+            assert text[start:end].split() == chunk_text.split()
+
+    @pytest.mark.parametrize("content", ["", "   \n\n", "## Only a heading\n", "plain words"])
+    def test_degenerate_documents(self, doc_manager, content):
+        for strategy in (ChunkingStrategy.PHASED, ChunkingStrategy.HYBRID):
+            assert doc_manager.chunk_document(content, strategy) == _reference_chunks(content, strategy)
+
+    def test_benchmark_reports_every_size(self, doc_manager, capsys):
+        rows = doc_manager.benchmark_chunking([1])
+        assert [row["size_mb"] for row in rows] == [1]
+        assert rows[0]["phased"]["chunks"] > 0 and rows[0]["hybrid"]["chunks"] > 0
+        assert "Chunking benchmark" in capsys.readouterr().out
+
+
+def _without_offsets(chunks):
+    return [{key: value for key, value in chunk.items() if not key.startswith("byte_")}
+            for chunk in chunks]
+
+
+class TestChunkStream:
+    @pytest.mark.parametrize("strategy", [ChunkingStrategy.PHASED, ChunkingStrategy.HYBRID])
+    @pytest.mark.parametrize("seed", range(6))
+    def test_stream_matches_chunk_document(self, doc_manager, tmp_path, strategy, seed):
+        content = _markdown(seed)
+        path = tmp_path / "doc.md"
+        path.write_text(content, encoding="utf-8")
+
+        streamed = list(doc_manager.chunk_document_stream(path, strategy))
+        assert _without_offsets(streamed) == doc_manager.chunk_document(content, strategy)
+
+    @pytest.mark.parametrize("seed", range(3))
+    def test_byte_offsets_locate_each_chunk(self, doc_manager, tmp_path, seed):
+        content = _markdown(seed)
+        path = tmp_path / "doc.md"
+        path.write_text(content, encoding="utf-8")
+        data = path.read_bytes()
+
+        for chunk in doc_manager.chunk_document_stream(path):
+            source = data[chunk["byte_start"]:chunk["byte_end"]].decode("utf-8")
+            if chunk["phase"] == 3:
+                assert source.split() == chunk["text"].split()
+            else:
+                assert source == chunk["text"]
+
+    def test_text_and_binary_streams(self, doc_manager, tmp_path):
+        content = _markdown(11)
+        expected = list(doc_manager.chunk_document_stream(io.BytesIO(content.encode("utf-8"))))
+        assert list(doc_manager.chunk_document_stream(io.StringIO(content))) == expected
+        assert _without_offsets(expected) == doc_manager.chunk_document(content)
+
+    def test_lines_longer_than_a_block(self, doc_manager, tmp_path, monkeypatch):
+        content = "# Title\n" + " ".join(VOCABULARY * 400) + "\n## Next\nshort tail\n"
+        path = tmp_path / "long.md"
+        path.write_text(content, encoding="utf-8")
+        pieces = cma.iter_text_pieces
+        monkeypatch.setattr(cma, "iter_text_pieces",
+                            lambda source, encoding, *_: pieces(source, encoding, 64))
+
+        for strategy in (ChunkingStrategy.PHASED, ChunkingStrategy.HYBRID):
+            streamed = list(doc_manager.chunk_document_stream(path, strategy))
+            assert _without_offsets(streamed) == doc_manager.chunk_document(content, strategy)
+
+    def test_pieces_cover_the_source_without_splitting_words(self, tmp_path):
+        content = "short line\n" + "x" * 10 + " word" * 60 + "\n\nnaïve end"
+        path = tmp_path / "doc.txt"
+        path.write_text(content, encoding="utf-8")
+        data = path.read_bytes()
+
+        pieces = list(cma.iter_text_pieces(path, block_size=32))
+        assert "".join(text for text, _, _, _ in pieces) == content
+        offset = 0
+        for text, start, length, _ in pieces:
+            assert start == offset and data[start:start + length].decode("utf-8") == text
+            offset += length
+        words = [word for text, _, _, _ in pieces for word in text.split()]
+        assert words == content.split()
+
+
+@pytest.fixture
+def manuals(tmp_path):
+    """Three documents sharing a boilerplate section."""
+    root = tmp_path / "manuals"
+    root.mkdir()
+    boilerplate = "## Licence\nCopyright notice and warranty disclaimer.\n"
+    paths = []
+    for name in ("pump", "valve", "sensor"):
+        path = root / f"{name}.md"
+        path.write_text(f"# {name.title()}\nThe {name} manual.\n{boilerplate}")
+        paths.append(path)
+    return paths
+
+
+class TestChunkIndex:
+    def test_stored_chunks_match_the_chunker(self, doc_manager, manuals):
+        doc_manager.index_documents(manuals)
+        store = cma.ChunkStore(doc_manager.chunk_index)
+        try:
+            for path in manuals:
+                stored = store.get_chunks(str(path))
+                expected = list(doc_manager.chunk_document_stream(path))
+                assert [{k: v for k, v in chunk.items() if k != "hash"} for chunk in stored] == expected
+                assert [chunk["hash"] for chunk in stored] == [
+                    doc_manager.calculate_hash(chunk["text"]) for chunk in expected]
+        finally:
+            store.close()
+
+    def test_repeated_sections_are_stored_once(self, doc_manager, manuals):
+        stats = doc_manager.index_documents(manuals)
+        assert stats["documents_indexed"] == 3
+        assert stats["chunks"] == 6 and stats["new_chunks"] == 4
+        assert stats["dedup_ratio"] == round(2 / 6, 4)
+        assert stats["store"]["unique_chunks"] == 4
+        assert stats["store"]["chunk_refs"] == 6
+
+    def test_unchanged_documents_are_skipped(self, doc_manager, manuals):
+        doc_manager.index_documents(manuals)
+        stats = doc_manager.index_documents(manuals)
+        assert stats["documents_indexed"] == 0
+        assert stats["documents_unchanged"] == 3
+        assert stats["chunks"] == 0
+
+    def test_touched_documents_are_skipped_by_content_hash(self, doc_manager, manuals, monkeypatch):
+        doc_manager.index_documents(manuals)
+        mtime_ns = manuals[0].stat().st_mtime_ns + 5_000_000_000
+        os.utime(manuals[0], ns=(mtime_ns, mtime_ns))
+
+        chunked = []
+        original = doc_manager.chunk_document_stream
+        monkeypatch.setattr(doc_manager, "chunk_document_stream",
+                            lambda *args: chunked.append(args) or original(*args))
+        stats = doc_manager.index_documents(manuals)
+        assert stats["documents_unchanged"] == 3 and not chunked
+
+        store = cma.ChunkStore(doc_manager.chunk_index)
+        try:
+            assert store.get_document(str(manuals[0]))["mtime_ns"] == mtime_ns
+        finally:
+            store.close()
+
+    def test_changed_and_removed_documents(self, doc_manager, manuals):
+        doc_manager.index_documents(manuals)
+        manuals[0].write_text("# Pump\nRevised pump manual with a new section.\n")
+        manuals[1].unlink()
+
+        stats = doc_manager.index_documents(manuals)
+        assert stats["documents_indexed"] == 1
+        assert stats["documents_removed"] == 1
+        assert stats["documents_unchanged"] == 1
+        assert stats["store"]["documents"] == 2
+        # Only the sensor manual still references the boilerplate; orphans are pruned
+        assert stats["store"]["unique_chunks"] == stats["store"]["chunk_refs"] == 3
+
+    def test_strategy_change_rechunks(self, doc_manager, manuals):
+        doc_manager.index_documents(manuals)
+        stats = doc_manager.index_documents(manuals, ChunkingStrategy.HYBRID)
+        assert stats["documents_indexed"] == 3
+
+
+@pytest.fixture
+def corpus(tmp_path):
+    """Documents across the small and medium size classes with shared entities."""
+    rng = random.Random(7)
+    root = tmp_path / "corpus"
+    root.mkdir()
+    names = ["Pump", "Valve", "Sensor", "Controller", "Manifold", "Gauge"]
+    paths = []
+    for index in range(14):
+        sentences = []
+        for _ in range(rng.choice([5, 40, 900])):
+            source, target = rng.sample(names, 2)
+            verb = rng.choice(["is", "has", "contains", "drives"])
+            sentences.append(f"The {source} {verb} {target.lower()} and {rng.choice(VOCABULARY)}.")
+        path = root / f"doc{index:02d}.md"
+        path.write_text("\n".join(sentences) + "\n")
+        paths.append(path)
+    return paths
+
+
+def _phase3(agent_path, corpus, workers):
+    processor = cma.PhasedDocumentProcessor(agent_path, workers=workers)
+    quality = {"high_priority": [str(p) for p in corpus[::2]],
+               "medium_priority": [str(p) for p in corpus[1::2]]}
+    results = processor.phase3_extraction(quality, None)
+    for mapping in results["source_mapping"].values():
+        mapping.pop("extraction_time")
+    return results, processor
+
+
+class TestParallelExtraction:
+    def test_corpus_spans_size_classes(self, tmp_path, corpus):
+        processor = cma.PhasedDocumentProcessor(tmp_path / "agent")
+        classes = {processor._classify_size(path.stat().st_size) for path in corpus}
+        assert classes == {"small", "medium"}
+
+    def test_pool_matches_serial_extraction(self, tmp_path, corpus):
+        serial, serial_processor = _phase3(tmp_path / "serial", corpus, 1)
+        pooled, pooled_processor = _phase3(tmp_path / "pooled", corpus, 3)
+
+        assert pooled == serial
+        assert list(pooled["source_mapping"]) == list(serial["source_mapping"])
+        assert serial["extraction_metrics"]["total_relationships"] > 0
+        assert ((tmp_path / "serial" / "processing" / "phases" / "knowledge_graph.bin").read_bytes()
+                == (tmp_path / "pooled" / "processing" / "phases" / "knowledge_graph.bin").read_bytes())
+
+    def test_shards_cover_each_document_once(self, tmp_path, corpus):
+        processor = cma.PhasedDocumentProcessor(tmp_path / "agent", workers=2)
+        doc_paths = [str(path) for path in corpus]
+        shards = processor._shard_by_size(doc_paths)
+
+        indexed = sorted(item for shard in shards for item in shard)
+        assert indexed == list(enumerate(doc_paths))
+        for shard in shards:
+            size_classes = {processor._classify_size(os.path.getsize(path)) for _, path in shard}
+            assert len(size_classes) == 1
+            assert len(shard) <= processor.EXTRACTION_SHARD_SIZES[size_classes.pop()]
+
+    def test_cli_rejects_zero_workers(self, monkeypatch, capsys):
+        monkeypatch.setattr("sys.argv", ["create-module-agent", "demo", "--workers", "0"])
+        with pytest.raises(SystemExit):
+            cma.EnhancedArgumentParserV3().parse()
+        assert "--workers must be at least 1" in capsys.readouterr().err
+
+
+def _reference_extraction(content, source):
+    """The original four-pass extraction: one entity regex, one findall per verb."""
+    entities = [{"name": word, "type": "concept", "source": source, "confidence": 0.7}
+                for word in sorted(set(re.findall(r'\b[A-Z][a-z]+\b', content)))]
+    relationships = [
+        {"source": match[0], "target": match[1], "type": "related", "confidence": 0.6}
+        for pattern in (r'(\w+)\s+is\s+(\w+)', r'(\w+)\s+has\s+(\w+)', r'(\w+)\s+contains\s+(\w+)')
+        for match in re.findall(pattern, content, re.IGNORECASE)
+    ]
+    return {"entities": entities, "relationships": relationships}
+
+
+def _prose(seed, sentences=300):
+    rng = random.Random(seed)
+    words = ["Pump", "valve", "IS", "is", "has", "Has", "contains", "this", "analysis",
+             "Sensor", "HTTP", "x_1", "naïve", "Émile", "It's", "is,", "A", "Ab"]
+    separators = [" ", " ", " ", "\n", "  ", "\t", ". "]
+    return "".join(rng.choice(words) + rng.choice(separators) for _ in range(sentences))
+
+
+class TestKnowledgeExtraction:
+    @pytest.mark.parametrize("seed", range(10))
+    def test_single_pass_matches_original_passes(self, tmp_path, seed):
+        content = _prose(seed)
+        path = tmp_path / "doc.txt"
+        path.write_text(content, encoding="utf-8")
+        processor = cma.PhasedDocumentProcessor(tmp_path / "agent")
+        assert processor._extract_knowledge(path) == _reference_extraction(content, str(path))
+
+    @pytest.mark.parametrize("text, expected", [
+        ("Alpha is beta is gamma", [("Alpha", "beta")]),
+        ("Alpha is\n  beta", [("Alpha", "beta")]),
+        ("This island has Ports", [("island", "Ports")]),
+        ("Box contains contains items", [("Box", "contains")]),
+        ("Tank IS full and tank Has lid", [("Tank", "full"), ("tank", "lid")]),
+    ])
+    def test_relationship_edge_cases(self, text, expected):
+        relations = [[] for _ in cma.DEFAULT_EXTRACTION_PATTERNS.relations]
+        cma.DEFAULT_EXTRACTION_PATTERNS.extract(text, {}, relations)
+        assert [pair for matches in relations for pair in matches] == expected
+
+    def test_specialization_selects_its_pattern_set(self, tmp_path):
+        agent_path = tmp_path / "agent"
+        agent_path.mkdir()
+        (agent_path / "agent.yaml").write_text("specialization: domain-expert\n")
+        path = tmp_path / "doc.txt"
+        path.write_text("Gateway uses HTTP2 and the Cache depends on Redis.\n")
+
+        extracted = cma.PhasedDocumentProcessor(agent_path)._extract_knowledge(path)
+        assert {e["name"]: e["type"] for e in extracted["entities"]} == {
+            "Cache": "concept", "Gateway": "concept", "HTTP2": "term", "Redis": "concept"}
+        assert [(r["source"], r["target"], r["type"]) for r in extracted["relationships"]] == [
+            ("Gateway", "HTTP2", "uses"), ("Cache", "Redis", "depends_on")]
+
+    def test_registered_pattern_set_is_used(self, tmp_path, monkeypatch):
+        monkeypatch.setitem(cma.EXTRACTION_PATTERN_SETS, cma.AgentSpecialization.MODULE,
+                            cma.ExtractionPatternSet([("part", r"P\d+")], [("fits", "fits")]))
+        agent_path = tmp_path / "agent"
+        agent_path.mkdir()
+        (agent_path / "agent.yaml").write_text("specialization: module-specific\n")
+        path = tmp_path / "doc.txt"
+        path.write_text("P100 fits P200, Pump is idle\n")
+
+        extracted = cma.PhasedDocumentProcessor(agent_path)._extract_knowledge(path)
+        assert [e["name"] for e in extracted["entities"]] == ["P100", "P200"]
+        assert [(r["source"], r["target"], r["type"]) for r in extracted["relationships"]] == [
+            ("P100", "P200", "fits")]
+
+
+def _entity(name, entity_type="concept", source="a.md", confidence=0.7):
+    return {"name": name, "type": entity_type, "source": source, "confidence": confidence}
+
+
+def _relationship(source, target, relation_type="related", confidence=0.6):
+    return {"source": source, "target": target, "type": relation_type, "confidence": confidence}
+
+
+@pytest.fixture
+def graph():
+    graph = cma.KnowledgeGraph()
+    graph.add_entity(_entity("Pump"))
+    graph.add_entity(_entity("Valve", source="b.md"))
+    graph.add_entity(_entity("pump", "device", "b.md", 0.9))
+    graph.add_entity(_entity("Sensor", "device", "b.md"))
+    graph.add_relationship(_relationship("Pump", "valve"))
+    graph.add_relationship(_relationship("PUMP", "Valve", confidence=0.8))
+    graph.add_relationship(_relationship("pump", "valve", "feeds"))
+    graph.add_relationship(_relationship("Valve", "outlet"))
+    return graph
+
+
+def _graph_state(graph):
+    return {
+        "keys": graph.keys,
+        "first": graph.first,
+        "best": graph.best,
+        "mentions": list(graph.mentions),
+        "type_conflicts": graph.type_conflicts,
+        "edges": sorted(graph.edge_ids.items()),
+        "weights": list(graph.edge_weight),
+        "confidence": list(graph.edge_confidence),
+        "edge_types": graph.edge_type_names,
+        "sources": {name: graph.nodes_from_source(name) for name in graph.source_names},
+        "summary": graph.summary(),
+        "by_type": graph.nodes_by_type(),
+        "neighbors": {key: graph.neighbors(key) for key in graph.keys},
+    }
+
+
+class TestKnowledgeGraph:
+    def test_repeated_edges_gain_weight(self, graph):
+        assert graph.neighbors("PUMP") == [
+            {"target": "valve", "type": "related", "weight": 2, "confidence": 0.8},
+            {"target": "valve", "type": "feeds", "weight": 1, "confidence": 0.6},
+        ]
+        assert graph.summary() == {"nodes": 3, "terms": 1, "edges": 3,
+                                   "relationship_mentions": 4, "sources": 2}
+
+    def test_only_entities_are_edge_sources(self, graph):
+        assert not graph.add_relationship(_relationship("outlet", "Pump"))
+        assert not graph.add_relationship(_relationship("Unknown", "Pump"))
+        assert graph.neighbors("outlet") == []
+        assert len(graph.edge_src) == 3
+
+    def test_mentions_keep_first_and_best_records(self, graph):
+        pump = graph.node_ids["pump"]
+        assert graph.mentions[pump] == 2
+        assert graph.first[pump]["type"] == "concept"
+        assert graph.best[pump]["confidence"] == 0.9
+        assert graph.type_conflicts == {pump: ["concept", "device"]}
+
+    def test_type_and_source_indexes(self, graph):
+        keys = lambda nodes: sorted(graph.keys[node] for node in nodes)
+        by_type = graph.nodes_by_type()
+        assert keys(by_type["device"]) == ["pump", "sensor"]
+        assert keys(by_type["concept"]) == ["valve"]
+        assert keys(graph.nodes_from_source("b.md")) == ["pump", "sensor", "valve"]
+        assert graph.nodes_from_source("missing.md") == []
+
+        graph.add_entity(_entity("Gauge", "meter", "c.md"))
+        assert keys(graph.nodes_by_type()["meter"]) == ["gauge"]
+
+    def test_adjacency_follows_new_edges(self, graph):
+        graph.neighbors("pump")
+        graph.add_relationship(_relationship("Sensor", "Pump", "monitors"))
+        assert [edge["target"] for edge in graph.neighbors("sensor")] == ["pump"]
+
+    def test_binary_round_trip(self, graph, tmp_path):
+        path = tmp_path / "knowledge_graph.bin"
+        graph.save(path)
+        loaded = cma.KnowledgeGraph.load(path)
+        assert _graph_state(loaded) == _graph_state(graph)
+
+        # A loaded graph keeps deduplicating edges
+        assert loaded.add_relationship(_relationship("Pump", "Valve"))
+        assert loaded.neighbors("pump")[0]["weight"] == 3
+        assert len(loaded.edge_src) == 3
+
+    def test_empty_graph_round_trip(self, tmp_path):
+        path = tmp_path / "empty.bin"
+        cma.KnowledgeGraph().save(path)
+        assert _graph_state(cma.KnowledgeGraph.load(path)) == _graph_state(cma.KnowledgeGraph())
+
+    def test_load_rejects_other_files(self, tmp_path):
+        path = tmp_path / "other.bin"
+        path.write_bytes(b"NOTAGRPH" + bytes(16))
+        with pytest.raises(ValueError):
+            cma.KnowledgeGraph.load(path)
+
+    def test_synthesis_and_consistency_use_the_graph(self, tmp_path, graph):
+        processor = cma.PhasedDocumentProcessor(tmp_path / "agent")
+        hierarchy = processor._build_hierarchy(graph)
+        assert sorted(hierarchy["root"]["children"]) == ["concept", "device"]
+        assert processor._calculate_hierarchy_depth(hierarchy) == 2
+
+        consistency = processor._check_consistency(graph)
+        assert consistency["inconsistencies"] == [
+            {"issue": "type_mismatch", "entity": "pump", "types": ["concept", "device"]}]
+        assert consistency["score"] == pytest.approx(1 - 1 / 3)
+
+
+SAMPLE_RESULTS = {
+    "extracted_entities": [_entity("Pump"), _entity("Valve", source="b.md")],
+    "extracted_relationships": [],
+    "source_mapping": {"a.md": {"entities": 1, "relationships": 0}},
+    "knowledge_graph": {"nodes": 2, "edges": 0},
+    "label": "extraction",
+    "scores": [0.5, 1.0],
+}
+
+
+class TestPhaseResultPersistence:
+    def test_serializer_base_is_abstract(self):
+        with pytest.raises(TypeError):
+            cma.PhaseResultSerializer()
+
+        class Partial(cma.PhaseResultSerializer):
+            def dump(self, results, f):
+                pass
+
+        with pytest.raises(TypeError):
+            Partial()
+
+    @pytest.mark.parametrize("result_format", sorted(cma.PHASE_RESULT_SERIALIZERS))
+    @pytest.mark.parametrize("compression", sorted(cma.PHASE_RESULT_COMPRESSION))
+    def test_round_trip(self, tmp_path, result_format, compression):
+        processor = cma.PhasedDocumentProcessor(tmp_path / "agent", result_format=result_format,
+                                                compression=compression)
+        processor._save_phase_results(cma.ProcessingPhase.EXTRACTION, SAMPLE_RESULTS)
+        assert processor._load_phase_results(cma.ProcessingPhase.EXTRACTION) == SAMPLE_RESULTS
+
+        metrics = processor.phase_status["phase_metrics"]["extraction"]
+        result_file = processor.phases_path / metrics["result_file"]
+        assert metrics["result_size"] == result_file.stat().st_size
+
+    def test_jsonl_writes_list_items_one_per_line(self, tmp_path):
+        buffer = io.BytesIO()
+        cma.JsonLinesSerializer().dump(SAMPLE_RESULTS, buffer)
+        lines = buffer.getvalue().decode().splitlines()
+        assert len(lines) == 2 + 1 + 1 + 1 + 1 + 2
+        buffer.seek(0)
+        assert cma.JsonLinesSerializer().load(buffer) == SAMPLE_RESULTS
+
+    def test_saving_in_another_format_drops_stale_results(self, tmp_path):
+        agent_path = tmp_path / "agent"
+        cma.PhasedDocumentProcessor(agent_path, result_format="jsonl", compression="gzip") \
+            ._save_phase_results(cma.ProcessingPhase.SYNTHESIS, {"label": "old"})
+        processor = cma.PhasedDocumentProcessor(agent_path, result_format="jsonl")
+        processor._save_phase_results(cma.ProcessingPhase.SYNTHESIS, {"label": "new"})
+
+        assert [p.name for p in processor.phases_path.glob("synthesis_results.*")] == [
+            "synthesis_results.jsonl"]
+        assert processor._load_phase_results(cma.ProcessingPhase.SYNTHESIS) == {"label": "new"}
+
+    def test_legacy_yaml_results_still_load(self, tmp_path):
+        processor = cma.PhasedDocumentProcessor(tmp_path / "agent")
+        (processor.phases_path / "discovery_results.yaml").write_text("total_documents: 3\n")
+        assert processor._load_phase_results(cma.ProcessingPhase.DISCOVERY) == {"total_documents": 3}
+
+    def test_yaml_export(self, tmp_path):
+        processor = cma.PhasedDocumentProcessor(tmp_path / "agent", result_format="jsonl")
+        processor._save_phase_results(cma.ProcessingPhase.EXTRACTION, SAMPLE_RESULTS)
+
+        exported = processor.export_phase_results(tmp_path / "export")
+        assert [path.name for path in exported] == ["extraction_results.yaml"]
+        assert yaml.safe_load(exported[0].read_text()) == SAMPLE_RESULTS
+
+    @pytest.mark.parametrize("settings", [{"result_format": "xml"}, {"compression": "lz4"}])
+    def test_unsupported_settings(self, tmp_path, settings):
+        with pytest.raises(ValueError):
+            cma.PhasedDocumentProcessor(tmp_path / "agent", **settings)
+
+
+@pytest.fixture
+def domain_docs(tmp_path):
+    """Documents whose entities conflict in type: HTTP is a term, Http a concept."""
+    root = tmp_path / "docs"
+    root.mkdir()
+    texts = {
+        "gateway.md": "The Gateway uses HTTP and the Gateway has Retries.\nCache depends on Redis.\n",
+        "client.md": "Http is stateless. The Client requires TLS and Client contains Pool.\n",
+        "ops.md": "Redis is fast. Pool has Workers. Workers uses HTTP.\n",
+    }
+    paths = []
+    for name, text in texts.items():
+        (root / name).write_text(text)
+        paths.append(root / name)
+    return paths
+
+
+def _domain_manager(agent_path):
+    agent_path.mkdir(parents=True, exist_ok=True)
+    (agent_path / "agent.yaml").write_text("specialization: domain-expert\n")
+    return cma.EnhancedDocumentationManager(agent_path, result_format="jsonl")
+
+
+def _comparable_run(results):
+    integration = results["integration"]
+    return {
+        "synthesis": results["synthesis"],
+        "validation": results["validation"],
+        "integrated": integration["integrated_knowledge"],
+        "version": integration["refresh_config"]["knowledge_version"],
+    }
+
+
+class TestResumableRun:
+    def _uninterrupted(self, tmp_path, docs):
+        manager = _domain_manager(tmp_path / "agents" / "uninterrupted")
+        try:
+            return _comparable_run(manager.process_documents_phased(docs, "gateway"))
+        finally:
+            manager.doc_registry.close()
+
+    def _interrupted(self, tmp_path, docs, monkeypatch, crash_in):
+        def crash(*args, **kwargs):
+            raise RuntimeError("interrupted")
+
+        agent_path = tmp_path / "agents" / "resumed"
+        with monkeypatch.context() as patch:
+            patch.setattr(cma.PhasedDocumentProcessor, crash_in, crash)
+            manager = _domain_manager(agent_path)
+            with pytest.raises(RuntimeError):
+                manager.process_documents_phased(docs, "gateway")
+            manager.doc_registry.close()
+        return agent_path
+
+    @pytest.mark.parametrize("crash_in", ["phase4_synthesis", "phase5_validation"])
+    def test_resumed_run_matches_uninterrupted_run(self, tmp_path, domain_docs, monkeypatch, crash_in):
+        expected = self._uninterrupted(tmp_path, domain_docs)
+        assert expected["validation"]["consistency_checks"]["inconsistencies"]
+
+        agent_path = self._interrupted(tmp_path, domain_docs, monkeypatch, crash_in)
+        loaded = []
+        original_load = cma.KnowledgeGraph.load.__func__
+        monkeypatch.setattr(cma.KnowledgeGraph, "load", classmethod(
+            lambda cls, path: loaded.append(path) or original_load(cls, path)))
+        extracted = []
+        monkeypatch.setattr(cma.PhasedDocumentProcessor, "_extract_knowledge",
+                            lambda self, path: extracted.append(path))
+
+        manager = _domain_manager(agent_path)
+        try:
+            resumed = manager.process_documents_phased(domain_docs, "gateway")
+        finally:
+            manager.doc_registry.close()
+
+        assert _comparable_run(resumed) == expected
+        assert loaded == [agent_path / "processing" / "phases" / "knowledge_graph.bin"]
+        assert extracted == []
+
+    def test_missing_graph_file_is_rebuilt_from_phase3_results(self, tmp_path, domain_docs, monkeypatch):
+        expected = self._uninterrupted(tmp_path, domain_docs)
+        agent_path = self._interrupted(tmp_path, domain_docs, monkeypatch, "phase5_validation")
+        (agent_path / "processing" / "phases" / "knowledge_graph.bin").unlink()
+
+        manager = _domain_manager(agent_path)
+        try:
+            resumed = manager.process_documents_phased(domain_docs, "gateway")
+        finally:
+            manager.doc_registry.close()
+        assert _comparable_run(resumed) == expected
+
+    def test_new_run_discards_checkpoints(self, tmp_path, domain_docs, monkeypatch):
+        agent_path = self._interrupted(tmp_path, domain_docs, monkeypatch, "phase5_validation")
+        phases_path = agent_path / "processing" / "phases"
+        assert (phases_path / "extraction_checkpoint.jsonl").exists()
+
+        processor = cma.PhasedDocumentProcessor(agent_path)
+        assert processor.begin_run(domain_docs, "gateway") == [
+            "discovery", "quality", "extraction", "synthesis"]
+        assert processor.begin_run(domain_docs[:2], "gateway") == []
+        assert not (phases_path / "extraction_checkpoint.jsonl").exists()
+        assert not (phases_path / "knowledge_graph.bin").exists()
+
+
+def _doc_info(path, **overrides):
+    info = {"path": path, "category": "internal", "hash": "abc", "title": Path(path).stem,
+            "added_date": "2025-01-01"}
+    info.update(overrides)
+    return info
+
+
+@pytest.fixture
+def registry(tmp_path):
+    registry = cma.DocumentRegistry(tmp_path / "docs_registry.db", tmp_path / "validation_log.yaml")
+    yield registry
+    registry.close()
+
+
+class TestDocumentRegistry:
+    def test_upsert_replaces_one_document(self, registry):
+        registry.upsert_document("a", _doc_info("a.md"))
+        registry.upsert_document("b", _doc_info("b.md"))
+        registry.upsert_document("a", _doc_info("a.md", hash="def"))
+        registry.commit()
+
+        assert registry.document_count() == 2
+        assert registry.get_document("a")["hash"] == "def"
+        registry.remove_document("b")
+        assert dict(registry.iter_documents()) == {"a": _doc_info("a.md", hash="def")}
+        assert registry.get_document("b") is None
+
+    def test_module_membership_is_a_set(self, registry):
+        assert registry.add_module_documents("pumps", ["b.md", "a.md", "a.md"]) == 2
+        assert registry.add_module_documents("pumps", ["a.md", "c.md"]) == 1
+        assert registry.add_module_documents("valves", ["a.md"]) == 1
+        assert registry.module_documents("pumps") == ["a.md", "b.md", "c.md"]
+        assert registry.module_documents("valves") == ["a.md"]
+
+    def test_validation_log_is_appended(self, registry, tmp_path):
+        registry.upsert_document("bad", {"path": "bad.md"})
+        registry.commit()
+        registry.upsert_document("good", _doc_info("good.md"))
+        registry.upsert_document("worse", {})
+        registry.commit()
+        registry.commit()
+
+        log = yaml.safe_load((tmp_path / "validation_log.yaml").read_text())
+        assert [entry["doc_id"] for entry in log["validations"]] == ["bad", "worse"]
+        assert log["validations"][0]["fields"] == ["category", "hash", "title", "added_date"]
+
+    def test_validate_all_checks_stored_documents(self, registry):
+        registry.upsert_document("good", _doc_info("good.md"))
+        registry.upsert_document("bad", {"path": "bad.md"})
+        registry.commit()
+        assert registry.validate_all() == 1
+
+    def test_sections_round_trip(self, tmp_path):
+        registry = cma.DocumentRegistry(tmp_path / "docs_registry.db", tmp_path / "validation_log.yaml")
+        assert registry.is_empty()
+        sections = registry.load_sections()
+        assert sections == {name: {} for name in cma.DocumentRegistry.SECTIONS}
+        sections["chunks"] = {"documents": 3}
+        registry.save_sections(sections)
+        registry.close()
+
+        reopened = cma.DocumentRegistry(tmp_path / "docs_registry.db", tmp_path / "validation_log.yaml")
+        try:
+            assert reopened.load_sections()["chunks"] == {"documents": 3}
+            assert not reopened.is_empty()
+        finally:
+            reopened.close()
+
+    def test_yaml_registry_is_imported_once(self, tmp_path):
+        agent_path = tmp_path / "agents" / "demo"
+        (agent_path / "context").mkdir(parents=True)
+        (agent_path / "context" / "docs_registry.yaml").write_text(yaml.safe_dump({
+            "documents": {"a": _doc_info("a.md")},
+            "modules": {"pumps": {"documents": ["a.md", "a.md", "b.md"], "knowledge_count": 4}},
+            "phases": {"2025-01-01T00:00:00": {"module": "pumps"}},
+        }))
+
+        manager = cma.EnhancedDocumentationManager(agent_path)
+        try:
+            assert manager.doc_registry.get_document("a") == _doc_info("a.md")
+            assert manager.doc_registry.module_documents("pumps") == ["a.md", "b.md"]
+            assert manager.registry["modules"] == {"pumps": {"knowledge_count": 4}}
+            assert list(manager.registry["phases"]) == ["2025-01-01T00:00:00"]
+        finally:
+            manager.doc_registry.close()
+
+    def test_reprocessing_does_not_repeat_module_documents(self, tmp_path, domain_docs):
+        manager = _domain_manager(tmp_path / "agents" / "demo")
+        try:
+            manager.process_documents_phased(domain_docs, "gateway", resume=False)
+            manager.process_documents_phased(domain_docs, "gateway", resume=False)
+            assert manager.doc_registry.module_documents("gateway") == sorted(map(str, domain_docs))
+        finally:
+            manager.doc_registry.close()
+
+    def test_save_registry_does_not_revalidate_documents(self, doc_manager, monkeypatch):
+        doc_manager.register_document("a", _doc_info("a.md"))
+        monkeypatch.setattr(doc_manager.doc_registry, "validate_all",
+                            lambda: pytest.fail("save_registry revalidated every document"))
+        doc_manager.save_registry()
+        assert doc_manager.doc_registry.get_document("a") == _doc_info("a.md")
@@ -0,0 +1,913 @@
+"""Tests for the engineering data context command
+
+The command lives in .agent-os/commands as a standalone script, so it is
+loaded from its file path rather than imported as a package.
+"""
+
+import csv
+import hashlib
+import importlib.util
+import io
+import json
+import os
+import random
+import sqlite3
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+import yaml
+
+ROOT_DIR = Path(__file__).parent.parent
+MODULE_PATH = ROOT_DIR / ".agent-os" / "commands" / "engineering_data_context.py"
+
+
+def _load_command():
+    spec = importlib.util.spec_from_file_location("engineering_data_context", MODULE_PATH)
+    module = importlib.util.module_from_spec(spec)
+    # Registered so process pool workers can unpickle the generator
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+edc = _load_command()
+
+
+@pytest.fixture
+def generator(tmp_path):
+    """Generator writing its context store under a scratch base path."""
+    gen = edc.EngineeringDataContextGenerator(base_path=tmp_path / "base")
+    yield gen
+    gen.close()
+
+
+@pytest.fixture
+def data_tree(tmp_path):
+    """Small nested data folder with tabular, structured and ignored files."""
+    root = tmp_path / "data"
+    (root / "sensors" / "raw").mkdir(parents=True)
+    (root / "config").mkdir()
+    (root / "sensors" / "a.csv").write_text("time,value\n1,2.5\n2,3.5\n")
+    (root / "sensors" / "raw" / "b.csv").write_text("time,value\n1,1\n")
+    (root / "config" / "settings.yaml").write_text("rate: 5\nname: rig\n")
+    (root / "notes.txt").write_text("not a data file")
+    (root / "export.json").write_text('{"items": [{"id": 1}, {"id": 2}]}')
+    return root
+
+
+def _by_path(contexts):
+    return {Path(context.path): context for context in contexts}
+
+
+class TestFolderAggregation:
+    """Single post-order pass rolling statistics up into folders."""
+
+    def test_folder_sizes_roll_up_from_every_file_in_subtree(self, generator, data_tree):
+        contexts = _by_path(generator._collect_contexts(data_tree))
+
+        expected = sum(p.stat().st_size for p in data_tree.rglob("*") if p.is_file())
+        assert contexts[data_tree].metadata["total_size_bytes"] == expected
+        sensors = sum(p.stat().st_size for p in (data_tree / "sensors").rglob("*") if p.is_file())
+        assert contexts[data_tree / "sensors"].metadata["total_size_bytes"] == sensors
+
+    def test_subtree_data_types_include_nested_folders(self, generator, data_tree):
+        contexts = _by_path(generator._collect_contexts(data_tree))
+
+        root = contexts[data_tree].metadata
+        assert root["data_types"] == ["structured_data"]
+        assert root["subtree_data_types"] == ["configuration", "structured_data", "tabular_data"]
+
+    def test_folders_precede_their_contents(self, generator, data_tree):
+        paths = [Path(c.path) for c in generator._collect_contexts(data_tree)]
+
+        assert paths[0] == data_tree
+        assert paths.index(data_tree / "sensors") < paths.index(data_tree / "sensors" / "a.csv")
+        assert data_tree / "notes.txt" not in paths
+
+    def test_nested_change_propagates_to_every_ancestor_hash(self, generator, data_tree):
+        before = _by_path(generator._collect_contexts(data_tree))
+        (data_tree / "sensors" / "raw" / "b.csv").write_text("time,value\n1,1\n2,2\n")
+        after = _by_path(generator._collect_contexts(data_tree))
+
+        for folder in (data_tree, data_tree / "sensors", data_tree / "sensors" / "raw"):
+            assert before[folder].content_hash != after[folder].content_hash
+        assert before[data_tree / "config"].content_hash == after[data_tree / "config"].content_hash
+
+    def test_each_file_is_stated_once(self, generator, data_tree, monkeypatch):
+        calls = []
+        real_scandir = os.scandir
+
+        class CountingEntry:
+            def __init__(self, entry):
+                self._entry = entry
+
+            def __getattr__(self, name):
+                return getattr(self._entry, name)
+
+            def stat(self, *args, **kwargs):
+                calls.append(self._entry.path)
+                return self._entry.stat(*args, **kwargs)
+
+        class CountingScandir:
+            def __init__(self, path):
+                self._it = real_scandir(path)
+
+            def __enter__(self):
+                return (CountingEntry(entry) for entry in self._it)
+
+            def __exit__(self, *exc):
+                self._it.close()
+
+        monkeypatch.setattr(edc.os, "scandir", CountingScandir)
+        generator._collect_contexts(data_tree)
+
+        files = [str(p) for p in data_tree.rglob("*") if p.is_file()]
+        assert sorted(calls) == sorted(files)
+
+
+class TestIncrementalMode:
+    """Incremental generate_context touching only changed paths."""
+
+    def test_unchanged_tree_rebuilds_nothing(self, generator, data_tree):
+        generator.generate_context(data_tree)
+        result = generator.generate_context(data_tree, incremental=True)
+
+        assert result["contexts_updated"] == 0
+        assert result["contexts_removed"] == 0
+        assert result["contexts_created"] == 8
+
+    def test_changed_file_dirties_only_its_ancestors(self, generator, data_tree, monkeypatch):
+        generator.generate_context(data_tree)
+        changed = data_tree / "sensors" / "raw" / "b.csv"
+        changed.write_text("time,value\n1,1\n2,2\n3,3\n")
+        rebuilt = []
+        original = generator._create_file_context
+        monkeypatch.setattr(generator, "_create_file_context",
+                            lambda path, stat=None: rebuilt.append(path) or original(path, stat))
+
+        result = generator.generate_context(data_tree, incremental=True)
+
+        assert rebuilt == [changed]
+        # The file plus raw/, sensors/ and the root folder
+        assert result["contexts_updated"] == 4
+
+    def test_vanished_paths_are_deleted_from_store(self, generator, data_tree):
+        generator.generate_context(data_tree)
+        (data_tree / "config" / "settings.yaml").unlink()
+        (data_tree / "config").rmdir()
+
+        result = generator.generate_context(data_tree, incremental=True)
+        generator.store.commit()
+
+        assert result["contexts_removed"] == 2
+        stored = {c.path for c in generator.store.load(str(data_tree))}
+        assert str(data_tree / "config") not in stored
+        assert str(data_tree / "sensors" / "a.csv") in stored
+
+
+def _comparable(contexts):
+    """Context fields that do not depend on when they were built."""
+    return [(c.path, c.type, c.content_hash, c.data_schema, c.description, sorted(c.tags),
+             {k: v for k, v in c.metadata.items() if k != "modified"})
+            for c in contexts]
+
+
+class TestFileContextPool:
+    """Parse/hash work in a bounded process pool."""
+
+    def test_pool_builds_the_same_contexts_as_serial_walk(self, generator, data_tree):
+        serial = generator._collect_contexts(data_tree)
+        with edc.FileContextPool(generator, workers=2) as pool:
+            parallel = generator._collect_contexts(data_tree, edc.ContextWalk(pool=pool))
+
+        assert _comparable(parallel) == _comparable(serial)
+
+    def test_pending_files_never_exceed_max_pending(self, generator, data_tree):
+        for index in range(12):
+            (data_tree / f"extra_{index}.csv").write_text("a,b\n1,2\n")
+        in_flight = []
+        with edc.FileContextPool(generator, workers=2, max_pending=3) as pool:
+            submit = pool.submit
+
+            def tracking_submit(*args):
+                submit(*args)
+                in_flight.append(len(pool._pending))
+
+            pool.submit = tracking_submit
+            contexts = generator._collect_contexts(data_tree, edc.ContextWalk(pool=pool))
+
+        assert max(in_flight) <= 3
+        assert all(context is not None for context in contexts)
+
+    def test_generate_context_with_workers_streams_files_to_store(self, generator, data_tree):
+        result = generator.generate_context(data_tree, workers=2, max_pending=2)
+        generator.store.commit()
+
+        assert result["contexts_created"] == 8
+        assert len(generator.store.load(str(data_tree))) == 8
+
+
+def _make_context(path, name=None, description="", tags=None, context_type="file", module=None):
+    return edc.DataContext(
+        path=path, type=context_type, name=name or Path(path).name, description=description,
+        metadata={}, content_hash="0", data_schema=None, related_docs=[], web_research=None,
+        last_updated="2024-01-01T00:00:00", tags=tags or [], module_assignment=module,
+    )
+
+
+class TestContextStore:
+    """Single-connection WAL store with batched writes."""
+
+    def test_connection_uses_wal_journal(self, tmp_path):
+        store = edc.ContextStore(tmp_path / "context.db")
+        try:
+            assert store.conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        finally:
+            store.close()
+
+    def test_rows_are_buffered_until_batch_size(self, tmp_path):
+        store = edc.ContextStore(tmp_path / "context.db", batch_size=3, commit_interval=100)
+        try:
+            store.put_many([_make_context(f"/d/{i}.csv") for i in range(2)])
+            assert store.conn.execute("SELECT COUNT(*) FROM data_context").fetchone()[0] == 0
+
+            store.put(_make_context("/d/2.csv"))
+            assert store.conn.execute("SELECT COUNT(*) FROM data_context").fetchone()[0] == 3
+        finally:
+            store.close()
+
+    def test_commits_only_every_commit_interval(self, tmp_path):
+        db_path = tmp_path / "context.db"
+        store = edc.ContextStore(db_path, batch_size=2, commit_interval=4)
+        reader = sqlite3.connect(db_path)
+        try:
+            def committed():
+                return reader.execute("SELECT COUNT(*) FROM data_context").fetchone()[0]
+
+            store.put_many([_make_context(f"/d/{i}.csv") for i in range(2)])
+            assert committed() == 0
+            store.put_many([_make_context(f"/d/{i}.csv") for i in range(2, 4)])
+            assert committed() == 4
+        finally:
+            reader.close()
+            store.close()
+
+    def test_round_trip_preserves_context(self, tmp_path):
+        store = edc.ContextStore(tmp_path / "context.db")
+        context = _make_context("/d/a.csv", description="Flow data", tags=["flow", "csv"])
+        context.metadata = {"size_bytes": 12}
+        context.data_schema = {"columns": ["a"]}
+        try:
+            store.put(context)
+            assert store.load("/d/") == [context]
+        finally:
+            store.close()
+
+    @pytest.mark.parametrize("argv", [
+        ["generate", "--folder", "{data}"],
+        ["generate"],  # exits with an error before doing any work
+        ["query", "--context", "sensor"],
+    ])
+    def test_cli_closes_generator_on_every_exit_path(self, tmp_path, data_tree, monkeypatch, argv):
+        closed = []
+        original_close = edc.EngineeringDataContextGenerator.close
+        monkeypatch.setattr(edc.EngineeringDataContextGenerator, "close",
+                            lambda gen: closed.append(gen) or original_close(gen))
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.setattr(sys, "argv", ["engineering-data-context",
+                                          *(arg.format(data=data_tree) for arg in argv)])
+
+        try:
+            edc.main()
+        except SystemExit:
+            pass
+
+        assert len(closed) == 1
+
+
+@pytest.fixture
+def search_store(tmp_path):
+    """Context store holding a few searchable contexts."""
+    store = edc.ContextStore(tmp_path / "context.db")
+    store.put_many([
+        _make_context("/d/pressure_log.csv", description="Sensor readings",
+                      tags=["sensor", "tabular_data"], module="rig"),
+        _make_context("/d/notes.csv", description="Pressure notes from the pressure test",
+                      tags=["tabular_data"]),
+        _make_context("/d/temperature.json", description="Thermal sensor export",
+                      tags=["sensor", "structured_data"], module="thermal"),
+        _make_context("/d/sensors", description="Folder containing 3 items",
+                      tags=["tabular_data"], context_type="folder"),
+    ])
+    yield store
+    store.close()
+
+
+def _paths(rows):
+    return [row[0] for row in rows]
+
+
+def _fts5_available():
+    conn = sqlite3.connect(":memory:")
+    try:
+        conn.execute("CREATE VIRTUAL TABLE probe USING fts5(text)")
+        return True
+    except sqlite3.OperationalError:
+        return False
+    finally:
+        conn.close()
+
+
+@pytest.mark.skipif(not _fts5_available(), reason="SQLite built without FTS5")
+class TestContextSearch:
+    """FTS5-backed search with BM25 ranking, filters and pagination."""
+
+    def test_name_matches_rank_above_description_matches(self, search_store):
+        rows = search_store.search("pressure")
+
+        assert _paths(rows) == ["/d/pressure_log.csv", "/d/notes.csv"]
+        assert rows[0][5] < rows[1][5]  # bm25 scores are lower for better matches
+
+    def test_words_match_as_prefixes(self, search_store):
+        assert _paths(search_store.search("therm")) == ["/d/temperature.json"]
+        assert set(_paths(search_store.search("sens"))) == {
+            "/d/pressure_log.csv", "/d/temperature.json", "/d/sensors"}
+
+    def test_type_module_and_tag_filters(self, search_store):
+        assert _paths(search_store.search("sens", context_type="folder")) == ["/d/sensors"]
+        assert _paths(search_store.search("sensor", module="thermal")) == ["/d/temperature.json"]
+        assert set(_paths(search_store.search("sens", tags=["sensor"]))) == {
+            "/d/pressure_log.csv", "/d/temperature.json"}
+
+    def test_pagination_walks_ranked_results(self, search_store):
+        everything = _paths(search_store.search("sens"))
+        pages = _paths(search_store.search("sens", limit=2)) + \
+            _paths(search_store.search("sens", limit=2, offset=2))
+
+        assert pages == everything
+
+    def test_index_follows_updates_and_deletes(self, search_store):
+        search_store.put(_make_context("/d/notes.csv", description="Calibration notes"))
+        search_store.delete(["/d/pressure_log.csv"])
+
+        assert search_store.search("pressure") == []
+        assert _paths(search_store.search("calibration")) == ["/d/notes.csv"]
+
+    def test_fts_syntax_in_queries_is_treated_as_text(self, search_store):
+        # Operators become ordinary words that must all match
+        assert search_store.search('pressure" OR name:*') == []
+        assert _paths(search_store.search('"pressure":*')) == ["/d/pressure_log.csv", "/d/notes.csv"]
+
+    def test_query_context_returns_ranked_dicts(self, generator, data_tree):
+        generator.generate_context(data_tree)
+
+        result = generator.query_context("settings")
+
+        assert result["count"] == 1
+        assert result["results"][0]["path"] == str(data_tree / "config" / "settings.yaml")
+
+
+def test_search_falls_back_to_substring_scan_without_fts(search_store):
+    search_store.fts_enabled = False
+
+    assert set(_paths(search_store.search("ressure"))) == {"/d/pressure_log.csv", "/d/notes.csv"}
+    assert _paths(search_store.search("sensor", tags=["structured_data"])) == ["/d/temperature.json"]
+
+
+def _csv_records(path):
+    """Data records of a CSV file as parsed by the csv module."""
+    with open(path, newline="") as f:
+        return list(csv.reader(f))[1:]
+
+
+def _parsed_sample(sample):
+    return [next(csv.reader(io.StringIO(record.decode()))) for record in sample]
+
+
+@pytest.fixture
+def quoted_csv(tmp_path):
+    """CSV whose fields hold quoted newlines, escaped quotes and commas."""
+    path = tmp_path / "log.csv"
+    rows = [["id", "note", "value"]]
+    for index in range(40):
+        note = f'line one\nline "two"\n{index}' if index % 3 == 0 else f"plain, {index}"
+        rows.append([str(index), note, f"{index * 1.5}"])
+    with open(path, "w", newline="") as f:
+        csv.writer(f, lineterminator="\n").writerows(rows)
+    return path
+
+
+class TestCsvScan:
+    """Binary CSV record counting with a record-level reservoir sample."""
+
+    def test_quoted_newlines_are_one_record(self, generator, tmp_path):
+        path = tmp_path / "two.csv"
+        path.write_text('a,b\n1,"first\nsecond"\n2,x\n')
+
+        schema = generator._extract_tabular_schema(path)
+
+        assert schema["row_count"] == 2
+        assert schema["sampled_rows"] == 2
+        assert schema["row_count_exact"] is True
+
+    @pytest.mark.parametrize("block_size", [5, 17, 64, 4 * 1024 * 1024])
+    def test_sample_holds_whole_records_across_block_boundaries(self, generator, quoted_csv,
+                                                                 block_size, monkeypatch):
+        monkeypatch.setattr(generator, "CSV_BLOCK_SIZE", block_size)
+
+        scan = generator._scan_csv(quoted_csv)
+
+        assert scan["row_count"] == 40
+        assert _parsed_sample(scan["sample"]) == _csv_records(quoted_csv)
+
+    @pytest.mark.parametrize("block_size", [11, 4 * 1024 * 1024])
+    def test_reservoir_draws_records_from_the_whole_file(self, generator, quoted_csv,
+                                                         block_size, monkeypatch):
+        monkeypatch.setattr(generator, "CSV_BLOCK_SIZE", block_size)
+        generator.sample_rows = 8
+
+        scan = generator._scan_csv(quoted_csv)
+
+        sample = _parsed_sample(scan["sample"])
+        assert len(sample) == 8
+        records = _csv_records(quoted_csv)
+        assert all(record in records for record in sample)
+        # Not just the head of the file
+        assert max(int(record[0]) for record in sample) >= 8
+
+    def test_every_record_is_equally_likely_to_be_sampled(self, generator, tmp_path,
+                                                          monkeypatch):
+        path = tmp_path / "ten.csv"
+        path.write_text("i\n" + "".join(f"{i}\n" for i in range(10)))
+        generator.sample_rows = 3
+        # The scan seeds its generator with the file size; vary it per scan instead
+        seeds = iter(range(1_000_000))
+        seeded = random.Random
+        monkeypatch.setattr(edc.random, "Random", lambda _: seeded(next(seeds)))
+
+        trials = 4000
+        counts = [0] * 10
+        for _ in range(trials):
+            for record in generator._scan_csv(path)["sample"]:
+                counts[int(record)] += 1
+
+        # Each record is kept with probability 3/10; the bound is about 5 sigma
+        assert all(abs(count - trials * 0.3) < 150 for count in counts), counts
+
+    def test_final_record_without_newline_is_counted_and_sampled(self, generator, tmp_path):
+        path = tmp_path / "tail.csv"
+        path.write_text('a,b\n1,2\n3,"x\ny"')
+
+        scan = generator._scan_csv(path)
+
+        assert scan["row_count"] == 2
+        assert _parsed_sample(scan["sample"]) == [["1", "2"], ["3", "x\ny"]]
+
+    def test_count_limit_extrapolates_and_flags_estimate(self, generator, tmp_path, monkeypatch):
+        path = tmp_path / "big.csv"
+        path.write_text("a,b\n" + "".join(f"{i},{i}\n" for i in range(1000, 3000)))
+        monkeypatch.setattr(generator, "CSV_BLOCK_SIZE", 1024)
+        generator.count_limit_bytes = 4096
+
+        schema = generator._extract_tabular_schema(path)
+
+        assert schema["row_count_exact"] is False
+        assert abs(schema["row_count"] - 2000) < 50
+
+    def test_duplicate_header_names_are_mangled(self):
+        names = edc.EngineeringDataContextGenerator._unique_column_names(
+            ["t", "value", "value", "t", "value.1"])
+
+        assert names == ["t", "value", "value.1", "t.1", "value.1.1"]
+
+    def test_dtypes_come_from_sampled_records(self, generator, tmp_path):
+        pytest.importorskip("pandas")
+        path = tmp_path / "dupes.csv"
+        path.write_text('time,value,value\n1,"a\nb",2.5\n2,c,3.5\n')
+
+        schema = generator._extract_tabular_schema(path)
+
+        assert schema["columns"] == ["time", "value", "value"]
+        assert schema["dtypes"] == {"time": "int64", "value": "object", "value.1": "float64"}
+
+
+def _reference_events(value):
+    """Parse events for an already loaded JSON value."""
+    if isinstance(value, dict):
+        yield "start_map", None
+        for key, item in value.items():
+            yield "key", key
+            yield from _reference_events(item)
+        yield "end_map", None
+    elif isinstance(value, list):
+        yield "start_array", None
+        for item in value:
+            yield from _reference_events(item)
+        yield "end_array", None
+    elif value is None:
+        yield "scalar", "null"
+    elif isinstance(value, bool):
+        yield "scalar", "boolean"
+    elif isinstance(value, (int, float)):
+        yield "scalar", "number"
+    else:
+        yield "scalar", "string"
+
+
+SAMPLE_DOCUMENT = {
+    "name": "rig \"A\"\n",
+    "unicode\\key": [1, -2.5e3, True, None, "x" * 300],
+    "runs": [
+        {"id": 1, "ok": True, "tags": ["a"]},
+        {"id": 2, "note": None, "nested": {"deep": {"deeper": {"deepest": 1}}}},
+    ],
+    "empty": {},
+    "none": [],
+}
+
+
+class TestStreamingSchemaInference:
+    """Bounded, event-based JSON/YAML schema inference."""
+
+    @pytest.mark.parametrize("chunk_size", [1, 7, 64 * 1024])
+    def test_json_events_match_a_full_parse(self, chunk_size):
+        text = json.dumps(SAMPLE_DOCUMENT, indent=2)
+
+        events = list(edc.iter_json_events(io.StringIO(text), chunk_size=chunk_size))
+
+        assert events == list(_reference_events(SAMPLE_DOCUMENT))
+
+    def test_yaml_events_match_a_full_parse(self):
+        text = yaml.safe_dump(SAMPLE_DOCUMENT, sort_keys=False)
+
+        assert list(edc.iter_yaml_events(io.StringIO(text))) == list(_reference_events(SAMPLE_DOCUMENT))
+
+    def test_invalid_json_raises(self):
+        with pytest.raises(ValueError):
+            list(edc.iter_json_events(io.StringIO('{"a": @}')))
+
+    def test_array_items_merge_into_union_schema(self):
+        schema = edc.StreamingSchemaInferer().infer(_reference_events(SAMPLE_DOCUMENT["runs"]))
+
+        assert schema == {
+            "type": "array",
+            "items": {"type": "object", "properties": {
+                "id": {"type": "number"},
+                "ok": {"type": "boolean"},
+                "tags": {"type": "array", "items": {"type": "string"}},
+                "note": {"type": "null"},
+                # Values nested past max_depth are not inspected
+                "nested": {"type": "object", "properties": {
+                    "deep": {"type": "object", "properties": {"deeper": {"type": "unknown"}}}}},
+            }},
+        }
+
+    def test_mixed_scalar_types_are_listed(self):
+        schema = edc.StreamingSchemaInferer().infer(_reference_events([1, "a", None, 2]))
+
+        assert schema["items"]["type"] == ["null", "number", "string"]
+
+    def test_keys_and_items_beyond_limits_are_not_sampled(self):
+        inferer = edc.StreamingSchemaInferer(max_keys=2, max_items=3)
+        document = {"a": 1, "b": 2, "c": 3, "list": [1, 1, 1, "late string"]}
+
+        schema = inferer.infer(_reference_events(document))
+
+        assert list(schema["properties"]) == ["a", "b"]
+
+    def test_event_budget_stops_reading_the_stream(self):
+        class BoundedStream(io.StringIO):
+            def read(self, size=-1):
+                if self.tell() > 4096:
+                    raise AssertionError("read past the event budget")
+                return super().read(size)
+
+        text = json.dumps([{"id": i, "value": i * 0.5} for i in range(100000)])
+        inferer = edc.StreamingSchemaInferer(max_events=50)
+
+        schema = inferer.infer(edc.iter_json_events(BoundedStream(text), chunk_size=512))
+
+        assert schema["truncated"] is True
+        assert schema["items"]["properties"] == {"id": {"type": "number"},
+                                                 "value": {"type": "number"}}
+
+    def test_json_and_yaml_files_give_the_same_schema(self, generator, tmp_path):
+        (tmp_path / "doc.json").write_text(json.dumps(SAMPLE_DOCUMENT))
+        (tmp_path / "doc.yaml").write_text(yaml.safe_dump(SAMPLE_DOCUMENT, sort_keys=False))
+
+        json_schema = generator._extract_json_schema(tmp_path / "doc.json")
+
+        assert json_schema == generator._extract_yaml_schema(tmp_path / "doc.yaml")
+        assert json_schema["type"] == "object"
+
+
+class TestFingerprintStrategies:
+    """Pluggable content fingerprints selectable per data type."""
+
+    def test_sha256_is_a_full_file_digest(self, tmp_path):
+        path = tmp_path / "a.bin"
+        path.write_bytes(os.urandom(3 * 1024 * 1024 + 17))
+
+        digest = edc.FINGERPRINT_STRATEGIES["sha256"](path, path.stat().st_size)
+
+        assert digest == hashlib.sha256(path.read_bytes()).hexdigest()
+
+    @pytest.mark.parametrize("strategy", sorted(edc.FINGERPRINT_STRATEGIES))
+    def test_strategies_detect_appends_to_large_files(self, tmp_path, strategy):
+        path = tmp_path / "log.csv"
+        path.write_bytes(b"x" * (12 * 1024 * 1024))
+        fingerprint = edc.FINGERPRINT_STRATEGIES[strategy]
+        before = fingerprint(path, path.stat().st_size)
+
+        with open(path, "ab") as f:
+            f.write(b"appended row\n")
+
+        assert fingerprint(path, path.stat().st_size) != before
+
+    def test_sampled_reads_a_bounded_number_of_bytes(self, tmp_path, monkeypatch):
+        path = tmp_path / "big.bin"
+        with open(path, "wb") as f:
+            f.truncate(64 * 1024 * 1024)
+        read = []
+        real_open = open
+
+        class CountingFile:
+            def __init__(self, f):
+                self._f = f
+
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *exc):
+                self._f.close()
+
+            def seek(self, *args):
+                return self._f.seek(*args)
+
+            def read(self, size=-1):
+                data = self._f.read(size)
+                read.append(len(data))
+                return data
+
+        monkeypatch.setattr("builtins.open", lambda *a, **k: CountingFile(real_open(*a, **k)))
+        edc.FINGERPRINT_STRATEGIES["sampled"](path, path.stat().st_size)
+
+        assert sum(read) == edc.SAMPLED_BLOCK_COUNT * edc.SAMPLED_BLOCK_SIZE
+
+    def test_strategy_is_chosen_per_data_type_and_recorded(self, tmp_path, data_tree):
+        gen = edc.EngineeringDataContextGenerator(
+            base_path=tmp_path / "base",
+            fingerprint_strategies={"tabular_data": "sha256"},
+            default_fingerprint="fast",
+        )
+        try:
+            contexts = _by_path(gen._collect_contexts(data_tree))
+        finally:
+            gen.close()
+
+        csv_context = contexts[data_tree / "sensors" / "a.csv"]
+        assert csv_context.metadata["hash_strategy"] == "sha256"
+        assert csv_context.content_hash == hashlib.sha256(
+            (data_tree / "sensors" / "a.csv").read_bytes()).hexdigest()
+        assert contexts[data_tree / "export.json"].metadata["hash_strategy"] == edc.FAST_FINGERPRINT
+
+    def test_changing_strategy_rehashes_on_incremental_run(self, tmp_path, data_tree):
+        with edc.EngineeringDataContextGenerator(base_path=tmp_path / "base") as gen:
+            gen.generate_context(data_tree)
+        with edc.EngineeringDataContextGenerator(
+                base_path=tmp_path / "base",
+                fingerprint_strategies={"configuration": "sha256"}) as gen:
+            result = gen.generate_context(data_tree, incremental=True)
+
+        # settings.yaml plus its config/ folder and the root folder
+        assert result["contexts_updated"] == 3
+
+    def test_unknown_strategy_is_rejected(self, tmp_path):
+        with pytest.raises(ValueError, match="Unknown fingerprint strategy"):
+            edc.EngineeringDataContextGenerator(base_path=tmp_path, default_fingerprint="nope")
+
+    @pytest.mark.parametrize("item, error", [
+        ("csv", "expects TYPE=STRATEGY, got 'csv'"),
+        ("=sha256", "expects TYPE=STRATEGY, got '=sha256'"),
+        ("csv=bogus", "unknown fingerprint strategy 'bogus' for csv"),
+    ])
+    def test_cli_rejects_bad_strategy_pairs(self, tmp_path, data_tree, monkeypatch, capsys,
+                                            item, error):
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.setattr(sys, "argv", ["engineering-data-context", "generate",
+                                          "--folder", str(data_tree), "--fingerprint-for", item])
+
+        with pytest.raises(SystemExit) as exit_info:
+            edc.main()
+
+        assert exit_info.value.code == 2
+        assert error in capsys.readouterr().err
+
+
+class _ResearchStub(BaseHTTPRequestHandler):
+    """Search endpoint stub; the query text selects failure modes."""
+
+    def do_GET(self):
+        server = self.server
+        query = parse_qs(urlparse(self.path).query)["q"][0]
+        with server.lock:
+            server.requests.append((time.monotonic(), query))
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+        try:
+            time.sleep(0.05)
+            if "slow" in query:
+                time.sleep(1.0)
+            if "fail" in query:
+                self.send_response(500)
+                self.end_headers()
+                return
+            body = b"not json" if "garbled" in query else json.dumps({
+                "sources": [{"title": query, "url": "http://docs.local/" + query}],
+                "summary": f"About {query}",
+            }).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # the client gave up waiting
+        finally:
+            with server.lock:
+                server.in_flight -= 1
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def research_server():
+    """Local stub search server run on a background thread."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _ResearchStub)
+    server.lock = threading.Lock()
+    server.requests = []
+    server.in_flight = server.max_in_flight = 0
+    thread = threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def research_generator(tmp_path, research_server):
+    """Generator whose research stage queries the stub server."""
+    def make(**overrides):
+        config = edc.ResearchConfig(
+            endpoint=f"http://127.0.0.1:{research_server.server_port}/search?q={{query}}",
+            **{"timeout": 0.5, **overrides})
+        gen = edc.EngineeringDataContextGenerator(base_path=tmp_path / "base", research_config=config)
+        made.append(gen)
+        return gen
+
+    made = []
+    yield make
+    for gen in made:
+        gen.close()
+
+
+def _research_jobs(*queries):
+    return [(_make_context(f"/d/{i}.csv"), query) for i, query in enumerate(queries)]
+
+
+class TestResearchFetcher:
+    """Rate-limited async research against a local stub HTTP server."""
+
+    def test_results_are_attached_and_cached(self, research_generator, research_server):
+        gen = research_generator()
+        jobs = _research_jobs("flow meters", "pump curves")
+
+        gen._run_research(jobs)
+
+        for context, query in jobs:
+            assert context.web_research[query]["summary"] == f"About {query}"
+        again = _research_jobs("flow meters", "pump curves")
+        gen._run_research(again)
+        assert len(research_server.requests) == 2
+        assert again[0][0].web_research["flow meters"]["summary"] == "About flow meters"
+
+    def test_duplicate_queries_are_fetched_once(self, research_generator, research_server):
+        jobs = _research_jobs("valves", "valves", "valves")
+
+        research_generator()._run_research(jobs)
+
+        assert len(research_server.requests) == 1
+        assert all(context.web_research for context, _ in jobs)
+
+    def test_per_host_rate_and_concurrency_limits(self, research_generator, research_server):
+        gen = research_generator(rate_per_host=10.0, per_host_limit=2)
+
+        gen._run_research(_research_jobs(*(f"query {i}" for i in range(8))))
+
+        times = sorted(t for t, _ in research_server.requests)
+        assert research_server.max_in_flight <= 2
+        # A burst of 2 tokens, then one request every 0.1s
+        assert times[-1] - times[0] >= 0.5
+
+    def test_expired_entries_are_refetched(self, research_generator, research_server):
+        gen = research_generator(ttl_seconds=60)
+        gen._run_research(_research_jobs("sensors"))
+        gen.store.conn.execute("UPDATE research_cache SET timestamp = ?",
+                               ((datetime.now() - timedelta(seconds=120)).isoformat(),))
+
+        gen._run_research(_research_jobs("sensors"))
+
+        assert [q for _, q in research_server.requests] == ["sensors", "sensors"]
+
+    def test_least_recently_used_entries_are_evicted(self, research_generator, research_server):
+        gen = research_generator(cache_size=2)
+        for query in ("first", "second"):
+            gen._run_research(_research_jobs(query))
+            time.sleep(0.01)
+        gen._run_research(_research_jobs("first"))  # cache hit refreshes "first"
+        time.sleep(0.01)
+
+        gen._run_research(_research_jobs("third"))
+
+        cached = {row[0] for row in gen.store.conn.execute("SELECT query FROM research_cache")}
+        assert cached == {"first", "third"}
+
+    def test_failed_queries_do_not_stop_the_stage(self, research_generator, research_server, capsys):
+        jobs = _research_jobs("fail hard", "slow lookup", "garbled reply", "good query")
+
+        research_generator()._run_research(jobs)
+
+        results = {query: context.web_research for context, query in jobs}
+        assert results["good query"]["good query"]["summary"] == "About good query"
+        assert results["fail hard"] is None
+        assert results["slow lookup"] is None
+        assert results["garbled reply"] is None
+        assert capsys.readouterr().out.count("Research error") == 3
+        cached = {row[0] for row in research_generator().store.conn.execute(
+            "SELECT query FROM research_cache")}
+        assert cached == {"good query"}
+
+    @pytest.mark.parametrize("rate, capacity", [(0, 2), (-1.0, 2), (5.0, 0.5)])
+    def test_token_bucket_rejects_unusable_settings(self, rate, capacity):
+        with pytest.raises(ValueError):
+            edc.TokenBucket(rate, capacity)
+
+    @pytest.mark.parametrize("settings", [{"rate_per_host": 0}, {"per_host_limit": 0}])
+    def test_research_config_rejects_unusable_limits(self, settings):
+        with pytest.raises(ValueError):
+            edc.ResearchConfig(**settings)
+
+
+MODULE_NAMES = ["auth", "Billing", "billing_v2", "io", "payments", "pay"]
+
+
+@pytest.fixture
+def module_index(tmp_path):
+    dirs = {}
+    for name in MODULE_NAMES:
+        directory = tmp_path / "src" / "modules" / name
+        directory.mkdir(parents=True)
+        dirs[name] = [directory]
+    nested = tmp_path / "src" / "modules" / "payments" / "pay"
+    nested.mkdir()
+    dirs["pay"].append(nested)
+    return edc.ModuleIndex(dirs), tmp_path
+
+
+class TestModuleIndex:
+    @pytest.mark.parametrize("tag", [
+        "", "a", "i", "pay", "PAY", "bill", "ing_v", "billing", "payments", "ments",
+        "authx", "zzz", "in", "io", "billing_v2_extra",
+    ])
+    def test_tag_lookup_matches_substring_scan(self, module_index, tag):
+        index, _ = module_index
+        expected = [m for m in sorted(MODULE_NAMES) if tag.lower() in m.lower()]
+        assert index.modules_for_tag(tag) == expected
+
+    def test_tag_index_is_built_at_construction(self, module_index):
+        index, _ = module_index
+        grams = dict(index._grams)
+        index.modules_for_tag("billing")
+        index.modules_for_tag("unknown-tag")
+        assert index._grams == grams
+
+    def test_deepest_enclosing_module_wins(self, module_index):
+        index, root = module_index
+        modules = root / "src" / "modules"
+        assert index.module_for_path(modules / "payments" / "ledger.csv") == "payments"
+        assert index.module_for_path(modules / "payments" / "pay" / "card.json") == "pay"
+        assert index.module_for_path(root / "elsewhere" / "auth" / "users.csv") == "auth"
+        assert index.module_for_path(root / "elsewhere" / "users.csv") is None
+
+    def test_modules_in_name(self, module_index):
+        index, _ = module_index
+        assert sorted(index.modules_in_name("Monthly_BILLING_v2_report")) == [
+            "Billing", "billing_v2"]
+        assert index.modules_in_name("unrelated") == []
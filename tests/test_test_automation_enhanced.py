@@ -0,0 +1,623 @@
+"""Tests for the enhanced test automation command
+
+The command lives in .agent-os/commands as a standalone script, so it is
+loaded from its file path rather than imported as a package.
+"""
+
+import importlib.util
+import subprocess
+import sys
+import textwrap
+from pathlib import Path
+
+import pytest
+
+ROOT_DIR = Path(__file__).parent.parent
+MODULE_PATH = ROOT_DIR / ".agent-os" / "commands" / "test_automation_enhanced.py"
+
+
+def _load_command():
+    spec = importlib.util.spec_from_file_location("test_automation_enhanced", MODULE_PATH)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+tae = _load_command()
+
+
+def _write(root, rel_path, source):
+    path = root / rel_path
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(textwrap.dedent(source))
+    return path
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    """Scratch repository the runner adapts to, with its own pytest rootdir."""
+    (tmp_path / ".git").mkdir()
+    (tmp_path / "pytest.ini").write_text("[pytest]\n")
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+@pytest.fixture
+def pool(project):
+    pool = tae.PytestWorkerPool(project, 1, timeout=5)
+    yield pool
+    pool.close()
+
+
+class TestPytestWorkerPool:
+    def test_runs_test_files_on_a_warm_worker(self, project, pool):
+        test_file = _write(project, "tests/test_sample.py", """
+            import pytest
+
+            def test_ok():
+                assert True
+
+            def test_bad():
+                assert 1 == 2
+
+            @pytest.mark.skip(reason="not today")
+            def test_skipped():
+                pass
+        """)
+
+        response = pool.run(test_file, ["-q"])
+        assert response["exit_code"] == 1
+        outcomes = {test["nodeid"]: (test["outcome"], test["phase"]) for test in response["tests"]}
+        assert outcomes == {
+            "tests/test_sample.py::test_ok": ("passed", "call"),
+            "tests/test_sample.py::test_bad": ("failed", "call"),
+            "tests/test_sample.py::test_skipped": ("skipped", "setup"),
+        }
+
+        pid = pool.workers[0].process.pid
+        assert pool.run(test_file, ["-q"])["exit_code"] == 1
+        assert pool.workers[0].process.pid == pid
+
+    def test_hung_worker_is_killed_and_restarted(self, project):
+        hang = _write(project, "test_hang.py", """
+            import time
+
+            def test_hang():
+                time.sleep(30)
+        """)
+        ok = _write(project, "test_ok.py", "def test_ok():\n    pass\n")
+        pool = tae.PytestWorkerPool(project, 1, timeout=1)
+        try:
+            assert pool.run(hang, []) == {"timed_out": True}
+            assert not pool.workers[0].alive()
+            assert pool.run(ok, [])["exit_code"] == 0
+        finally:
+            pool.close()
+
+    def test_crashed_worker_is_restarted(self, project, pool):
+        crash = _write(project, "test_crash.py", """
+            import os
+
+            def test_crash():
+                os._exit(3)
+        """)
+        ok = _write(project, "test_ok.py", "def test_ok():\n    pass\n")
+
+        assert pool.run(crash, []) == {"crashed": True, "returncode": 3}
+        assert pool.run(ok, [])["exit_code"] == 0
+
+    def test_workers_are_recycled(self, project):
+        ok = _write(project, "test_ok.py", "def test_ok():\n    pass\n")
+        pool = tae.PytestWorkerPool(project, 1, recycle_after=1)
+        try:
+            pool.run(ok, [])
+            first = pool.workers[0].process.pid
+            assert not pool.workers[0].alive()
+            pool.run(ok, [])
+            assert pool.workers[0].process.pid != first
+        finally:
+            pool.close()
+
+    def test_failed_preloads_are_reported(self, project, capsys):
+        ok = _write(project, "test_ok.py", "def test_ok():\n    pass\n")
+        pool = tae.PytestWorkerPool(project, 1, preload=["json", "no_such_module_xyz"])
+        try:
+            assert pool.run(ok, [])["exit_code"] == 0
+        finally:
+            pool.close()
+
+        assert list(pool.preload_errors) == ["no_such_module_xyz"]
+        assert "ModuleNotFoundError" in pool.preload_errors["no_such_module_xyz"]
+        assert "could not preload no_such_module_xyz" in capsys.readouterr().out
+
+    def test_timeout_message_uses_the_pool_timeout(self, project):
+        hang = _write(project, "test_hang.py", """
+            import time
+
+            def test_hang():
+                time.sleep(30)
+        """)
+        runner = tae.IntelligentTestRunner(tae.RepositoryAdapter(), worker_pool=True)
+        runner.pool = tae.PytestWorkerPool(project, 1, timeout=1.5)
+        try:
+            result = runner._run_in_worker("root", hang, False, [])
+        finally:
+            runner.pool.close()
+
+        assert result.status == "error"
+        assert result.duration == 1.5
+        assert result.error_message == "Test timed out after 1.5 seconds; worker restarted"
+
+
+@pytest.fixture
+def runner(project):
+    return tae.IntelligentTestRunner(tae.RepositoryAdapter(), max_workers=4)
+
+
+class TestDurationStore:
+    def test_record_folds_runs_into_a_moving_average(self, tmp_path):
+        store = tae.TestDurationStore(tmp_path / "durations.json", smoothing=0.5)
+        assert store.estimate("tests/test_a.py") is None
+
+        store.record("tests/test_a.py", 4.0, "passed")
+        assert store.estimate("tests/test_a.py") == 4.0
+        store.record("tests/test_a.py", 8.0, "passed")
+        assert store.estimate("tests/test_a.py") == 6.0
+        assert store.durations["tests/test_a.py"]["runs"] == 2
+        assert store.durations["tests/test_a.py"]["last_duration"] == 8.0
+
+    def test_runs_without_a_duration_keep_the_estimate(self, tmp_path):
+        store = tae.TestDurationStore(tmp_path / "durations.json")
+        store.record("tests/test_a.py", 0.0, "error")
+        assert store.estimate("tests/test_a.py") is None
+        store.record("tests/test_a.py", 3.0, "passed")
+        store.record("tests/test_a.py", 0.0, "error")
+        assert store.estimate("tests/test_a.py") == 3.0
+
+    def test_failing_tracks_the_last_outcome(self, tmp_path):
+        store = tae.TestDurationStore(tmp_path / "durations.json")
+        store.record("a", 1.0, "failed")
+        store.record("b", 1.0, "error")
+        store.record("c", 1.0, "passed")
+        store.record("d", 1.0, "failed")
+        store.record("d", 1.0, "passed")
+        assert store.failing() == {"a", "b"}
+
+    def test_save_round_trips(self, tmp_path):
+        path = tmp_path / "nested" / "durations.json"
+        store = tae.TestDurationStore(path)
+        store.record("tests/test_a.py", 2.5, "failed")
+        store.save()
+
+        reloaded = tae.TestDurationStore(path)
+        assert reloaded.estimate("tests/test_a.py") == 2.5
+        assert reloaded.failing() == {"tests/test_a.py"}
+
+    def test_corrupt_file_starts_empty(self, tmp_path):
+        path = tmp_path / "durations.json"
+        path.write_text("{not json")
+        assert tae.TestDurationStore(path).durations == {}
+
+
+class TestScheduling:
+    def test_longest_expected_files_go_first(self, project, runner):
+        files = {name: _write(project, f"tests/{name}.py", "def test_x():\n    pass\n")
+                 for name in ("test_a", "test_b", "test_c", "test_d")}
+        for name, duration in (("test_a", 1.0), ("test_b", 9.0), ("test_c", 4.0)):
+            runner.durations.record(f"tests/{name}.py", duration, "passed")
+
+        jobs, estimates = runner._schedule({"pkg": list(files.values())})
+        # test_d has no history and is estimated at the median known duration
+        assert [test_file.stem for _, test_file in jobs] == ["test_b", "test_c", "test_d", "test_a"]
+        assert estimates == [9.0, 4.0, 4.0, 1.0]
+        assert all(module == "pkg" for module, _ in jobs)
+
+    def test_without_history_larger_files_go_first(self, project, runner):
+        small = _write(project, "tests/test_small.py", "def test_x():\n    pass\n")
+        large = _write(project, "tests/test_large.py", "def test_x():\n    pass\n" * 20)
+
+        jobs, estimates = runner._schedule({"a": [small], "b": [large]})
+        assert jobs == [("b", large), ("a", small)]
+        assert estimates == [1.0, 1.0]
+
+    def test_worker_count_is_capped_by_the_longest_file(self, runner):
+        assert runner._worker_count([10.0, 1.0, 1.0, 1.0]) == 2
+        assert runner._worker_count([1.0] * 10) == 4
+        assert runner._worker_count([5.0, 5.0]) == 2
+        assert runner._worker_count([]) == 1
+
+    def test_schedule_stats(self):
+        stats = tae.IntelligentTestRunner._schedule_stats([6.0, 3.0, 3.0], 2, 8.0)
+        assert stats["critical_path"] == 6.0
+        assert stats["total_test_time"] == 12.0
+        assert stats["lower_bound"] == 6.0
+        assert stats["efficiency"] == 0.75
+        assert tae.IntelligentTestRunner._schedule_stats([], 1, 0.0)["efficiency"] == 1.0
+
+    def test_run_records_durations_for_the_next_schedule(self, project, runner):
+        test_file = _write(project, "tests/test_sample.py", "def test_ok():\n    pass\n")
+
+        results = runner.run_all({"tests": [test_file]}, parallel=False)
+        assert [result.status for result in results] == ["passed"]
+
+        store = tae.TestDurationStore(project / ".test_automation" / "test_durations.json")
+        assert store.estimate("tests/test_sample.py") > 0
+        assert runner.schedule_stats["test_files"] == 1
+
+
+def _git(root, *args):
+    subprocess.run(["git", "-c", "user.name=Test", "-c", "user.email=test@example.com", *args],
+                   cwd=root, check=True, capture_output=True)
+
+
+@pytest.fixture
+def repo(tmp_path, monkeypatch):
+    """Committed git repository with a package and tests importing it."""
+    _write(tmp_path, "pkg/__init__.py", "")
+    _write(tmp_path, "pkg/core.py", "def add(a, b):\n    return a + b\n")
+    _write(tmp_path, "pkg/api.py", "from .core import add\n")
+    _write(tmp_path, "legacy.py", "VALUE = 1\n")
+    _write(tmp_path, "tests/test_api.py", "from pkg.api import add\n")
+    _write(tmp_path, "tests/test_legacy.py", "import legacy\n")
+    _write(tmp_path, "tests/test_plain.py", "def test_x():\n    pass\n")
+    _write(tmp_path, "tests/unit/test_unit.py", "def test_x():\n    pass\n")
+    _git(tmp_path, "init", "-q")
+    _git(tmp_path, "add", ".")
+    _git(tmp_path, "commit", "-q", "-m", "initial")
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def _tests(root):
+    return {"tests": sorted((root / "tests").rglob("test_*.py"))}
+
+
+def _selected(selected, root):
+    return sorted(test_file.relative_to(root).as_posix()
+                  for test_files in selected.values() for test_file in test_files)
+
+
+class TestImportGraph:
+    def test_module_names_cover_every_suffix(self):
+        assert tae.ImportGraph.module_names("src/pkg/mod.py") == ["src.pkg.mod", "pkg.mod", "mod"]
+        assert tae.ImportGraph.module_names("pkg/__init__.py") == ["pkg"]
+
+    def test_relative_imports_resolve_against_the_package(self, tmp_path):
+        _write(tmp_path, "pkg/sub/mod.py", """
+            import os.path
+            from . import sibling
+            from .helpers import tool
+            from ..base import Base
+            from json import loads
+        """)
+        graph = tae.ImportGraph(tmp_path, tmp_path / "cache.json")
+        graph.build()
+        assert graph.files["pkg/sub/mod.py"]["imports"] == [
+            "json.loads", "os.path", "pkg.base.Base", "pkg.sub.helpers.tool", "pkg.sub.sibling"]
+
+    def test_unparsable_files_have_no_imports(self, tmp_path):
+        _write(tmp_path, "broken.py", "def (:\n")
+        graph = tae.ImportGraph(tmp_path, tmp_path / "cache.json")
+        graph.build()
+        assert graph.files["broken.py"]["imports"] == []
+
+    def test_only_changed_files_are_reparsed(self, repo):
+        cache = repo / ".test_automation" / "import_graph.json"
+        assert tae.ImportGraph(repo, cache).build() == {"files": 8, "parsed": 8}
+        assert tae.ImportGraph(repo, cache).build() == {"files": 8, "parsed": 0}
+
+        _write(repo, "pkg/api.py", "from .core import add\nimport legacy\n")
+        graph = tae.ImportGraph(repo, cache)
+        assert graph.build() == {"files": 8, "parsed": 1}
+        assert "tests/test_api.py" in graph.dependents(["legacy.py"])
+
+    def test_dependents_are_transitive(self, repo):
+        graph = tae.ImportGraph(repo, repo / "cache.json")
+        graph.build()
+        assert graph.dependents(["pkg/core.py"]) == {
+            "pkg/core.py", "pkg/api.py", "tests/test_api.py"}
+        # Importing pkg.api runs pkg/__init__.py first
+        assert "tests/test_api.py" in graph.dependents(["pkg/__init__.py"])
+        assert graph.dependents(["README.md"]) == {"README.md"}
+
+
+class TestImpactAnalysis:
+    def test_changed_files_include_uncommitted_and_untracked(self, repo):
+        _write(repo, "pkg/core.py", "def add(a, b):\n    return b + a\n")
+        _write(repo, "pkg/new.py", "")
+        _write(repo, ".test_automation/state.json", "{}")
+        analyzer = tae.TestImpactAnalyzer(tae.RepositoryAdapter())
+        assert analyzer.changed_files() == ["pkg/core.py", "pkg/new.py"]
+
+    def test_unknown_revision_is_none(self, repo):
+        assert tae.TestImpactAnalyzer(tae.RepositoryAdapter()).changed_files("no-such-rev") is None
+
+    def test_renamed_module_selects_tests_importing_the_old_name(self, repo):
+        _git(repo, "mv", "legacy.py", "modern.py")
+        analyzer = tae.TestImpactAnalyzer(tae.RepositoryAdapter())
+
+        changed = analyzer.changed_files()
+        assert changed == ["legacy.py", "modern.py"]
+        selected, _ = analyzer.select(_tests(repo), changed, set())
+        assert _selected(selected, repo) == ["tests/test_legacy.py"]
+
+    def test_select_follows_imports_and_previous_failures(self, repo):
+        analyzer = tae.TestImpactAnalyzer(tae.RepositoryAdapter())
+        selected, stats = analyzer.select(_tests(repo), ["pkg/core.py"], {"tests/test_plain.py"})
+        assert _selected(selected, repo) == ["tests/test_api.py", "tests/test_plain.py"]
+        assert stats["selected_tests"] == 2 and stats["total_tests"] == 4
+        assert not stats["full_run"]
+
+    def test_conftest_selects_every_test_below_it(self, repo):
+        _write(repo, "tests/unit/conftest.py", "")
+        analyzer = tae.TestImpactAnalyzer(tae.RepositoryAdapter())
+        selected, _ = analyzer.select(_tests(repo), ["tests/unit/conftest.py"], set())
+        assert _selected(selected, repo) == ["tests/unit/test_unit.py"]
+
+    def test_project_configuration_runs_everything(self, repo):
+        analyzer = tae.TestImpactAnalyzer(tae.RepositoryAdapter())
+        selected, stats = analyzer.select(_tests(repo), ["pyproject.toml"], set())
+        assert stats["full_run"]
+        assert _selected(selected, repo) == _selected(_tests(repo), repo)
+
+
+SKIPS_AND_FAILURES = """
+    import pytest
+
+    @pytest.fixture
+    def device():
+        pytest.skip("no device")
+
+    @pytest.fixture
+    def broken():
+        raise RuntimeError("setup broke")
+
+    def test_ok():
+        pass
+
+    def test_fails():
+        assert 1 == 2
+
+    @pytest.mark.skip(reason="marked")
+    def test_marked():
+        pass
+
+    @pytest.mark.parametrize("x", [1, 2])
+    @pytest.mark.skipif(True, reason="conditional")
+    def test_conditional(x):
+        pass
+
+    def test_fixture_skip(device):
+        pass
+
+    def test_body_skip():
+        value = 1
+        pytest.skip("in body")
+
+    def test_setup_error(broken):
+        pass
+
+    @pytest.mark.xfail(reason="known")
+    def test_expected_failure():
+        assert 0
+
+    class TestGroup:
+        def test_method_skip(self):
+            pytest.skip("in method")
+"""
+
+
+def _outcomes(cases):
+    return {case.nodeid: (case.outcome, case.phase) for case in cases}
+
+
+class TestJUnitReports:
+    def test_report_maps_to_test_cases(self, project, runner):
+        test_file = _write(project, "tests/test_sample.py", SKIPS_AND_FAILURES)
+
+        result = runner._run_test_file("tests", test_file, False, [])
+        prefix = "tests/test_sample.py::"
+        assert _outcomes(result.test_cases) == {
+            prefix + "test_ok": ("passed", "call"),
+            prefix + "test_fails": ("failed", "call"),
+            prefix + "test_marked": ("skipped", "setup"),
+            prefix + "test_conditional[1]": ("skipped", "setup"),
+            prefix + "test_conditional[2]": ("skipped", "setup"),
+            prefix + "test_fixture_skip": ("skipped", "setup"),
+            prefix + "test_body_skip": ("skipped", "call"),
+            prefix + "test_setup_error": ("error", "setup"),
+            prefix + "test_expected_failure": ("skipped", "call"),
+            prefix + "TestGroup::test_method_skip": ("skipped", "call"),
+        }
+        messages = {case.nodeid: case.message for case in result.test_cases}
+        assert messages[prefix + "test_marked"] == "marked"
+        assert "assert 1 == 2" in messages[prefix + "test_fails"]
+        assert result.status == "failed"
+
+    def test_report_agrees_with_the_worker(self, project, runner, pool):
+        test_file = _write(project, "tests/test_sample.py", SKIPS_AND_FAILURES)
+        module_skip = _write(project, "tests/test_module_skip.py", """
+            import pytest
+            pytest.skip("whole module", allow_module_level=True)
+        """)
+        broken = _write(project, "tests/test_broken.py", "import no_such_module_xyz\n")
+
+        runner.pool = pool
+        for test_file in (test_file, module_skip, broken):
+            junit = runner._run_test_file("tests", test_file, False, [])
+            worker = runner._run_in_worker("tests", test_file, False, [])
+            assert _outcomes(junit.test_cases) == _outcomes(worker.test_cases)
+            assert junit.status == worker.status
+
+    def test_node_ids_are_relative_to_the_repository_root(self, project, runner):
+        # pytest's rootdir would otherwise be service/, where its pytest.ini is
+        _write(project, "service/pytest.ini", "[pytest]\n")
+        test_file = _write(project, "service/tests/test_api.py", """
+            class TestApi:
+                def test_get(self):
+                    pass
+
+                def test_flaky(self):
+                    assert 0
+        """)
+        runner.quarantined = {"service/tests/test_api.py::TestApi::test_flaky"}
+
+        result = runner._run_single_test("service", test_file, False)
+        assert _outcomes(result.test_cases) == {
+            "service/tests/test_api.py::TestApi::test_get": ("passed", "call")}
+        assert result.status == "passed"
+
+    def test_unreadable_reports_have_no_cases(self, tmp_path, runner):
+        report = tmp_path / "junit.xml"
+        assert runner._parse_junit_report(report, tmp_path / "test_x.py") is None
+        report.write_text("<testsuites><testsuite>")
+        assert runner._parse_junit_report(report, tmp_path / "test_x.py") is None
+
+
+def _record_run(store, outcomes):
+    """Record one run; outcomes maps node ids to an outcome or (outcome, attempts)."""
+    run_id = store.start_run()
+    cases = []
+    for nodeid, outcome in outcomes.items():
+        outcome, attempts = outcome if isinstance(outcome, tuple) else (outcome, 1)
+        cases.append(tae.TestCaseResult(nodeid, outcome, 0.1, attempts=attempts))
+    result = tae.TestResult(module="tests", test_file="test_x.py", test_name=None,
+                            status="passed", duration=1.0, test_cases=cases)
+    store.finish_run(run_id, [(result, "tests/test_x.py")], 1.0)
+    return run_id
+
+
+@pytest.fixture
+def history(tmp_path):
+    store = tae.TestHistoryStore(tmp_path / "history.db", window=6)
+    yield store
+    store.close()
+
+
+class TestFlakiness:
+    def test_score_is_the_share_of_flipped_attempts(self, history):
+        sequences = {
+            "alternating": ["passed", "failed"] * 3,
+            "broken": ["failed"] * 6,
+            "regressed": ["passed"] * 4 + ["failed"] * 2,
+            "stable": ["passed"] * 6,
+        }
+        for i in range(6):
+            _record_run(history, {nodeid: outcomes[i] for nodeid, outcomes in sequences.items()})
+
+        scores = history.flakiness()
+        assert scores["alternating"] == {"score": 1.0, "attempts": 6, "failures": 3, "flips": 5}
+        assert scores["broken"]["score"] == 0.0
+        assert scores["regressed"]["score"] == 0.2
+        assert scores["stable"]["score"] == 0.0
+
+    def test_retries_and_skips(self, history):
+        _record_run(history, {"t": "passed"})
+        _record_run(history, {"t": ("passed", 2)})  # failed, then passed on retry
+        _record_run(history, {"t": "skipped"})
+        _record_run(history, {"t": "passed"})
+
+        assert history.flakiness()["t"] == {"score": 2 / 3, "attempts": 4, "failures": 1,
+                                            "flips": 2}
+
+    def test_only_the_window_counts(self, history):
+        for outcome in ["passed", "failed"] * 3 + ["passed"] * 6:
+            _record_run(history, {"t": outcome})
+        assert history.flakiness()["t"]["score"] == 0.0
+        assert history.flakiness(["other"]) == {}
+
+    def test_flaky_tests_are_ordered_and_filtered(self, history):
+        for i in range(6):
+            _record_run(history, {
+                "flaky": "passed" if i % 2 else "failed",
+                "sometimes": "failed" if i == 3 else "passed",
+                "new": "passed" if i < 5 else "failed",
+            })
+        assert [t["nodeid"] for t in history.flaky_tests()] == ["flaky", "sometimes", "new"]
+        assert [t["nodeid"] for t in history.flaky_tests(threshold=0.3)] == ["flaky", "sometimes"]
+        assert [t["nodeid"] for t in history.flaky_tests(min_attempts=7)] == []
+        assert len(history.flaky_tests(limit=1)) == 1
+
+
+class TestQuarantine:
+    def _flaky_history(self, history):
+        run_id = None
+        for i in range(6):
+            run_id = _record_run(history, {"flaky": "passed" if i % 2 else "failed",
+                                           "stable": "passed"})
+        return run_id
+
+    def test_flaky_tests_are_quarantined_for_the_next_runs(self, history):
+        run_id = self._flaky_history(history)
+
+        assert history.update_quarantine(run_id, threshold=0.5, runs=3) == (["flaky"], [])
+        assert history.quarantined(run_id) == set()
+        assert all(history.quarantined(run_id + i) == {"flaky"} for i in (1, 2, 3))
+        assert history.quarantined(run_id + 4) == set()
+
+    def test_clean_pass_after_quarantine_releases(self, history):
+        run_id = self._flaky_history(history)
+        history.update_quarantine(run_id, threshold=0.5, runs=2)
+
+        # Deselected while quarantined, so the quarantined runs record nothing for it
+        for _ in range(2):
+            history.update_quarantine(_record_run(history, {"stable": "passed"}), 0.5, 2)
+        run_id = _record_run(history, {"flaky": "passed", "stable": "passed"})
+        assert history.update_quarantine(run_id, threshold=0.5, runs=2) == ([], ["flaky"])
+        assert history.quarantined(run_id + 1) == set()
+
+    def test_still_flaky_tests_stay_quarantined_from_the_start(self, history):
+        first = self._flaky_history(history)
+        history.update_quarantine(first, threshold=0.5, runs=1)
+
+        run_id = _record_run(history, {"flaky": ("passed", 2)})
+        assert history.update_quarantine(run_id, threshold=0.5, runs=1) == (["flaky"], [])
+        since, until = history.conn.execute(
+            "SELECT since_run, until_run FROM quarantine WHERE nodeid = 'flaky'").fetchone()
+        assert (since, until) == (first, run_id + 1)
+
+    def test_release(self, history):
+        history.update_quarantine(self._flaky_history(history), threshold=0.5, runs=3)
+        assert history.release("flaky")
+        assert not history.release("flaky")
+
+
+class TestRunHistory:
+    def test_history_is_only_opened_for_a_run(self, project):
+        automation = tae.TestAutomationEnhanced()
+        db = project / ".test_automation" / "test_history.db"
+        assert automation.runner.history is None and not db.exists()
+        assert automation.test_history() == {"runs": [], "flaky": [], "quarantined": [],
+                                             "test": None}
+        assert not db.exists()
+
+        test_file = _write(project, "tests/test_sample.py", "def test_ok():\n    pass\n")
+        automation.runner.run_all({"tests": [test_file]}, parallel=False)
+        assert automation.runner.history is None and db.exists()
+
+        history = automation.test_history(nodeid="tests/test_sample.py::test_ok")
+        assert [run["tests"] for run in history["runs"]] == [1]
+        assert [run["outcome"] for run in history["test"]] == ["passed"]
+
+    def test_failed_tests_pass_on_retry(self, project):
+        test_file = _write(project, "tests/test_flaky.py", """
+            from pathlib import Path
+
+            def test_second_time_lucky():
+                marker = Path(__file__).with_suffix(".ran")
+                first = not marker.exists()
+                marker.touch()
+                assert not first
+
+            def test_ok():
+                pass
+        """)
+        runner = tae.IntelligentTestRunner(tae.RepositoryAdapter(), retries=2)
+
+        results = runner.run_all({"tests": [test_file]}, parallel=False)
+        assert [result.status for result in results] == ["passed"]
+        attempts = {case.nodeid: case.attempts for case in results[0].test_cases}
+        assert attempts == {"tests/test_flaky.py::test_second_time_lucky": 2,
+                            "tests/test_flaky.py::test_ok": 1}
+        assert runner.flakiness["passed_on_retry"] == ["tests/test_flaky.py::test_second_time_lucky"]